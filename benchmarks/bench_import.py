@@ -0,0 +1,58 @@
+"""Benchmark the time taken to import the package.
+
+Each import runs in a fresh interpreter with 'python -X importtime', the
+cumulative time of the top level metno_locationforecast import is reported
+along with the time taken to read the configuration on first use, which no
+longer happens at import.
+
+Run with 'python benchmarks/bench_import.py'.
+"""
+
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from helpers import import_times
+
+RUNS = 20
+
+CONFIG_CODE = (
+    "import time; import metno_locationforecast.forecast; "
+    "from metno_locationforecast.config import get_config; "
+    "start = time.perf_counter(); get_config(); "
+    "print((time.perf_counter() - start) * 1e6)"
+)
+
+
+def config_time() -> float:
+    """Time reading the configuration in a new interpreter, in us."""
+    result = subprocess.run(
+        [sys.executable, "-c", CONFIG_CODE], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout)
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    totals: List[int] = []
+    slowest: Dict[str, List[int]] = {}
+    for _ in range(RUNS):
+        times = import_times("metno_locationforecast")
+        totals.append(times["metno_locationforecast"])
+        for name, cumulative in times.items():
+            if "." not in name or name.startswith("metno_locationforecast"):
+                slowest.setdefault(name, []).append(cumulative)
+
+    print(f"import metno_locationforecast: {statistics.median(totals) / 1000:.1f}ms (median)")
+    print("slowest top level imports:")
+    medians = {name: statistics.median(times) for name, times in slowest.items()}
+    for name, median in sorted(medians.items(), key=lambda item: -item[1])[:10]:
+        print(f"    {name:<40} {median / 1000:>8.1f}ms")
+
+    config = statistics.median(config_time() for _ in range(RUNS))
+    print(f"first get_config(): {config / 1000:.2f}ms (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark interval lookups on large synthetic data sets.
+
+Compares Data.intervals_between and Data.intervals_for with a linear scan over
+the intervals, checking that both give the same results.
+
+Run with 'python benchmarks/bench_intervals.py'.
+"""
+
+import datetime as dt
+import random
+import timeit
+from typing import List
+
+from metno_locationforecast.data_containers import Data, Interval, Variable
+
+START = dt.datetime(2020, 7, 20, tzinfo=dt.timezone.utc)
+
+
+def synthetic_data(n_intervals: int) -> Data:
+    """Create a data set of hourly intervals."""
+    intervals = []
+    for hour in range(n_intervals):
+        start_time = START + dt.timedelta(hours=hour)
+        variables = {"air_temperature": Variable("air_temperature", hour % 30, "celsius")}
+        intervals.append(
+            Interval(start_time, start_time + dt.timedelta(hours=1), "clearsky_day", variables)
+        )
+    return Data(START, START, START, {"air_temperature": "celsius"}, intervals)
+
+
+def linear_intervals_between(data: Data, start: dt.datetime, end: dt.datetime) -> List[Interval]:
+    """Find intervals with a linear scan, the previous implementation."""
+    return [interval for interval in data.intervals if start <= interval.start_time < end]
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    random.seed(0)
+    print(f"{'intervals':>10} {'linear (us)':>12} {'bisect (us)':>12} {'speed up':>9}")
+    for n_intervals in (100, 1_000, 10_000, 100_000):
+        data = synthetic_data(n_intervals)
+        windows = []
+        for _ in range(200):
+            start = START + dt.timedelta(hours=random.randrange(n_intervals))
+            windows.append((start, start + dt.timedelta(hours=random.choice((1, 6, 24)))))
+
+        for start, end in windows:
+            assert data.intervals_between(start, end) == linear_intervals_between(data, start, end)
+
+        repeats = max(1, 20_000 // n_intervals)
+        linear = timeit.timeit(
+            lambda: [linear_intervals_between(data, s, e) for s, e in windows], number=repeats
+        )
+        bisect = timeit.timeit(
+            lambda: [data.intervals_between(s, e) for s, e in windows], number=repeats
+        )
+        per_call = 1e6 / (repeats * len(windows))
+        print(
+            f"{n_intervals:>10} {linear * per_call:>12.2f} {bisect * per_call:>12.2f} "
+            f"{linear / bisect:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
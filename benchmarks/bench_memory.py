@@ -0,0 +1,108 @@
+"""Benchmark the memory held by many forecasts, to size deployments.
+
+Forecasts for many places are either loaded from saved synthetic data or
+updated from a local simulation of the MET API, run in another process with
+'python -m metno_locationforecast simulate'. The memory held by the forecasts
+is then measured in two ways, with tracemalloc as the growth in memory
+allocated while creating them, and with metno_locationforecast.diagnostics as
+a breakdown into parsed data and the raw copies of it each forecast keeps.
+
+Run with 'python benchmarks/bench_memory.py --help' for all options.
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from typing import List
+
+from helpers import run_simulator
+
+from metno_locationforecast import diagnostics, synthetic
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "metno-locationforecast-benchmarks/1.0"
+
+
+def new_forecast(i: int, args: argparse.Namespace, directory: str, base_url: str) -> Forecast:
+    """Create the forecast for the i-th place."""
+    return Forecast(
+        Place(f"place{i}", 60 + i / 1000, 10, None),
+        USER_AGENT,
+        args.forecast_type,
+        directory,
+        base_url=base_url,
+        data_cache=False,
+        lean=args.lean,
+    )
+
+
+def make_forecasts(args: argparse.Namespace, directory: str, base_url: str) -> List[Forecast]:
+    """Create forecasts for many places, loading or updating each one."""
+    forecasts = []
+    for i in range(args.places):
+        forecast = new_forecast(i, args, directory, base_url)
+        if args.source == "load":
+            forecast.load()
+        else:
+            forecast.update()
+        forecasts.append(forecast)
+    return forecasts
+
+
+def save(args: argparse.Namespace, directory: str) -> None:
+    """Save synthetic data for each place, to be loaded."""
+    json_string = synthetic.saved_json_string(args.forecast_type, args.intervals)
+    for i in range(args.places):
+        forecast = new_forecast(i, args, directory, "")
+        forecast.storage.put(forecast.file_name, json_string)
+
+
+def measure(args: argparse.Namespace, directory: str, base_url: str) -> None:
+    """Create the forecasts and print the memory they hold."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    forecasts = make_forecasts(args, directory, base_url)
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report = diagnostics.total_memory(forecasts)
+
+    places = args.places
+    mode = f"{args.source}, lean" if args.lean else args.source
+    print(f"{places} {args.forecast_type} forecasts of {args.intervals} intervals ({mode})")
+    print(f"tracemalloc  {(after - before) / places / 1024:>10.1f} KiB per forecast held")
+    print(f"peak         {(peak - before) / places / 1024:>10.1f} KiB per forecast")
+    for part, size in report.as_dict().items():
+        if part != "forecasts":
+            print(f"{part:<12} {size / places / 1024:>10.1f} KiB per forecast")
+    print(f"1000 forecasts hold about {report.total / places * 1000 / 2**20:.0f} MiB")
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--places", type=int, default=200, help="number of forecasts")
+    parser.add_argument("--forecast-type", choices=["compact", "complete"], default="compact")
+    parser.add_argument("--intervals", type=int, default=82, help="intervals per forecast")
+    parser.add_argument(
+        "--source", choices=["load", "update"], default="update", help="how to get the data"
+    )
+    parser.add_argument(
+        "--lean", action="store_true", help="keep only parsed data, see Forecast.lean"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.source == "load":
+            save(args, directory)
+            return measure(args, directory, "")
+
+        with run_simulator(f"--intervals={args.intervals}") as base_url:
+            measure(args, directory, base_url)
+
+
+if __name__ == "__main__":
+    main()
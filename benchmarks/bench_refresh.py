@@ -0,0 +1,74 @@
+"""Benchmark refreshing many forecasts against a local simulation of the MET API.
+
+Runs 'python -m metno_locationforecast simulate' in another process, so that
+the simulator does not compete with the forecasts for the GIL, and updates
+forecasts for many places in a pool of threads. Each round reports the number
+of updates per second and the results of the updates.
+
+Run with 'python benchmarks/bench_refresh.py --help' for all options.
+"""
+
+import argparse
+import concurrent.futures
+import tempfile
+import time
+from collections import Counter
+
+from helpers import run_simulator
+
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "metno-locationforecast-benchmarks/1.0"
+
+
+def update(forecast: Forecast) -> str:
+    """Update a forecast, returning the result or the name of the error raised."""
+    try:
+        return forecast.update()
+    except Exception as error:
+        return type(error).__name__
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--places", type=int, default=500, help="number of places")
+    parser.add_argument("--workers", type=int, default=16, help="number of threads")
+    parser.add_argument("--rounds", type=int, default=2, help="number of times to update")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of 429s")
+    args = parser.parse_args()
+
+    simulator = run_simulator(
+        f"--latency={args.latency}",
+        f"--error-rate={args.error_rate}",
+        f"--throttle-rate={args.throttle_rate}",
+        "--expires-in=0",
+        "--seed=0",
+    )
+    with simulator as base_url, tempfile.TemporaryDirectory() as directory:
+        forecasts = [
+            Forecast(
+                Place(f"place{i}", 60 + i / 1000, 10, None),
+                USER_AGENT,
+                "compact",
+                directory,
+                base_url=base_url,
+            )
+            for i in range(args.places)
+        ]
+        with concurrent.futures.ThreadPoolExecutor(args.workers) as executor:
+            for round in range(args.rounds):
+                start = time.perf_counter()
+                results = Counter(executor.map(update, forecasts))
+                duration = time.perf_counter() - start
+                print(
+                    f"round {round + 1}: {args.places / duration:.0f} updates/s "
+                    f"({duration:.2f}s) {dict(results)}"
+                )
+
+
+if __name__ == "__main__":
+    main()
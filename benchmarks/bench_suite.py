@@ -0,0 +1,202 @@
+"""Benchmark the hot paths of parsing, loading, saving, querying and converting data.
+
+Forecasts are built from synthetic 'compact' and 'complete' payloads of
+increasing size. For each benchmark the time per call, the throughput in
+intervals per second and the peak memory allocated during one call are
+recorded. Results are written as json so that runs of different versions can
+be compared, e.g.
+
+    python benchmarks/bench_suite.py --output before.json
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+
+Run with 'python benchmarks/bench_suite.py --help' for all options.
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from metno_locationforecast import synthetic
+from metno_locationforecast.data_containers import Place, Variable
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "metno-locationforecast-benchmarks/1.0"
+START = dt.datetime(2020, 7, 20, 11, tzinfo=dt.timezone.utc)
+
+
+def measure(
+    function: Callable[..., Any], repeats: int, setup: Optional[Callable[[], Any]] = None
+) -> Dict[str, float]:
+    """Time a function, returning the best time per call and the peak memory of one call.
+
+    If setup is given it is called before each call, outside of the timing,
+    and its result is passed to the function.
+    """
+    times = []
+    for _ in range(repeats):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument) if setup is not None else function()
+        times.append(time.perf_counter() - start)
+
+    argument = setup() if setup is not None else None
+    tracemalloc.start()
+    function(argument) if setup is not None else function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(times), "peak_memory_bytes": peak}
+
+
+def make_forecast(forecast_type: str, intervals: int, save_location: Path) -> Forecast:
+    """Create a forecast with saved and parsed synthetic data."""
+    place = Place(f"{forecast_type}{intervals}", 59.9, 10.8, intervals)
+    forecast = Forecast(
+        place, USER_AGENT, forecast_type, str(save_location), storage="filesystem", data_cache=False
+    )
+    json_string = synthetic.saved_json_string(forecast_type, intervals, start=START)
+    forecast.storage.put(forecast.file_name, json_string)
+    forecast.load()
+    return forecast
+
+
+def benchmarks(forecast: Forecast, queries: int) -> Dict[str, Callable[[int], Dict[str, float]]]:
+    """Return functions running each benchmark for a forecast, given a number of repeats."""
+    rng = random.Random(0)
+    intervals = forecast.data.intervals
+    first, last = intervals[0].start_time, intervals[-1].start_time
+    hours = int((last - first).total_seconds() // 3600)
+    windows = []
+    for _ in range(queries):
+        start = first + dt.timedelta(hours=rng.randrange(hours + 1))
+        windows.append((start, start + dt.timedelta(hours=rng.choice((1, 6, 24)))))
+    days = sorted({interval.start_time.date() for interval in intervals})
+    query_days = [rng.choice(days) for _ in range(queries)]
+
+    def copies() -> List[Variable]:
+        return [
+            Variable(variable.name, variable.value, variable.units)
+            for interval in intervals
+            for variable in interval.variables.values()
+            if variable.units == "celsius"
+        ]
+
+    return {
+        "parse": lambda repeats: measure(forecast._parse_json, repeats),
+        "load": lambda repeats: measure(forecast.load, repeats),
+        "save": lambda repeats: measure(forecast.save, repeats),
+        "intervals_between": lambda repeats: measure(
+            lambda: [forecast.data.intervals_between(s, e) for s, e in windows], repeats
+        ),
+        "intervals_for": lambda repeats: measure(
+            lambda: [forecast.data.intervals_for(day) for day in query_days], repeats
+        ),
+        "convert_to": lambda repeats: measure(
+            lambda variables: [variable.convert_to("fahrenheit") for variable in variables],
+            repeats,
+            setup=copies,
+        ),
+        "str": lambda repeats: measure(lambda: str(forecast), repeats),
+    }
+
+
+def run(sizes: List[int], repeats: int, queries: int, only: Optional[List[str]]) -> Dict[str, Any]:
+    """Run all benchmarks, returning the results."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for forecast_type in ("compact", "complete"):
+            for intervals in sizes:
+                forecast = make_forecast(forecast_type, intervals, Path(directory))
+                for name, benchmark in benchmarks(forecast, queries).items():
+                    if only and name not in only:
+                        continue
+                    result = benchmark(max(1, repeats * 1000 // intervals))
+                    calls = queries if name.startswith("intervals_") else 1
+                    results.append(
+                        {
+                            "benchmark": name,
+                            "forecast_type": forecast_type,
+                            "intervals": intervals,
+                            "seconds_per_call": result["seconds"] / calls,
+                            "intervals_per_second": intervals * calls / result["seconds"],
+                            "peak_memory_bytes": result["peak_memory_bytes"],
+                        }
+                    )
+                    print(_format(results[-1]), file=sys.stderr)
+
+    try:
+        version = metadata.version("metno-locationforecast")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "results": results,
+    }
+
+
+def _format(result: Dict[str, Any]) -> str:
+    seconds, memory = result["seconds_per_call"], result["peak_memory_bytes"]
+    return (
+        f"{result['benchmark']:<18} {result['forecast_type']:<9} {result['intervals']:>7} "
+        f"{seconds * 1e6:>12.1f}us {memory / 1024:>10.1f}KiB"
+    )
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the change in time and memory of each benchmark against a baseline."""
+    previous = {
+        (result["benchmark"], result["forecast_type"], result["intervals"]): result
+        for result in baseline["results"]
+    }
+    print(f"compared with version {baseline['version']} ({baseline['created']}):")
+    for result in results["results"]:
+        key = (result["benchmark"], result["forecast_type"], result["intervals"])
+        if key not in previous:
+            continue
+        time_ratio = result["seconds_per_call"] / previous[key]["seconds_per_call"]
+        memory_ratio = result["peak_memory_bytes"] / max(1, previous[key]["peak_memory_bytes"])
+        print(
+            f"{key[0]:<18} {key[1]:<9} {key[2]:>7} "
+            f"time {time_ratio:>6.2f}x memory {memory_ratio:>6.2f}x"
+        )
+
+
+def main() -> None:
+    """Run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[82, 1_000, 10_000], help="numbers of intervals"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=20, help="repeats for 1000 intervals, scaled by size"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="number of interval queries")
+    parser.add_argument("--only", nargs="+", help="names of benchmarks to run")
+    parser.add_argument("--output", type=Path, help="file to write results to, default stdout")
+    parser.add_argument("--compare", type=Path, help="results of a previous run to compare with")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeats, args.queries, args.only)
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output)
+    if args.compare is not None:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Helpers shared by the benchmarks and the import time tests.
+
+Functions:
+    free_port: Get a port that is free to listen on
+    wait_for: Wait until something is listening on a port
+    run_simulator: Run a simulation of the MET API in another process
+    import_times: Time an import in a new interpreter
+"""
+
+import contextlib
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator
+
+
+def free_port() -> int:
+    """Return a port that is free to listen on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def wait_for(port: int, timeout: float = 10) -> None:
+    """Wait until something is listening on a port."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+@contextlib.contextmanager
+def run_simulator(*options: str) -> Iterator[str]:
+    """Run 'python -m metno_locationforecast simulate' with options, yielding its base url.
+
+    The simulator runs in another process so that it does not compete with the
+    benchmark for the GIL.
+    """
+    port = free_port()
+    simulator = subprocess.Popen(
+        [sys.executable, "-m", "metno_locationforecast", "simulate", f"--port={port}", *options],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+        yield f"http://127.0.0.1:{port}/weatherapi/locationforecast/2.0/"
+    finally:
+        simulator.terminate()
+        simulator.wait()
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Import a module in a new interpreter, returning cumulative times in us by module.
+
+    Modules imported at start up by site are left out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if name.strip() == "site":
+            times.clear()
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
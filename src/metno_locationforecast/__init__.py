@@ -7,9 +7,45 @@ Classes:
 Modules:
     forecast: Holds the Forecast class
     data_containers: Holds classes for storing data
+    storage: Holds storage backends for caching data
+    cache: Holds an in process cache of parsed data
+    maintenance: Holds tools for evicting cached data
+    manifest: Holds an index of saved forecasts
+    warmup: Holds tools for loading many forecasts in parallel
+    aggregation: Holds daily and windowed reductions of forecast data
+    resample: Holds resampling of forecast data onto a uniform time grid
+    fleet: Holds queries over forecasts for many places
+    units: Holds conversions between units of measurement
+    hooks: Holds instrumentation hooks for timing loads and updates
+    metrics: Holds counters and histograms with Prometheus exposition
+    synthetic: Holds synthetic forecast data shaped like MET API responses
+    simulator: Holds a local server simulating the MET API
+    diagnostics: Holds reports of the memory used by forecasts
+    proxy: Holds a caching proxy for the MET API
+    cli: Holds the command line interface
 """
 
 from .forecast import Forecast
 from .data_containers import Place
 
-__all__ = ["Place", "Forecast", "forecast", "data_containers"]
+__all__ = [
+    "Place",
+    "Forecast",
+    "forecast",
+    "data_containers",
+    "storage",
+    "cache",
+    "maintenance",
+    "manifest",
+    "warmup",
+    "aggregation",
+    "resample",
+    "fleet",
+    "units",
+    "hooks",
+    "metrics",
+    "synthetic",
+    "simulator",
+    "diagnostics",
+    "proxy",
+]
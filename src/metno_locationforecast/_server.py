@@ -0,0 +1,152 @@
+"""Plumbing shared by the local servers, the simulator and the proxy.
+
+Classes:
+    Server: Base class of local servers at the URL shape of the MET API
+    RequestHandler: Base class of the request handlers of a server
+
+Functions:
+    parse_coordinates: Get the coordinates in a query string
+"""
+
+import functools
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, TypeVar, Union
+
+from ._utils import parse_number
+
+PATH = "/weatherapi/locationforecast/2.0/"
+
+S = TypeVar("S", bound="Server")
+
+
+class Server:
+    """Base class of local servers at the URL shape of the MET API.
+
+    Subclasses define a _make_body method, whose results are cached by _body.
+
+    Attributes:
+        address: Address the server listens on.
+        port: Port the server listens on.
+        status_codes: Number of responses by status code.
+
+    Methods:
+        start: Start serving in a background thread.
+        stop: Stop serving.
+        serve_forever: Serve in the current thread until interrupted.
+    """
+
+    _make_body: Callable[..., Any]
+
+    def __init__(self, handler: Type["RequestHandler"], port: int, address: str):
+        """Create a Server object, the server listens once it is created.
+
+        Args:
+            handler: Request handler class, its owner is set to this server.
+            port: Port to listen on, 0 for any free port.
+            address: Address to listen on.
+        """
+        self.status_codes: Dict[int, int] = Counter()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        handler.owner = self
+        self._server = ThreadingHTTPServer((address, port), handler)
+        self._server.daemon_threads = True
+        self.address = str(self._server.server_address[0])
+        self.port = int(self._server.server_address[1])
+        # Bodies are cached so that serving a forecast costs little more than sending it.
+        self._body = functools.lru_cache(maxsize=1024)(self._make_body)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.url})"
+
+    def __enter__(self: S) -> S:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """Base url to use for forecasts."""
+        return f"http://{self.address}:{self.port}{PATH}"
+
+    def start(self: S) -> S:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the server."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def _count(self, counter: Dict[int, int], status_code: int) -> None:
+        with self._lock:
+            counter[status_code] += 1
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Base class of the request handlers of a server, responses are counted by the server."""
+
+    owner: Server
+
+    def _error(self, status_code: int, message: str) -> None:
+        body = json.dumps({"error": message}).encode()
+        self._send(status_code, {"Content-Type": "application/json"}, body)
+
+    def _send(self, status_code: int, headers: Mapping[str, Optional[str]], body: bytes) -> None:
+        """Send a response, headers that are None are left out."""
+        self.owner._count(self.owner.status_codes, status_code)
+        self.send_response(status_code)
+        for name, value in headers.items():
+            if value is not None:
+                self.send_header(name, value)
+        if status_code != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def parse_coordinates(
+    query: Dict[str, List[str]],
+) -> Tuple[Union[float, int], Union[float, int], Optional[int]]:
+    """Return the latitude, longitude and altitude in a query string.
+
+    Coordinates sent as integers are kept as integers, so that they give the
+    same keys as a Forecast for a Place with those coordinates.
+
+    Raises:
+        KeyError: If there is no latitude or longitude.
+        ValueError: If a coordinate is not a number.
+    """
+    latitude = parse_number(query["lat"][0])
+    longitude = parse_number(query["lon"][0])
+    altitude = int(float(query["altitude"][0])) if "altitude" in query else None
+    return latitude, longitude, altitude
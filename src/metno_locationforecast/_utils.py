@@ -0,0 +1,66 @@
+"""Small helpers shared by modules of the package.
+
+Functions:
+    parse_number: Parse a coordinate, keeping integers as integers
+    as_utc: Treat naive datetimes as UTC
+    header_datetime: Get the datetime in an HTTP header
+    import_numpy: Get the numpy module if it is installed
+"""
+
+import datetime as dt
+from typing import Any, Dict, Optional, Union
+
+_NUMPY: Any = None
+
+
+def parse_number(value: str) -> Union[float, int]:
+    """Parse a number, keeping integers as integers.
+
+    Keys of saved forecasts are made from coordinates as given, e.g. 'lat60'
+    for a Place with latitude 60 and 'lat60.0' for latitude 60.0, so
+    coordinates parsed from text keep their type to give the same keys.
+
+    Raises:
+        ValueError: If value is not a number.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def as_utc(time: dt.datetime) -> dt.datetime:
+    """Return time with the UTC time zone if it is naive, otherwise unchanged."""
+    if time.tzinfo is None:
+        return time.replace(tzinfo=dt.timezone.utc)
+    return time
+
+
+def header_datetime(headers: Dict[str, str], name: str) -> Optional[dt.datetime]:
+    """Return the datetime in the named HTTP header, None if it is missing or invalid."""
+    from email.utils import parsedate_to_datetime
+
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def import_numpy() -> Any:
+    """Return the numpy module, None if it is not installed.
+
+    numpy is imported on first use, it is an optional dependency and slow to
+    import.
+    """
+    global _NUMPY
+    if _NUMPY is None:
+        try:
+            import numpy
+        except ImportError:
+            _NUMPY = False
+        else:
+            _NUMPY = numpy
+    return _NUMPY or None
@@ -0,0 +1,328 @@
+"""Reductions of forecast variables per day or time window.
+
+Values are taken from each variable's column of values, see Data._column, and
+reduced for all periods at once. numpy is used when it is installed, otherwise
+the reductions are computed in pure Python.
+
+Intervals are assigned to the period their start time falls in, the same as
+Data.intervals_for. Forecasts mix intervals of 1, 6 and 12 hours so:
+
+- means are weighted by the time until the next interval, so a 6 hour step
+  counts six times as much as a 1 hour step;
+- sums count the amount of each interval once, or the share of it not covered
+  by the next interval should interval periods overlap.
+
+Classes:
+    Aggregation: Reductions of variables per period, stored by column
+
+Functions:
+    aggregate: Compute reductions of variables per day or time window
+
+Attributes:
+    REDUCTIONS: Names of the supported reductions
+"""
+
+import datetime as dt
+import math
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ._utils import as_utc, import_numpy
+
+if TYPE_CHECKING:
+    from zoneinfo import ZoneInfo
+
+    from .data_containers import Data
+
+REDUCTIONS = ("min", "max", "mean", "sum")
+
+Period = Union[dt.date, dt.datetime]
+
+
+class Aggregation:
+    """Reductions of variables per period, stored by column.
+
+    Attributes:
+        periods: Dates, or for time windows the start of each window, in
+            chronological order.
+        units: A dictionary mapping variable names to their units.
+        values: Values indexed by variable name then reduction, each a list
+            aligned with periods. Values are None for periods in which the
+            variable has no values.
+
+    Methods:
+        for_period: Get values for a single period.
+    """
+
+    def __init__(
+        self,
+        periods: List[Period],
+        units: Dict[str, Optional[str]],
+        values: Dict[str, Dict[str, List[Optional[float]]]],
+    ):
+        """Create an Aggregation object.
+
+        Args:
+            periods: Dates, or for time windows the start of each window, in
+                chronological order.
+            units: A dictionary mapping variable names to their units.
+            values: Values indexed by variable name then reduction, each a
+                list aligned with periods.
+        """
+        self.periods = periods
+        self.units = units
+        self.values = values
+
+    def __repr__(self) -> str:
+        return f"Aggregation({self.periods}, {self.units}, {self.values})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Aggregation):
+            return (
+                self.periods == other.periods
+                and self.units == other.units
+                and self.values == other.values
+            )
+        return NotImplemented
+
+    def __getitem__(self, name: str) -> Dict[str, List[Optional[float]]]:
+        return self.values[name]
+
+    def for_period(self, period: Period) -> Dict[str, Dict[str, Optional[float]]]:
+        """Return values for a single period indexed by variable name then reduction."""
+        i = self.periods.index(period)
+        return {
+            name: {reduction: column[i] for reduction, column in reductions.items()}
+            for name, reductions in self.values.items()
+        }
+
+
+def _requested_reductions(
+    variables: Union[str, Iterable[str], Mapping[str, Union[str, Iterable[str]]]],
+    reductions: Union[str, Iterable[str], None],
+) -> Dict[str, Tuple[str, ...]]:
+    """Return the reductions to compute for each variable."""
+
+    def as_tuple(names: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+        if names is None:
+            return REDUCTIONS
+        names = (names,) if isinstance(names, str) else tuple(names)
+        for name in names:
+            if name not in REDUCTIONS:
+                msg = f"{name} is not a valid reduction, valid reductions are {REDUCTIONS}."
+                raise ValueError(msg)
+        return names
+
+    if isinstance(variables, str):
+        return {variables: as_tuple(reductions)}
+    if isinstance(variables, Mapping):
+        return {name: as_tuple(names) for name, names in variables.items()}
+    return {name: as_tuple(reductions) for name in variables}
+
+
+def _segments(
+    data: "Data",
+    times: List[dt.datetime],
+    period: Union[str, dt.timedelta],
+    tzinfo: Union[dt.timezone, "ZoneInfo"],
+    ordered: bool,
+) -> Tuple[List[Period], List[int]]:
+    """Return the periods and the index of the first interval in each period."""
+    if period == "day" and ordered:
+        index = data._day_index(tzinfo)
+        if index is not None:
+            return list(index), [first for first, _ in index.values()]
+
+    labels: List[Period]
+    if period == "day":
+        labels = [time.astimezone(tzinfo).date() for time in times]
+    elif isinstance(period, dt.timedelta) and period > dt.timedelta(0):
+        first_day = times[0].astimezone(tzinfo).date()
+        origin = dt.datetime(first_day.year, first_day.month, first_day.day, tzinfo=tzinfo)
+        origin = origin.astimezone(dt.timezone.utc)
+        labels = [
+            (origin + ((time - origin) // period) * period).astimezone(tzinfo) for time in times
+        ]
+    else:
+        raise ValueError(f"Period should be 'day' or a positive timedelta, got {period}.")
+
+    periods: List[Period] = []
+    starts: List[int] = []
+    for i, label in enumerate(labels):
+        if not periods or label != periods[-1]:
+            periods.append(label)
+            starts.append(i)
+    return periods, starts
+
+
+def _weights(times: List[dt.datetime], durations: List[float]) -> Tuple[List[float], List[float]]:
+    """Return the step to the next interval, in seconds, and the share of each interval's
+    amount not covered by the next interval."""
+    steps: List[float] = []
+    for time, next_time in zip(times, times[1:]):
+        steps.append((next_time - time).total_seconds())
+    if times:
+        steps.append(durations[-1] or (steps[-1] if steps else 1.0))
+
+    shares = [
+        min(1.0, step / duration) if duration > 0 else 1.0
+        for step, duration in zip(steps, durations)
+    ]
+    return steps, shares
+
+
+def _reduce_python(
+    column: Sequence[float],
+    steps: Sequence[float],
+    shares: Sequence[float],
+    bounds: List[Tuple[int, int]],
+    reductions: Tuple[str, ...],
+) -> Dict[str, List[Optional[float]]]:
+    results: Dict[str, List[Optional[float]]] = {reduction: [] for reduction in reductions}
+    for first, last in bounds:
+        present = [
+            (column[i], steps[i], shares[i])
+            for i in range(first, last)
+            if not math.isnan(column[i])
+        ]
+        for reduction in reductions:
+            value: Optional[float] = None
+            if present:
+                if reduction == "min":
+                    value = min(v for v, _, _ in present)
+                elif reduction == "max":
+                    value = max(v for v, _, _ in present)
+                elif reduction == "sum":
+                    value = sum(v * share for v, _, share in present)
+                else:
+                    weight = sum(step for _, step, _ in present)
+                    if weight > 0:
+                        value = sum(v * step for v, step, _ in present) / weight
+            results[reduction].append(value)
+    return results
+
+
+def _reduce_numpy(
+    np: Any,
+    column: Sequence[float],
+    steps: Sequence[float],
+    shares: Sequence[float],
+    starts: List[int],
+    reductions: Tuple[str, ...],
+) -> Dict[str, List[Optional[float]]]:
+    values = np.asarray(column, dtype=float)
+    present = ~np.isnan(values)
+    indices = np.asarray(starts, dtype=np.intp)
+    empty = np.add.reduceat(present.astype(np.intp), indices) == 0
+
+    results: Dict[str, List[Optional[float]]] = {}
+    for reduction in reductions:
+        if reduction == "min":
+            reduced = np.minimum.reduceat(np.where(present, values, np.inf), indices)
+        elif reduction == "max":
+            reduced = np.maximum.reduceat(np.where(present, values, -np.inf), indices)
+        elif reduction == "sum":
+            amounts = np.where(present, values * np.asarray(shares), 0.0)
+            reduced = np.add.reduceat(amounts, indices)
+        else:
+            weights = np.where(present, np.asarray(steps), 0.0)
+            totals = np.add.reduceat(np.where(present, values, 0.0) * weights, indices)
+            weight = np.add.reduceat(weights, indices)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                reduced = totals / weight
+            reduced[weight == 0] = np.nan
+        reduced[empty] = np.nan
+        results[reduction] = [None if math.isnan(v) else v for v in reduced.tolist()]
+    return results
+
+
+def aggregate(
+    data: "Data",
+    variables: Union[str, Iterable[str], Mapping[str, Union[str, Iterable[str]]]],
+    reductions: Union[str, Iterable[str], None] = None,
+    period: Union[str, dt.timedelta] = "day",
+    tzinfo: Union[dt.timezone, "ZoneInfo"] = dt.timezone.utc,
+    vectorize: Optional[bool] = None,
+) -> Aggregation:
+    """Compute reductions of variables per day or time window.
+
+    Args:
+        data: Data to aggregate.
+        variables: Name of a variable, names of variables or a mapping of
+            variable names to the reductions to compute for each.
+        reductions: Optional; Name or names of reductions to compute, one or
+            more of "min", "max", "mean" and "sum". Defaults to all of them,
+            ignored if variables is a mapping.
+        period: Optional; "day" to aggregate per local date, or a timedelta to
+            aggregate per window of that length starting at local midnight of
+            the first day. Defaults to "day".
+        tzinfo: Optional; Time zone of days and windows, defaults to UTC.
+        vectorize: Optional; Whether to compute with numpy, defaults to
+            whether numpy is installed.
+
+    Returns:
+        An Aggregation with a value for every period that has intervals.
+    """
+    requested = _requested_reductions(variables, reductions)
+
+    np = import_numpy() if vectorize is None or vectorize else None
+    if vectorize and np is None:
+        raise ImportError("numpy is required to vectorize aggregation.")
+
+    ordered = data._start_times() is not None
+    order: Sequence[int] = range(len(data.intervals))
+    if not ordered:
+        order = sorted(
+            range(len(data.intervals)), key=lambda i: as_utc(data.intervals[i].start_time)
+        )
+
+    periods: List[Period] = []
+    starts: List[int] = []
+    steps: List[float] = []
+    shares: List[float] = []
+    if data.intervals:
+        times = [as_utc(data.intervals[i].start_time) for i in order]
+        durations = [data.intervals[i].duration.total_seconds() for i in order]
+        periods, starts = _segments(data, times, period, tzinfo, ordered)
+        if ordered:
+            steps, shares = data._cached(("weights",), lambda: _weights(times, durations))
+        else:
+            steps, shares = _weights(times, durations)
+    bounds = list(zip(starts, starts[1:] + [len(data.intervals)]))
+
+    units: Dict[str, Optional[str]] = {}
+    values: Dict[str, Dict[str, List[Optional[float]]]] = {}
+    for name, names in requested.items():
+        column: Sequence[float] = data._column(name)
+        if not ordered:
+            column = array("d", (column[i] for i in order))
+        if name not in data.units and all(math.isnan(value) for value in column):
+            raise KeyError(f"{name} is not a variable of the data.")
+
+        units[name] = next(
+            (
+                interval.variables[name].units
+                for interval in data.intervals
+                if name in interval.variables
+            ),
+            data.units.get(name),
+        )
+        if not periods:
+            values[name] = {reduction: [] for reduction in names}
+        elif np is not None:
+            values[name] = _reduce_numpy(np, column, steps, shares, starts, names)
+        else:
+            values[name] = _reduce_python(column, steps, shares, bounds, names)
+
+    return Aggregation(periods, units, values)
@@ -0,0 +1,161 @@
+"""An in process cache of parsed forecast data.
+
+Parsing saved json is the most expensive part of loading a forecast. The cache
+lets forecasts for the same place share one parsed Data object until it
+expires.
+
+Classes:
+    DataCache: LRU cache of Data objects with expiry tied to Data.expires
+
+Attributes:
+    DATA_CACHE: The process wide DataCache used by forecasts
+"""
+
+import datetime as dt
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from .data_containers import Data
+
+
+class DataCache:
+    """LRU cache of Data objects with expiry tied to Data.expires.
+
+    Entries are evicted, least recently used first, when there are more than
+    max_entries of them or their total size exceeds max_bytes. Entries are
+    dropped once their data has expired. Safe to share between threads.
+
+    Note that cached Data objects are shared by every forecast that reads them,
+    they should not be modified in place.
+
+    Attributes:
+        max_entries: Maximum number of entries, None for no limit.
+        max_bytes: Maximum total size of entries in bytes, None for no limit.
+        hits: Number of lookups that found fresh data.
+        misses: Number of lookups that did not find fresh data.
+        evictions: Number of entries evicted to respect the size limits.
+        expirations: Number of entries dropped because their data expired.
+
+    Methods:
+        get: Get fresh data from the cache.
+        put: Add data to the cache.
+        invalidate: Remove an entry from the cache.
+        clear: Remove all entries from the cache.
+        stats: Get the cache counters.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 256, max_bytes: Optional[int] = None):
+        """Create an empty DataCache.
+
+        Args:
+            max_entries: Optional; Maximum number of entries, None for no limit.
+            max_bytes: Optional; Maximum total size of entries in bytes, None
+                for no limit.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Data, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"DataCache(max_entries={self.max_entries}, max_bytes={self.max_bytes})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, now: Optional[dt.datetime] = None) -> Optional[Data]:
+        """Return fresh data stored under key, None if there is no fresh data.
+
+        Args:
+            key: Identity of the forecast.
+            now: Optional; Time to check expiry against, defaults to the current
+                time.
+        """
+        if now is None:
+            now = dt.datetime.now(dt.timezone.utc)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            data, size = entry
+            if data.expires < now:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: Hashable, data: Data, size: int = 0) -> None:
+        """Add data to the cache, replacing any existing entry for key.
+
+        Args:
+            key: Identity of the forecast.
+            data: Parsed data to store.
+            size: Optional; Size of the entry in bytes, used for the max_bytes
+                limit. Typically the length of the json the data was parsed
+                from.
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (data, size)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the size limits are met."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove the entry for key, return True if there was one."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries, the counters are not reset."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache counters along with the current number of entries and bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+DATA_CACHE = DataCache()
@@ -0,0 +1,494 @@
+"""Command line interface.
+
+Run with 'python -m metno_locationforecast' or 'metno-locationforecast'.
+
+Commands:
+    gc: Evict stale, excess or inactive entries from the cache
+    manifest: List the forecasts in a save location
+    simulate: Run a local server simulating the MET API
+    serve: Run a caching proxy for the MET API
+    refresh: Refresh forecasts for places read from a file and write their intervals
+
+Functions:
+    main: Entry point for the command line interface
+    read_places: Read places from a csv file
+    bounded_map: Call a function on items in a pool of threads in constant memory
+    interval_rows: Get a row for each interval of a forecast
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import datetime as dt
+import json
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+    TypeVar,
+)
+
+from ._utils import parse_number
+from .config import Config, get_config
+from .data_containers import Data, Place
+from .forecast import Forecast
+from .maintenance import GarbageCollector
+from .manifest import Manifest
+from .storage import STORAGE_TYPES, FileSystemStorage, get_storage
+
+SIZE_SUFFIXES = {"k": 1024, "m": 1024**2, "g": 1024**3}
+INTERVAL_FIELDS = [
+    "name",
+    "latitude",
+    "longitude",
+    "altitude",
+    "start_time",
+    "end_time",
+    "symbol_code",
+]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def parse_size(value: str) -> int:
+    """Parse a size in bytes with an optional K, M or G suffix."""
+    value = value.strip().lower().rstrip("b")
+    multiplier = 1
+    if value and value[-1] in SIZE_SUFFIXES:
+        multiplier = SIZE_SUFFIXES[value[-1]]
+        value = value[:-1]
+    try:
+        return int(float(value) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} is not a valid size.")
+
+
+def read_places(
+    file: TextIO, on_error: Optional[Callable[[List[str], ValueError], None]] = None
+) -> Iterator[Place]:
+    """Read places from a csv file.
+
+    Each row holds a name, latitude, longitude and optionally altitude. A header
+    row, with 'name' in the first column, is skipped.
+
+    Args:
+        file: File to read.
+        on_error: Optional; Function called with each invalid row and the
+            error, after which reading carries on. Defaults to raising the
+            error.
+
+    Raises:
+        ValueError: If a row is invalid and on_error is not given.
+    """
+    for row in csv.reader(file):
+        if not row or row[0].strip().lower() == "name":
+            continue
+        try:
+            if len(row) < 3:
+                raise ValueError("A name, latitude and longitude are required.")
+            # Integers are kept so that places match the keys of their saved data.
+            name, latitude, longitude = row[0], parse_number(row[1]), parse_number(row[2])
+            altitude = int(float(row[3])) if len(row) > 3 and row[3].strip() else None
+        except ValueError as error:
+            if on_error is None:
+                raise
+            on_error(row, error)
+            continue
+        yield Place(name, latitude, longitude, altitude)
+
+
+def _add_storage_arguments(parser: argparse.ArgumentParser, config: Config) -> None:
+    parser.add_argument(
+        "--save-location",
+        default=config.save_location,
+        help=f"location of cached data (default: {config.save_location})",
+    )
+    parser.add_argument(
+        "--storage",
+        default=config.storage,
+        choices=sorted(STORAGE_TYPES),
+        help=f"type of storage backend (default: {config.storage})",
+    )
+
+
+def _gc(args: argparse.Namespace) -> int:
+    keep: Optional[List[Place]] = None
+    if args.keep is not None:
+        with open(args.keep, newline="") as file:
+            keep = list(read_places(file))
+
+    storage = get_storage(args.storage, args.save_location)
+    collector = GarbageCollector(
+        storage,
+        max_age=None if args.max_age is None else dt.timedelta(hours=args.max_age),
+        max_size=args.max_size,
+        keep=keep,
+    )
+
+    while not collector.done:
+        for key, reason in collector.step(args.batch_size):
+            print(f"{reason}\t{key}")
+        if args.pause and not collector.done:
+            time.sleep(args.pause)
+
+    if isinstance(storage, FileSystemStorage):
+        storage.manifest.compact()
+
+    print(f"Evicted {len(collector.evicted)} entries.", file=sys.stderr)
+    return 0
+
+
+def _manifest(args: argparse.Namespace) -> int:
+    manifest = Manifest(args.save_location)
+    if args.rebuild:
+        manifest.rebuild(FileSystemStorage(args.save_location))
+    elif args.compact:
+        manifest.compact()
+
+    for entry in manifest.entries(args.fresh).values():
+        print(f"{entry.key}\t{entry.expires}\t{entry.last_modified}\t{entry.size}")
+    return 0
+
+
+def _simulate(args: argparse.Namespace) -> int:
+    # Imported here so that other commands do not pay for importing http.server.
+    from .simulator import Simulator
+
+    simulator = Simulator(
+        port=args.port,
+        address=args.address,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        expires_in=dt.timedelta(minutes=args.expires_in),
+        update_interval=dt.timedelta(minutes=args.update_interval),
+        intervals=args.intervals,
+        seed=args.seed,
+    )
+    print(f"Simulating the MET API at {simulator.url}", file=sys.stderr)
+    simulator.serve_forever()
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    # Imported here so that other commands do not pay for importing requests and http.server.
+    from .proxy import Proxy
+
+    proxy = Proxy(
+        get_storage(args.storage, args.save_location),
+        upstream=args.upstream,
+        user_agent=args.user_agent,
+        port=args.port,
+        address=args.address,
+        timeout=args.timeout,
+    )
+    print(f"Serving {proxy.upstream} at {proxy.url}", file=sys.stderr)
+    proxy.serve_forever()
+    return 0
+
+
+def bounded_map(
+    function: Callable[[T], R], items: Iterable[T], max_workers: int
+) -> Iterator[Tuple[T, "concurrent.futures.Future[R]"]]:
+    """Call a function on items in a pool of threads, yielding each item and future once done.
+
+    Items are taken from the iterable as threads become free, with at most
+    twice max_workers items in progress, so that any number of items can be
+    processed in constant memory. Results are yielded in the order they are
+    done.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        pending: Dict["concurrent.futures.Future[R]", T] = {}
+        for item in items:
+            if len(pending) >= 2 * max_workers:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield pending.pop(future), future
+            pending[executor.submit(function, item)] = item
+        for future in concurrent.futures.as_completed(pending):
+            yield pending[future], future
+
+
+def interval_rows(place: Place, data: Data) -> Iterator[Dict[str, Any]]:
+    """Yield a row for each interval of a forecast, with a column for each variable."""
+    coordinates = place.coordinates
+    for interval in data.intervals:
+        row: Dict[str, Any] = {
+            "name": place.name,
+            "latitude": coordinates["latitude"],
+            "longitude": coordinates["longitude"],
+            "altitude": coordinates["altitude"],
+            "start_time": interval.start_time.isoformat(),
+            "end_time": interval.end_time.isoformat(),
+            "symbol_code": interval.symbol_code,
+        }
+        for name, variable in interval.variables.items():
+            row[name] = variable.value
+        yield row
+
+
+def _refresh(args: argparse.Namespace) -> int:
+    if args.user_agent is None:
+        print("A user agent is required, set it with --user-agent.", file=sys.stderr)
+        return 2
+    window = None if args.hours is None else dt.timedelta(hours=args.hours)
+
+    def update(place: Place) -> Forecast:
+        # Lean forecasts without a data cache so that finished places are freed.
+        forecast = Forecast(
+            place,
+            args.user_agent,
+            args.forecast_type,
+            args.save_location,
+            args.base_url,
+            storage=args.storage,
+            data_cache=False,
+            variables=args.variables,
+            window=window,
+            lean=True,
+        )
+        forecast.update()
+        return forecast
+
+    invalid = []
+
+    def invalid_row(row: List[str], error: ValueError) -> None:
+        # Invalid rows are reported like failed places rather than ending the run.
+        invalid.append(row)
+        print(f"error\t{','.join(row)}\t{type(error).__name__}: {error}", file=sys.stderr)
+
+    with args.places as file:
+        places = read_places(file, invalid_row)
+        writer: Optional[csv.DictWriter[str]] = None
+        done, failed = 0, 0
+        for place, result in bounded_map(update, places, args.workers):
+            try:
+                data = result.result().data
+            except Exception as error:
+                failed += 1
+                print(f"error\t{place.name}\t{type(error).__name__}: {error}", file=sys.stderr)
+                continue
+
+            if args.format == "ndjson":
+                for row in interval_rows(place, data):
+                    sys.stdout.write(json.dumps(row) + "\n")
+            else:
+                if writer is None:
+                    variables: Set[str] = set(args.variables or data.units)
+                    writer = csv.DictWriter(
+                        sys.stdout, INTERVAL_FIELDS + sorted(variables), extrasaction="ignore"
+                    )
+                    writer.writeheader()
+                writer.writerows(interval_rows(place, data))
+            sys.stdout.flush()
+            done += 1
+
+    failed += len(invalid)
+    print(f"Refreshed {done} places, {failed} failed.", file=sys.stderr)
+    return 0 if failed == 0 else 1
+
+
+def build_parser(config: Optional[Config] = None) -> argparse.ArgumentParser:
+    """Build the argument parser, defaults are taken from config."""
+    if config is None:
+        config = get_config()
+
+    parser = argparse.ArgumentParser(
+        prog="metno-locationforecast",
+        description="Tools for the MET Norway Locationforecast/2.0 service.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gc = subparsers.add_parser("gc", help="evict stale, excess or inactive entries from the cache")
+    _add_storage_arguments(gc, config)
+    gc.add_argument(
+        "--max-age",
+        type=float,
+        help="evict entries that expired more than this many hours ago",
+    )
+    gc.add_argument(
+        "--max-size",
+        type=parse_size,
+        help="evict least recently used entries while the cache is larger than this, e.g. 500M",
+    )
+    gc.add_argument(
+        "--keep",
+        help="csv file of places (name, latitude, longitude, altitude) to keep, "
+        + "entries for other places are evicted",
+    )
+    gc.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="number of entries to process per step (default: 100)",
+    )
+    gc.add_argument(
+        "--pause",
+        type=float,
+        default=0,
+        help="seconds to pause between steps (default: 0)",
+    )
+    gc.set_defaults(func=_gc)
+
+    manifest = subparsers.add_parser(
+        "manifest", help="list the forecasts in a save location from its manifest"
+    )
+    manifest.add_argument(
+        "--save-location",
+        default=config.save_location,
+        help=f"location of cached data (default: {config.save_location})",
+    )
+    manifest.add_argument(
+        "--fresh", action="store_true", help="only list forecasts that have not expired"
+    )
+    manifest_action = manifest.add_mutually_exclusive_group()
+    manifest_action.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="rebuild the manifest from the saved files, e.g. for data saved by older versions",
+    )
+    manifest_action.add_argument(
+        "--compact", action="store_true", help="rewrite the manifest without superseded lines"
+    )
+    manifest.set_defaults(func=_manifest)
+
+    simulate = subparsers.add_parser(
+        "simulate", help="run a local server simulating the MET API, e.g. for load tests"
+    )
+    simulate.add_argument(
+        "--port", type=int, default=8080, help="port to listen on (default: 8080)"
+    )
+    simulate.add_argument(
+        "--address", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)"
+    )
+    simulate.add_argument(
+        "--latency", type=float, default=0, help="seconds added to every response (default: 0)"
+    )
+    simulate.add_argument(
+        "--error-rate",
+        type=float,
+        default=0,
+        help="fraction of requests answered with 500 Internal Server Error (default: 0)",
+    )
+    simulate.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0,
+        help="fraction of requests answered with 429 Too Many Requests (default: 0)",
+    )
+    simulate.add_argument(
+        "--expires-in",
+        type=float,
+        default=30,
+        help="minutes from a response until its data expires (default: 30)",
+    )
+    simulate.add_argument(
+        "--update-interval",
+        type=float,
+        default=60,
+        help="minutes between new forecasts (default: 60)",
+    )
+    simulate.add_argument(
+        "--intervals",
+        type=int,
+        default=82,
+        help="number of entries in the timeseries of each forecast (default: 82)",
+    )
+    simulate.add_argument("--seed", type=int, help="seed for choosing which requests fail")
+    simulate.set_defaults(func=_simulate)
+
+    serve = subparsers.add_parser(
+        "serve", help="run a caching proxy for the MET API, sharing one cache between clients"
+    )
+    _add_storage_arguments(serve, config)
+    serve.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve.add_argument(
+        "--address", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)"
+    )
+    serve.add_argument(
+        "--upstream",
+        default=config.base_url,
+        help=f"url to request forecasts from (default: {config.base_url})",
+    )
+    serve.add_argument(
+        "--user-agent",
+        default=config.user_agent,
+        help="user agent to send upstream (default: the user agent of each request)",
+    )
+    serve.add_argument(
+        "--timeout",
+        type=float,
+        default=30,
+        help="seconds to wait for upstream responses (default: 30)",
+    )
+    serve.set_defaults(func=_serve)
+
+    refresh = subparsers.add_parser(
+        "refresh",
+        help="refresh forecasts for places in a csv file and write their intervals to stdout",
+    )
+    refresh.add_argument(
+        "places",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default="-",
+        help="csv file of places (name, latitude, longitude, altitude) (default: stdin)",
+    )
+    _add_storage_arguments(refresh, config)
+    refresh.add_argument(
+        "--user-agent",
+        default=config.user_agent,
+        help=f"user agent to send with requests (default: {config.user_agent})",
+    )
+    refresh.add_argument(
+        "--forecast-type",
+        default=config.forecast_type,
+        help=f"type of forecast (default: {config.forecast_type})",
+    )
+    refresh.add_argument(
+        "--base-url",
+        default=config.base_url,
+        help=f"url to request forecasts from (default: {config.base_url})",
+    )
+    refresh.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default="ndjson",
+        help="format of the rows written for each interval (default: ndjson)",
+    )
+    refresh.add_argument(
+        "--variables", nargs="+", help="names of the variables to write (default: all)"
+    )
+    refresh.add_argument(
+        "--hours",
+        type=float,
+        help="only write intervals starting within this many hours of the start of the forecast",
+    )
+    refresh.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="number of places to refresh at the same time (default: 8)",
+    )
+    refresh.set_defaults(func=_refresh)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the command line interface, returns an exit code."""
+    args = build_parser().parse_args(argv)
+    exit_code: int = args.func(args)
+    return exit_code
@@ -2,15 +2,33 @@
 
 Currently supported files are 'setup.cfg' and '.metno_locationforecast' in the
 root directory. '.metno_locationforecast' takes precedence over 'setup.cfg'.
+Environment variables named METNO_LOCATIONFORECAST_<SETTING>, e.g.
+METNO_LOCATIONFORECAST_USER_AGENT, take precedence over both files and settings
+given with configure take precedence over everything.
+
+The shared configuration is not read until it is first needed, it is then kept
+until reload_config is called.
 
 Classes:
     Config: Retrieves and stores user configuration
+
+Functions:
+    get_config: Get the shared configuration, reading it on first use
+    configure: Override settings of the shared configuration
+    reload_config: Read the shared configuration again
+
+Attributes:
+    ENVIRONMENT_PREFIX: Prefix of environment variables holding configuration
 """
 
+import os
+import threading
 import warnings
 from configparser import ConfigParser
 from pathlib import Path
-from typing import Iterator, Optional, Dict
+from typing import Any, Dict, Iterator, Optional
+
+ENVIRONMENT_PREFIX = "METNO_LOCATIONFORECAST_"
 
 
 class Config:
@@ -21,27 +39,63 @@ class Config:
         user_agent (Optional[str]): A user agent string
         save_location (str): Location to save data to
         base_url (str): Url for requests
+        storage (str): Type of storage backend used to cache data
+        data_cache (bool): Whether to share parsed data in an in process cache
+        lean (bool): Whether forecasts keep only parsed data in memory
         user_config_file (Optional[str]): The user config file from which the
             configuration was taken, None if no file is found
+        settings (Tuple[str, ...]): Names of the settings that can be
+            configured
     """
 
     section_header = "metno-locationforecast"  # Expected section header in config file
     files = ["metno-locationforecast.ini", "setup.cfg"]  # Supported files
-    cwd = Path.cwd()
-
-    def __init__(self) -> None:
+    settings = (
+        "user_agent",
+        "forecast_type",
+        "save_location",
+        "base_url",
+        "storage",
+        "data_cache",
+        "lean",
+    )
+
+    def __init__(self, **overrides: Any) -> None:
         """Create Config object with the current user configuration.
 
-        Uses default config if no configuration is supplied.
+        Uses default config if no configuration is supplied. Settings are taken
+        from a config file, then from environment variables and then from
+        overrides.
+
+        Args:
+            overrides: Optional; Settings taking precedence over any other
+                configuration, e.g. user_agent="myapp/1.0".
+
+        Raises:
+            ValueError: If an override is not a recognised configuration.
         """
         # Default configuration
         self.user_agent: Optional[str] = None
         self.forecast_type = "compact"
         self.save_location = "./data"
         self.base_url = "https://api.met.no/weatherapi/locationforecast/2.0/"
+        self.storage = "filesystem"
+        self.data_cache = False
+        self.lean = False
         self.user_config_file: Optional[str] = None
 
         self.get_config()
+        self.get_environment_config()
+
+        for key, value in overrides.items():
+            if key not in self.settings:
+                raise ValueError(f"{key} is not a recognised configuration.")
+            setattr(self, key, value)
+
+    @property
+    def cwd(self) -> Path:
+        """Directory to look for user config files in, the current working directory."""
+        return Path.cwd()
 
     @property
     def possible_user_config_files(self) -> Iterator[Path]:
@@ -78,9 +132,93 @@ class Config:
         user_config = self.get_user_config()
 
         for key, value in user_config.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-
+            if key in self.settings:
+                self._set(key, value)
             else:
                 msg = f"{key} is not a recognised configuration."
                 warnings.warn(msg)
+
+    def get_environment_config(self) -> None:
+        """Extract user config from environment variables and store it in self object.
+
+        Variables are named ENVIRONMENT_PREFIX followed by the setting in upper
+        case, unrecognised variables are ignored.
+        """
+        for name, value in os.environ.items():
+            if not name.startswith(ENVIRONMENT_PREFIX):
+                continue
+            key = name.removeprefix(ENVIRONMENT_PREFIX).lower()
+            if key in self.settings:
+                self._set(key, value)
+
+    def _set(self, key: str, value: str) -> None:
+        """Set a configuration from a string, warning if it is not valid."""
+        if key not in self.settings:
+            warnings.warn(f"{key} is not a recognised configuration.")
+            return
+        if isinstance(getattr(self, key), bool):
+            if value.lower() not in ConfigParser.BOOLEAN_STATES:
+                msg = f"{value} is not a valid value for {key}, expected a boolean."
+                warnings.warn(msg)
+                return
+            setattr(self, key, ConfigParser.BOOLEAN_STATES[value.lower()])
+        else:
+            setattr(self, key, value)
+
+
+_CONFIG: Optional[Config] = None
+_OVERRIDES: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+def get_config() -> Config:
+    """Return the shared configuration, reading it the first time it is needed."""
+    global _CONFIG
+    config = _CONFIG
+    if config is None:
+        with _LOCK:
+            if _CONFIG is None:
+                _CONFIG = Config(**_OVERRIDES)
+            config = _CONFIG
+    return config
+
+
+def configure(**overrides: Any) -> Config:
+    """Override settings of the shared configuration.
+
+    Overrides are kept when the configuration is reloaded.
+
+    Args:
+        overrides: Settings taking precedence over config files and environment
+            variables, e.g. user_agent="myapp/1.0".
+
+    Returns:
+        The updated shared configuration.
+
+    Raises:
+        ValueError: If an override is not a recognised configuration.
+    """
+    global _CONFIG
+    with _LOCK:
+        config = Config(**{**_OVERRIDES, **overrides})
+        _OVERRIDES.update(overrides)
+        _CONFIG = config
+    return config
+
+
+def reload_config(clear_overrides: bool = False) -> Config:
+    """Read the shared configuration again from config files and environment variables.
+
+    Args:
+        clear_overrides: Optional; Whether to drop settings given with
+            configure. Defaults to False.
+
+    Returns:
+        The new shared configuration.
+    """
+    global _CONFIG
+    with _LOCK:
+        if clear_overrides:
+            _OVERRIDES.clear()
+        _CONFIG = Config(**_OVERRIDES)
+    return _CONFIG
@@ -4,13 +4,40 @@ Classes:
     Place: Holds data for a place.
     Variable: Stores data for a weather variable.
     Interval: Stores information for an interval of a forecast.
+    Series: Stores the values of a variable over time.
+    UnitView: A view of data converted to other units.
     Data: Stores a complete collection of data
 """
 
 import datetime as dt
 import functools
-from typing import Dict, List, Optional, Union
-from zoneinfo import ZoneInfo
+from array import array
+from bisect import bisect_left
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .units import VALID_UNIT_CONVERSIONS, Conversion, get_conversion
+
+if TYPE_CHECKING:
+    from zoneinfo import ZoneInfo
+
+    from .aggregation import Aggregation
+    from .resample import ResampledData
+
+T = TypeVar("T")
 
 
 class Place:
@@ -73,11 +100,11 @@ class Variable:
         convert_to(units): Convert variable to given units.
     """
 
-    VALID_UNIT_CONVERSIONS = {
-        "m/s": {"km/h", "mph", "beaufort"},
-        "celsius": {"fahrenheit"},
-        "mm": {"inches"},
-    }
+    VALID_UNIT_CONVERSIONS = VALID_UNIT_CONVERSIONS
+
+    # Version of the Data object the variable belongs to, bumped on unit
+    # conversion so that values the Data cached from the variable are rebuilt.
+    _version: Optional["_Version"] = None
 
     def __init__(self, name: str, value: Union[float, int], units: str):
         """Create Variable object.
@@ -121,92 +148,45 @@ class Variable:
             return Variable(self.name, self.value - other.value, self.units)
         return NotImplemented
 
-    def _celsius_to_fahrenheit(self) -> None:
-        """Convert from degrees Celsius to degrees Fahrenheit."""
-        if self.units == "celsius":
-            self.value = (((self.value / 5) * 9) + 32).__round__(2)
-            self.units = "fahrenheit"
-        else:
+    def _convert(self, from_units: str, to_units: str) -> None:
+        """Convert from from_units to to_units, raise a ValueError if the variable is not in
+        from_units."""
+        if self.units != from_units:
             msg = (
-                "Not a valid unit conversion, expected units to be in 'celsius' but instead "
-                + f"units were in {self.units}."
+                f"Not a valid unit conversion, expected units to be in '{from_units}' but "
+                + f"instead units were in {self.units}."
             )
             raise ValueError(msg)
+        self.value = get_conversion(from_units, to_units)(self.value)
+        self.units = to_units
+        if self._version is not None:
+            self._version.value += 1
+
+    def _celsius_to_fahrenheit(self) -> None:
+        """Convert from degrees Celsius to degrees Fahrenheit."""
+        self._convert("celsius", "fahrenheit")
 
     def _mps_to_kph(self) -> None:
         """Convert from metres per second to kilometres per hour."""
-        if self.units == "m/s":
-            self.units = "km/h"
-            self.value = ((self.value * 360) / 100).__round__(2)
-        else:
-            msg = (
-                "Not a valid unit conversion, expected units to be in 'm/s' but instead "
-                + f"units were in {self.units}."
-            )
-            raise ValueError(msg)
+        self._convert("m/s", "km/h")
 
     def _mps_to_mph(self) -> None:
         """Convert from metres per second to miles per hour."""
-        if self.units == "m/s":
-            self.units = "mph"
-            self.value = (self.value * 2.236936).__round__(2)
-        else:
-            msg = (
-                "Not a valid unit conversion, expected units to be in 'm/s' but instead "
-                + f"units were in {self.units}."
-            )
-            raise ValueError(msg)
+        self._convert("m/s", "mph")
 
     def _mps_to_beaufort(self) -> None:
         """Convert from metres per second to Beaufort scale."""
-        if self.units == "m/s":
-            self.units = "beaufort"
-            self.value = min(((self.value / 0.836) ** (2 / 3)).__round__(), 12)
-        else:
-            msg = (
-                "Not a valid unit conversion, expected units to be in 'm/s' but instead "
-                + f"units were in {self.units}."
-            )
-            raise ValueError(msg)
+        self._convert("m/s", "beaufort")
 
     def _mm_to_inches(self) -> None:
         """Convert from millimetres to inches."""
-        if self.units == "mm":
-            self.units = "inches"
-            # There are 25.4mm in 1 inch
-            self.value = (self.value / 25.4).__round__(2)
-        else:
-            msg = (
-                "Not a valid unit conversion, expected units to be in 'mm' but instead "
-                + f"units were in {self.units}."
-            )
-            raise ValueError(msg)
+        self._convert("mm", "inches")
 
     def convert_to(self, units: str) -> None:
-        """Convert variable to given units."""
+        """Convert variable to given units, see the units module for valid conversions."""
         if self.units == units:
             return
-
-        if self.units not in Variable.VALID_UNIT_CONVERSIONS:
-            msg = f"Not a valid unit conversion. No valid conversions for variables with units: {self.units}"  # noqa: E501
-            raise ValueError(msg)
-        if units not in Variable.VALID_UNIT_CONVERSIONS[self.units]:
-            msg = f"""Not a valid unit conversion. Valid destination units:
-            {Variable.VALID_UNIT_CONVERSIONS[self.units]}"""
-            raise ValueError(msg)
-
-        if self.units == "celsius" and units == "fahrenheit":
-            self._celsius_to_fahrenheit()
-        elif self.units == "m/s" and units == "km/h":
-            self._mps_to_kph()
-        elif self.units == "m/s" and units == "mph":
-            self._mps_to_mph()
-        elif self.units == "m/s" and units == "beaufort":
-            self._mps_to_beaufort()
-        elif self.units == "mm" and units == "inches":
-            self._mm_to_inches()
-        else:
-            raise ValueError("Not a valid unit conversion.")
+        self._convert(self.units, units)
 
 
 class Interval:
@@ -264,6 +244,76 @@ class Interval:
         return self.end_time - self.start_time
 
 
+class Series:
+    """Stores the values of a variable over time.
+
+    Series are cached and shared by their Data object, so values are read only.
+
+    Attributes:
+        name: Name of the variable.
+        units: Units of the values.
+        times: Start time of each interval.
+        values: Read only sequence of the value for each time, as floats.
+            Missing values are NaN, unless the series was created without
+            missing steps.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        units: Optional[str],
+        times: Tuple[dt.datetime, ...],
+        values: "array[float]",
+    ):
+        """Create a Series object.
+
+        Args:
+            name: Name of the variable.
+            units: Units of the values.
+            times: Start time of each interval.
+            values: Array of the value for each time.
+        """
+        self.name = name
+        self.units = units
+        self.times = times
+        # The array is kept rather than a view of it so that series can be
+        # copied and pickled along with the Data they are cached on.
+        self._values = values
+
+    @property
+    def values(self) -> memoryview:
+        """Read only view of the value for each time."""
+        return memoryview(self._values).toreadonly()
+
+    def __repr__(self) -> str:
+        return f"Series({self.name}, {self.units}, {self.times}, {self.values.tolist()})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Series):
+            return (
+                self.name == other.name
+                and self.units == other.units
+                and self.times == other.times
+                and self.values.tolist() == other.values.tolist()
+            )
+        return NotImplemented
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[Tuple[dt.datetime, float]]:
+        return zip(self.times, self.values)
+
+
+class _Version:
+    """Counts changes to the variables of a Data object."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+
 class Data:
     """Class for storing a complete collection of data.
 
@@ -276,7 +326,13 @@ class Data:
 
     Methods:
         intervals_for: Get intervals for a specific day
+        intervals_by_day: Get intervals grouped by day
         intervals_between: Get intervals between a specific time period
+        series: Get the values of a variable over time
+        converted: Get a copy of the data converted to other units
+        in_units: Get a view of the data converted to other units
+        aggregate: Get reductions of variables per day or time window
+        resample: Get variables on a uniform time grid
     """
 
     def __init__(
@@ -302,6 +358,11 @@ class Data:
         self.units = units
         self.intervals = intervals
 
+        # Values derived from the intervals, see _cached.
+        self._cache: Dict[Hashable, Any] = {}
+        self._cache_token: Optional[Tuple[int, int, int]] = None
+        self._version = _Version()
+
     def __repr__(self) -> str:
         return (
             f"Data({self.last_modified}, {self.expires}, {self.updated_at}, {self.units}, "
@@ -319,15 +380,230 @@ class Data:
             )
         return NotImplemented
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Cached values are left out when copying or pickling, they are rebuilt on use.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        state["_cache_token"] = None
+        return state
+
+    def _cached(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Return a value derived from the intervals, building it on first use.
+
+        Cached values are dropped when the intervals list is replaced, changes
+        length or one of its variables is converted to other units. A variable
+        shared by several Data objects only drops the values cached by the
+        last of them to cache values.
+        """
+        intervals = self.intervals
+        cache = self._cache
+        token = (id(intervals), len(intervals), self._version.value)
+        if token != self._cache_token:
+            # Variables bump the version of this data when they are converted.
+            for interval in intervals:
+                for variable in interval.variables.values():
+                    variable._version = self._version
+            cache = {}
+            self._cache = cache
+            self._cache_token = token
+
+        if key in cache:
+            value: T = cache[key]
+        else:
+            value = build()
+            cache[key] = value
+        return value
+
+    def _start_times(self) -> Optional[List[dt.datetime]]:
+        """Return the start times of the intervals, None if they are not chronological."""
+
+        def build() -> Optional[List[dt.datetime]]:
+            start_times = [interval.start_time for interval in self.intervals]
+            if any(a > b for a, b in zip(start_times, start_times[1:])):
+                return None
+            return start_times
+
+        return self._cached("start_times", build)
+
+    def _column(self, name: str) -> "array[float]":
+        """Return the values of a variable for each interval, NaN where it is missing."""
+
+        def build() -> "array[float]":
+            nan = float("nan")
+            column = array("d")
+            for interval in self.intervals:
+                variable = interval.variables.get(name)
+                column.append(nan if variable is None else variable.value)
+            return column
+
+        return self._cached(("column", name), build)
+
+    def series(self, name: str, missing: str = "nan") -> Series:
+        """Return the values of a variable over time.
+
+        The series is built on first use and cached, so this is cheap to call
+        repeatedly. It is rebuilt if the intervals change or a variable is
+        converted to other units.
+
+        Args:
+            name: Name of the variable.
+            missing: Optional; How to handle intervals without the variable,
+                "nan" to give them a value of NaN or "drop" to leave them out.
+                Defaults to "nan".
+        """
+        if missing not in ("nan", "drop"):
+            raise ValueError(f"Missing should be 'nan' or 'drop', got {missing}.")
+
+        def build() -> Series:
+            column = self._column(name)
+            present = [value == value for value in column]
+            if name not in self.units and not any(present):
+                raise KeyError(f"{name} is not a variable of the data.")
+
+            units = next(
+                (
+                    interval.variables[name].units
+                    for interval in self.intervals
+                    if name in interval.variables
+                ),
+                self.units.get(name),
+            )
+            times = self._cached(
+                "times", lambda: tuple(interval.start_time for interval in self.intervals)
+            )
+            if missing == "drop" and not all(present):
+                times = tuple(time for time, keep in zip(times, present) if keep)
+                column = array("d", (value for value in column if value == value))
+            return Series(name, units, times, column)
+
+        return self._cached(("series", name, missing), build)
+
+    def converted(self, units: Mapping[str, str]) -> "Data":
+        """Return a copy of the data with variables converted to other units.
+
+        The data itself is not changed, so it is safe to use from other threads
+        while converting. Each variable is converted in one pass over its
+        values.
+
+        Args:
+            units: A dictionary mapping units to the units to convert them to,
+                e.g. {"celsius": "fahrenheit", "m/s": "km/h"}.
+
+        Raises:
+            ValueError: If a conversion is not valid.
+        """
+        conversions: Dict[str, Conversion] = {
+            from_units: get_conversion(from_units, to_units)
+            for from_units, to_units in units.items()
+            if from_units != to_units
+        }
+        intervals = self.intervals
+
+        # Converted values of each variable, indexed by interval.
+        converted: Dict[str, Dict[int, Variable]] = {}
+        for name in {name for interval in intervals for name in interval.variables}:
+            by_units: Dict[str, List[int]] = {}
+            for i, interval in enumerate(intervals):
+                variable = interval.variables.get(name)
+                if variable is not None and variable.units in conversions:
+                    by_units.setdefault(variable.units, []).append(i)
+            for from_units, indices in by_units.items():
+                conversion = conversions[from_units]
+                values = conversion.convert_all(intervals[i].variables[name].value for i in indices)
+                converted.setdefault(name, {}).update(
+                    (i, Variable(name, value, conversion.to_units))
+                    for i, value in zip(indices, values)
+                )
+
+        new_intervals = []
+        for i, interval in enumerate(intervals):
+            variables = {
+                name: (
+                    converted[name][i]
+                    if name in converted and i in converted[name]
+                    else Variable(name, variable.value, variable.units)
+                )
+                for name, variable in interval.variables.items()
+            }
+            new_intervals.append(
+                Interval(interval.start_time, interval.end_time, interval.symbol_code, variables)
+            )
+
+        new_units = {
+            name: conversions[unit].to_units if unit in conversions else unit
+            for name, unit in self.units.items()
+        }
+        return Data(self.last_modified, self.expires, self.updated_at, new_units, new_intervals)
+
+    def in_units(self, units: Mapping[str, str]) -> "UnitView":
+        """Return a view of the data converted to other units.
+
+        Converted values are computed when first used and cached until the
+        intervals change, views are cached for each mapping of units.
+
+        Args:
+            units: A dictionary mapping units to the units to convert them to,
+                e.g. {"celsius": "fahrenheit", "m/s": "km/h"}.
+
+        Raises:
+            ValueError: If a conversion is not valid.
+        """
+        key = tuple(sorted(units.items()))
+        return self._cached(("in_units", key), lambda: UnitView(self, dict(key)))
+
+    def _day_index(
+        self, tzinfo: Union[dt.timezone, "ZoneInfo"]
+    ) -> Optional[Dict[dt.date, Tuple[int, int]]]:
+        """Return a mapping of local dates to (first, last) slices of the intervals.
+
+        Returns None if the intervals are not chronological or have no timezone
+        info, in which case they can not be grouped into slices.
+        """
+
+        def build() -> Optional[Dict[dt.date, Tuple[int, int]]]:
+            if self._start_times() is None:
+                return None
+            index: Dict[dt.date, Tuple[int, int]] = {}
+            for i, interval in enumerate(self.intervals):
+                if interval.start_time.tzinfo is None:
+                    return None
+                day = interval.start_time.astimezone(tzinfo).date()
+                index[day] = (index[day][0] if day in index else i, i + 1)
+            return index
+
+        return self._cached(("days", tzinfo), build)
+
     def intervals_for(
-        self, day: dt.date, tzinfo: Union[dt.timezone, ZoneInfo] = dt.timezone.utc
+        self, day: dt.date, tzinfo: Union[dt.timezone, "ZoneInfo"] = dt.timezone.utc
     ) -> List[Interval]:
         """Return intervals for specified day. Include timezone info for
         localised results."""
+        index = self._day_index(tzinfo)
+        if index is not None:
+            first, last = index.get(day, (0, 0))
+            return self.intervals[first:last]
+
         start = dt.datetime(day.year, day.month, day.day, tzinfo=tzinfo)
         end = start + dt.timedelta(days=1)
         return self.intervals_between(start, end)
 
+    def intervals_by_day(
+        self, tzinfo: Union[dt.timezone, "ZoneInfo"] = dt.timezone.utc
+    ) -> Dict[dt.date, List[Interval]]:
+        """Return intervals grouped by day, in chronological order. Include
+        timezone info for localised results."""
+        index = self._day_index(tzinfo)
+        if index is not None:
+            return {day: self.intervals[first:last] for day, (first, last) in index.items()}
+
+        days: Dict[dt.date, List[Interval]] = {}
+        for interval in self.intervals:
+            start_time = interval.start_time
+            if start_time.tzinfo is None:
+                start_time = start_time.replace(tzinfo=dt.timezone.utc)
+            days.setdefault(start_time.astimezone(tzinfo).date(), []).append(interval)
+        return {day: days[day] for day in sorted(days)}
+
     def intervals_between(self, start: dt.datetime, end: dt.datetime) -> List[Interval]:
         """Return intervals between specified time periods, use datetimes with
         timezone info for localised results."""
@@ -338,8 +614,105 @@ class Data:
         if end.tzinfo is None:
             end = end.replace(tzinfo=dt.timezone.utc)
 
+        start_times = self._start_times()
+        if start_times is not None:
+            first = bisect_left(start_times, start)
+            last = bisect_left(start_times, end, first)
+            return self.intervals[first:last]
+
         for interval in self.intervals:
             if start <= interval.start_time < end:
                 relevant_intervals.append(interval)
 
         return relevant_intervals
+
+    def aggregate(
+        self,
+        variables: Union[str, Iterable[str], Mapping[str, Union[str, Iterable[str]]]],
+        reductions: Union[str, Iterable[str], None] = None,
+        period: Union[str, dt.timedelta] = "day",
+        tzinfo: Union[dt.timezone, "ZoneInfo"] = dt.timezone.utc,
+    ) -> "Aggregation":
+        """Return reductions (min, max, mean or sum) of variables per day or
+        time window, see aggregation.aggregate for details."""
+        from .aggregation import aggregate
+
+        return aggregate(self, variables, reductions, period, tzinfo)
+
+    def resample(
+        self,
+        step: dt.timedelta,
+        variables: Optional[Iterable[str]] = None,
+        policies: Optional[Mapping[str, str]] = None,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+    ) -> "ResampledData":
+        """Return variables on a uniform time grid with steps of the given
+        length, see resample.resample for details."""
+        from .resample import resample
+
+        return resample(self, step, variables, policies, start, end)
+
+
+class UnitView:
+    """A view of data converted to other units.
+
+    Converted values are computed when first used and cached on the viewed
+    data, so they are rebuilt when its intervals change. Get views with
+    Data.in_units.
+
+    Attributes:
+        source: The data viewed.
+        conversions: A dictionary mapping units to the units they are converted
+            to.
+        units: A dictionary mapping variable names to their converted units.
+
+    Methods:
+        series: Get the converted values of a variable over time.
+        to_data: Get a converted copy of the data.
+    """
+
+    def __init__(self, source: Data, conversions: Dict[str, str]):
+        """Create a UnitView object.
+
+        Args:
+            source: The data to view.
+            conversions: A dictionary mapping units to the units to convert
+                them to.
+        """
+        self.source = source
+        self.conversions = conversions
+        self._conversions = {
+            from_units: get_conversion(from_units, to_units)
+            for from_units, to_units in conversions.items()
+            if from_units != to_units
+        }
+
+    def __repr__(self) -> str:
+        return f"UnitView({self.conversions})"
+
+    @property
+    def units(self) -> Dict[str, str]:
+        """A dictionary mapping variable names to their converted units."""
+        return {
+            name: self.conversions.get(units, units) for name, units in self.source.units.items()
+        }
+
+    def series(self, name: str, missing: str = "nan") -> Series:
+        """Return the converted values of a variable over time, see Data.series."""
+
+        def build() -> Series:
+            series = self.source.series(name, missing)
+            conversion = None if series.units is None else self._conversions.get(series.units)
+            if conversion is None:
+                return series
+            values = conversion.convert_array(series.values)
+            return Series(name, conversion.to_units, series.times, values)
+
+        key = ("in_units", tuple(sorted(self.conversions.items())), "series", name, missing)
+        return self.source._cached(key, build)
+
+    def to_data(self) -> Data:
+        """Return a converted copy of the data, see Data.converted."""
+        key = ("in_units", tuple(sorted(self.conversions.items())), "data")
+        return self.source._cached(key, lambda: self.source.converted(self.conversions))
@@ -0,0 +1,217 @@
+"""Reports of the memory used by forecasts and their data.
+
+Sizes are found by walking the objects held by a forecast and adding up
+sys.getsizeof for each object reached. Objects reached more than once, such
+as variable names shared by every interval, are counted once, in the first
+part of the report they are reached from. Parts are reached in the order
+variables, intervals, caches, json, json_string and response.
+
+Classes:
+    MemoryReport: Memory used by a forecast or data, by part
+
+Functions:
+    data_memory: Report the memory used by a Data object
+    forecast_memory: Report the memory used by a Forecast
+    total_memory: Report the memory used by many forecasts
+    deep_sizeof: Size of an object and everything it holds
+"""
+
+import sys
+import types
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set
+
+if TYPE_CHECKING:
+    from .data_containers import Data
+    from .forecast import Forecast
+
+PARTS = ("variables", "intervals", "caches", "json", "json_string", "response")
+
+# Objects that belong to the program rather than to any forecast.
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+class MemoryReport:
+    """Memory used by a forecast or data, by part, in bytes.
+
+    Attributes:
+        variables: Variable objects and their names, values and units.
+        intervals: Data and Interval objects with their times, symbol codes
+            and dictionaries of variables.
+        caches: Values derived from the data and cached on it, such as series.
+        json: Json data decoded as a dictionary, kept by a Forecast.
+        json_string: Json data as a string, kept by a Forecast.
+        response: Body and headers of the last response, kept by a Forecast.
+        forecasts: Number of forecasts included.
+
+    Methods:
+        as_dict: Get the sizes as a dictionary.
+    """
+
+    def __init__(
+        self,
+        variables: int = 0,
+        intervals: int = 0,
+        caches: int = 0,
+        json: int = 0,
+        json_string: int = 0,
+        response: int = 0,
+        forecasts: int = 0,
+    ):
+        """Create a MemoryReport object.
+
+        Args:
+            variables: Optional; Bytes used by variables.
+            intervals: Optional; Bytes used by intervals.
+            caches: Optional; Bytes used by cached derived values.
+            json: Optional; Bytes used by decoded json.
+            json_string: Optional; Bytes used by the json string.
+            response: Optional; Bytes used by the response.
+            forecasts: Optional; Number of forecasts included.
+        """
+        self.variables = variables
+        self.intervals = intervals
+        self.caches = caches
+        self.json = json
+        self.json_string = json_string
+        self.response = response
+        self.forecasts = forecasts
+
+    def __repr__(self) -> str:
+        parts = ", ".join(f"{part}={getattr(self, part)}" for part in PARTS)
+        return f"MemoryReport(total={self.total}, {parts}, forecasts={self.forecasts})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MemoryReport):
+            return self.as_dict() == other.as_dict()
+        return NotImplemented
+
+    def __add__(self, other: "MemoryReport") -> "MemoryReport":
+        sizes = {part: getattr(self, part) + getattr(other, part) for part in PARTS}
+        return MemoryReport(**sizes, forecasts=self.forecasts + other.forecasts)
+
+    @property
+    def total(self) -> int:
+        """Total bytes used."""
+        return sum(getattr(self, part) for part in PARTS)
+
+    @property
+    def data(self) -> int:
+        """Bytes used by parsed data, variables, intervals and caches."""
+        return self.variables + self.intervals + self.caches
+
+    @property
+    def raw(self) -> int:
+        """Bytes used by raw copies of the data, json, json_string and response."""
+        return self.json + self.json_string + self.response
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the size of each part and the total as a dictionary."""
+        sizes = {part: getattr(self, part) for part in PARTS}
+        sizes["total"] = self.total
+        sizes["forecasts"] = self.forecasts
+        return sizes
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Return the size of an object and everything it holds, in bytes.
+
+    Args:
+        obj: Object to size.
+        seen: Optional; Ids of objects already counted, which are skipped.
+            Objects counted are added to it.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED_TYPES):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, (str, bytes, bytearray, int, float, bool, array)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, memoryview):
+            stack.append(item.obj)
+        if hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        for slot in getattr(type(item), "__slots__", ()):
+            if hasattr(item, slot):
+                stack.append(getattr(item, slot))
+    return size
+
+
+def _data_memory(data: "Data", seen: Set[int]) -> MemoryReport:
+    # Variables refer to the version of their data, which is counted with the data.
+    version_seen = id(data._version) in seen
+    seen.add(id(data._version))
+    variables = sum(
+        deep_sizeof(variable, seen)
+        for interval in data.intervals
+        for variable in interval.variables.values()
+    )
+    if not version_seen:
+        seen.discard(id(data._version))
+
+    # Caches are counted separately, after the intervals they are derived from.
+    if id(data._cache) in seen:
+        return MemoryReport(variables, deep_sizeof(data, seen))
+    seen.add(id(data._cache))
+    intervals = deep_sizeof(data, seen)
+    seen.discard(id(data._cache))
+    caches = deep_sizeof(data._cache, seen)
+
+    return MemoryReport(variables, intervals, caches)
+
+
+def data_memory(data: "Data") -> MemoryReport:
+    """Report the memory used by a Data object."""
+    return _data_memory(data, set())
+
+
+def _response_memory(response: Any, seen: Set[int]) -> int:
+    """Size of the body and headers of a response, not of its connection."""
+    body = getattr(response, "_content", None)
+    if not isinstance(body, bytes):
+        body = getattr(response, "content", None)
+    return deep_sizeof(body, seen) + deep_sizeof(getattr(response, "headers", None), seen)
+
+
+def _forecast_memory(forecast: "Forecast", seen: Set[int]) -> MemoryReport:
+    report = MemoryReport(forecasts=1)
+    if hasattr(forecast, "data"):
+        report += _data_memory(forecast.data, seen)
+    report.json = deep_sizeof(forecast._json, seen)
+    report.json_string = deep_sizeof(forecast._json_string, seen)
+    if hasattr(forecast, "response"):
+        report.response = _response_memory(forecast.response, seen)
+    return report
+
+
+def forecast_memory(forecast: "Forecast") -> MemoryReport:
+    """Report the memory used by a Forecast, by its data and by raw copies of the data.
+
+    The json string is only counted if it is held in memory, it is not read
+    from storage.
+    """
+    return _forecast_memory(forecast, set())
+
+
+def total_memory(forecasts: Iterable["Forecast"]) -> MemoryReport:
+    """Report the memory used by many forecasts.
+
+    Data shared between forecasts, e.g. through a data cache, is counted once.
+    """
+    seen: Set[int] = set()
+    report = MemoryReport()
+    for forecast in forecasts:
+        report += _forecast_memory(forecast, seen)
+    return report
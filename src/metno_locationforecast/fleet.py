@@ -0,0 +1,436 @@
+"""Queries over forecasts for many places.
+
+A Fleet resamples the data of many forecasts onto a shared time grid and stores
+it by column, so that questions such as "which places have a maximum wind speed
+above 15 m/s tomorrow" or "which are the 20 warmest places at noon" are
+answered for all places at once rather than by looping over intervals.
+
+Queries are vectorised with numpy when it is installed, otherwise they are
+computed in pure Python.
+
+Classes:
+    Fleet: Forecast data for many places on a shared time grid
+"""
+
+import datetime as dt
+import math
+import operator
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ._utils import as_utc, import_numpy
+from .aggregation import REDUCTIONS
+from .data_containers import Data, Place
+from .forecast import Forecast
+from .resample import resample
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def _reduce_python(values: Sequence[float], reduction: str) -> float:
+    present = [value for value in values if not math.isnan(value)]
+    if not present:
+        return math.nan
+    if reduction == "min":
+        return min(present)
+    if reduction == "max":
+        return max(present)
+    if reduction == "sum":
+        return sum(present)
+    return sum(present) / len(present)
+
+
+def _reduce_numpy(np: Any, values: Any, reduction: str, axis: int) -> Any:
+    present = ~np.isnan(values)
+    counts = present.sum(axis=axis)
+    if reduction == "min":
+        reduced = np.where(present, values, np.inf).min(axis=axis)
+    elif reduction == "max":
+        reduced = np.where(present, values, -np.inf).max(axis=axis)
+    else:
+        reduced = np.where(present, values, 0.0).sum(axis=axis)
+        if reduction == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                reduced = reduced / counts
+    return np.where(counts == 0, np.nan, reduced)
+
+
+def _optional(values: Iterable[float]) -> List[Optional[float]]:
+    return [None if math.isnan(value) else value for value in values]
+
+
+class Fleet:
+    """Forecast data for many places on a shared time grid, stored by column.
+
+    Values of each variable are resampled, see resample.resample, onto steps of
+    the same length, so every place has a value, or NaN, for every time.
+
+    Attributes:
+        places: The places, in the order of the data they were created from.
+        times: Start time of each step, in UTC.
+        step: Length of each step.
+        variables: Names of the variables.
+        units: A dictionary mapping variable names to their units.
+
+    Methods:
+        from_data: Create a Fleet from Data objects.
+        from_forecasts: Create a Fleet from forecasts.
+        column: Get a place by time table of values for a variable.
+        to_numpy: Get a place by time by variable numpy array of all values.
+        at: Get the value of a variable for every place at a time.
+        reduce: Get a reduction of a variable over time for every place.
+        across_places: Get a reduction of a variable over places for every time.
+        where: Get the places for which a condition holds.
+        top: Get the places with the largest or smallest values.
+    """
+
+    def __init__(
+        self,
+        places: List[Place],
+        times: List[dt.datetime],
+        step: dt.timedelta,
+        units: Dict[str, str],
+        columns: Dict[str, List["array[float]"]],
+    ):
+        """Create a Fleet object, use from_data or from_forecasts to create one from data.
+
+        Args:
+            places: The places.
+            times: Start time of each step, in UTC.
+            step: Length of each step.
+            units: A dictionary mapping variable names to their units.
+            columns: A dictionary mapping variable names to an array of values
+                over time for each place.
+        """
+        self.places = places
+        self.times = times
+        self.step = step
+        self.variables = list(columns)
+        self.units = units
+        self._columns = columns
+        self._stacked: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"Fleet({len(self.places)} places, {len(self.times)} times from "
+            f"{self.times[0] if self.times else None} every {self.step}, {self.variables})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    @classmethod
+    def from_data(
+        cls,
+        places: Iterable[Place],
+        data: Iterable[Data],
+        step: dt.timedelta = dt.timedelta(hours=1),
+        variables: Optional[Iterable[str]] = None,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+    ) -> "Fleet":
+        """Create a Fleet from Data objects.
+
+        Args:
+            places: The place of each Data object.
+            data: The Data objects.
+            step: Optional; Length of each step, defaults to one hour.
+            variables: Optional; Names of variables to include, defaults to all
+                variables of the first Data object.
+            start: Optional; Start of the first step, defaults to the earliest
+                start time of any interval.
+            end: Optional; Time of the last step, defaults to the latest start
+                time of any interval.
+        """
+        places = list(places)
+        data = list(data)
+        if len(places) != len(data):
+            raise ValueError("There should be a place for each Data object.")
+
+        with_intervals = [d for d in data if d.intervals]
+        if start is None and with_intervals:
+            start = min(as_utc(d.intervals[0].start_time) for d in with_intervals)
+        if end is None and with_intervals:
+            end = max(as_utc(d.intervals[-1].start_time) for d in with_intervals)
+        if variables is None:
+            variables = list(data[0].units) if data else []
+        variables = list(variables)
+
+        times: List[dt.datetime] = []
+        units: Dict[str, str] = {}
+        columns: Dict[str, List["array[float]"]] = {name: [] for name in variables}
+        for d in data:
+            resampled = resample(d, step, variables, start=start, end=end)
+            if len(resampled) > len(times):
+                times = resampled.times
+            for name in variables:
+                columns[name].append(resampled[name])
+                units.setdefault(name, resampled.units[name])
+
+        # Data without intervals has no times, give it NaN for every step.
+        for name in variables:
+            columns[name] = [
+                column if len(column) == len(times) else array("d", [math.nan]) * len(times)
+                for column in columns[name]
+            ]
+        return cls(places, times, step, units, columns)
+
+    @classmethod
+    def from_forecasts(
+        cls,
+        forecasts: Iterable[Forecast],
+        step: dt.timedelta = dt.timedelta(hours=1),
+        variables: Optional[Iterable[str]] = None,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+    ) -> "Fleet":
+        """Create a Fleet from forecasts, the forecasts must have data.
+
+        See from_data for the other arguments.
+        """
+        forecasts = list(forecasts)
+        for forecast in forecasts:
+            if not hasattr(forecast, "data"):
+                raise ValueError(f"{forecast.place} has no data, load or update it first.")
+        return cls.from_data(
+            [forecast.place for forecast in forecasts],
+            [forecast.data for forecast in forecasts],
+            step,
+            variables,
+            start,
+            end,
+        )
+
+    def _stack(self, variable: str) -> Any:
+        """Return a place by time numpy array of a variable."""
+        np = import_numpy()
+        if variable not in self._stacked:
+            rows = self._columns[variable]
+            stacked = np.empty((len(rows), len(self.times)))
+            for i, row in enumerate(rows):
+                stacked[i] = np.frombuffer(row, dtype=float)
+            self._stacked[variable] = stacked
+        return self._stacked[variable]
+
+    def column(self, variable: str) -> Any:
+        """Return a place by time table of values for a variable.
+
+        The table is a numpy array if numpy is installed, otherwise a list of
+        arrays, one for each place.
+        """
+        if variable not in self._columns:
+            raise KeyError(f"{variable} is not a variable of the fleet.")
+        if import_numpy() is None:
+            return self._columns[variable]
+        return self._stack(variable)
+
+    def to_numpy(self) -> Any:
+        """Return a place by time by variable numpy array, variables are in the
+        order of self.variables."""
+        np = import_numpy()
+        if np is None:
+            raise ImportError("numpy is required to convert a fleet to a numpy array.")
+        shape = (len(self.places), len(self.times), len(self.variables))
+        if not self.variables:
+            return np.empty(shape)
+        return np.stack([self._stack(name) for name in self.variables], axis=2)
+
+    def _steps(self, start: Optional[dt.datetime], end: Optional[dt.datetime]) -> Tuple[int, int]:
+        """Return the first and last step starting in the window [start, end)."""
+        first = 0 if start is None else bisect_left(self.times, as_utc(start))
+        last = len(self.times) if end is None else bisect_left(self.times, as_utc(end))
+        return first, max(first, last)
+
+    def _step_at(self, time: dt.datetime) -> Optional[int]:
+        """Return the step a time falls in, None if it is outside the grid."""
+        time = as_utc(time)
+        i = bisect_right(self.times, time) - 1
+        if i < 0 or time >= self.times[i] + self.step:
+            return None
+        return i
+
+    def _at(self, variable: str, time: dt.datetime) -> Sequence[float]:
+        column = self.column(variable)
+        i = self._step_at(time)
+        if i is None:
+            return [math.nan] * len(self.places)
+        if import_numpy() is None:
+            return [row[i] for row in column]
+        values: Sequence[float] = column[:, i]
+        return values
+
+    def _reduce(
+        self,
+        variable: str,
+        reduction: str,
+        start: Optional[dt.datetime],
+        end: Optional[dt.datetime],
+    ) -> Sequence[float]:
+        if reduction not in REDUCTIONS:
+            msg = f"{reduction} is not a valid reduction, valid reductions are {REDUCTIONS}."
+            raise ValueError(msg)
+        column = self.column(variable)
+        first, last = self._steps(start, end)
+        if first == last:
+            return [math.nan] * len(self.places)
+        np = import_numpy()
+        if np is None:
+            return [_reduce_python(row[first:last], reduction) for row in column]
+        values: Sequence[float] = _reduce_numpy(np, column[:, first:last], reduction, axis=1)
+        return values
+
+    def _scores(
+        self,
+        variable: str,
+        reduction: str,
+        start: Optional[dt.datetime],
+        end: Optional[dt.datetime],
+        time: Optional[dt.datetime],
+    ) -> Sequence[float]:
+        if time is not None:
+            return self._at(variable, time)
+        return self._reduce(variable, reduction, start, end)
+
+    def at(self, variable: str, time: dt.datetime) -> List[Optional[float]]:
+        """Return the value of a variable for every place at a time, None for
+        places without a value."""
+        return _optional(self._at(variable, time))
+
+    def reduce(
+        self,
+        variable: str,
+        reduction: str = "max",
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+    ) -> List[Optional[float]]:
+        """Return a reduction of a variable over time for every place.
+
+        Args:
+            variable: Name of the variable.
+            reduction: Optional; One of "min", "max", "mean" or "sum", defaults
+                to "max".
+            start: Optional; Start of the time window, defaults to the first
+                step.
+            end: Optional; End of the time window, steps starting at or after
+                it are left out. Defaults to after the last step.
+
+        Returns:
+            A value for each place, None for places without a value.
+        """
+        return _optional(self._reduce(variable, reduction, start, end))
+
+    def across_places(self, variable: str, reduction: str = "mean") -> List[Optional[float]]:
+        """Return a reduction, one of "min", "max", "mean" or "sum", of a
+        variable over places for every time."""
+        if reduction not in REDUCTIONS:
+            msg = f"{reduction} is not a valid reduction, valid reductions are {REDUCTIONS}."
+            raise ValueError(msg)
+        column = self.column(variable)
+        np = import_numpy()
+        if np is None:
+            return _optional(
+                _reduce_python([row[i] for row in column], reduction)
+                for i in range(len(self.times))
+            )
+        return _optional(_reduce_numpy(np, column, reduction, axis=0).tolist())
+
+    def where(
+        self,
+        variable: str,
+        op: str,
+        value: float,
+        reduction: str = "max",
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+        time: Optional[dt.datetime] = None,
+    ) -> List[Place]:
+        """Return the places for which a condition holds.
+
+        For example, places where the maximum wind speed between start and end
+        is above 15:
+
+            fleet.where("wind_speed", ">", 15, "max", start, end)
+
+        Args:
+            variable: Name of the variable.
+            op: Comparison operator, one of ">", ">=", "<", "<=", "==" or "!=".
+            value: Value to compare with.
+            reduction: Optional; Reduction over the time window, see reduce.
+            start: Optional; Start of the time window.
+            end: Optional; End of the time window.
+            time: Optional; Compare the value at this time instead of a
+                reduction over a time window.
+        """
+        if op not in OPERATORS:
+            raise ValueError(
+                f"{op} is not a valid operator, valid operators are {list(OPERATORS)}."
+            )
+        compare = OPERATORS[op]
+        scores = self._scores(variable, reduction, start, end, time)
+        np = import_numpy()
+        if np is None:
+            return [
+                place
+                for place, score in zip(self.places, scores)
+                if not math.isnan(score) and compare(score, value)
+            ]
+        with np.errstate(invalid="ignore"):
+            matches = compare(np.asarray(scores), value) & ~np.isnan(scores)
+        return [self.places[i] for i in np.flatnonzero(matches)]
+
+    def top(
+        self,
+        variable: str,
+        k: int,
+        reduction: str = "max",
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+        time: Optional[dt.datetime] = None,
+        largest: bool = True,
+    ) -> List[Tuple[Place, float]]:
+        """Return the k places with the largest, or smallest, values.
+
+        For example, the 20 warmest places at noon:
+
+            fleet.top("air_temperature", 20, time=noon)
+
+        Args:
+            variable: Name of the variable.
+            k: Number of places to return.
+            reduction: Optional; Reduction over the time window, see reduce.
+            start: Optional; Start of the time window.
+            end: Optional; End of the time window.
+            time: Optional; Rank by the value at this time instead of a
+                reduction over a time window.
+            largest: Optional; Return the places with the largest values,
+                defaults to True. Use False for the smallest values.
+
+        Returns:
+            A list of (place, value) pairs, best first. Places without a value
+            are left out.
+        """
+        scores = self._scores(variable, reduction, start, end, time)
+        np = import_numpy()
+        if np is None:
+            ranked = sorted(
+                (i for i, score in enumerate(scores) if not math.isnan(score)),
+                key=lambda i: scores[i],
+                reverse=largest,
+            )[:k]
+            return [(self.places[i], scores[i]) for i in ranked]
+
+        scores = np.asarray(scores)
+        keys = -scores if largest else scores
+        candidates = np.flatnonzero(~np.isnan(scores))
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(keys[candidates], k)[:k]]
+        ranked = candidates[np.argsort(keys[candidates], kind="stable")]
+        return [(self.places[i], float(scores[i])) for i in ranked]
@@ -3,23 +3,157 @@
 Classes:
     Forecast: Stores forecast data, has methods for updating, saving and loading
         data.
+
+Functions:
+    parse_json: Retrieve weather data from json data
 """
 
 import datetime as dt
 import json
+from bisect import bisect_left
 from pathlib import Path
-from typing import Dict, Optional, Union
-from zoneinfo import ZoneInfo
-
-import requests
-
-from .config import Config
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from . import cache, hooks
+from .cache import DataCache
+from .config import Config, get_config
 from .data_containers import Data, Interval, Place, Variable
+from .storage import STORAGE_TYPES, StorageBackend, get_storage, place_key_prefix
+
+if TYPE_CHECKING:
+    # requests and zoneinfo are imported when first needed to keep imports fast.
+    import requests
 
 YR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 HTTP_DATETIME_FORMAT = "%a, %d %b %Y %H:%M:%S %Z"
 
-CONFIG = Config()
+
+def __getattr__(name: str) -> Any:
+    # CONFIG is resolved on first use rather than at import, assigning a Config
+    # to CONFIG replaces the shared configuration for this module.
+    if name == "CONFIG":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _config() -> Config:
+    """Return the configuration assigned to CONFIG, or else the shared configuration."""
+    config = globals().get("CONFIG")
+    return config if isinstance(config, Config) else get_config()
+
+
+Window = Union[dt.timedelta, Tuple[Optional[dt.datetime], Optional[dt.datetime]]]
+
+
+def _parse_http_datetime(value: str) -> dt.datetime:
+    """Parse a datetime from an HTTP header."""
+    from zoneinfo import ZoneInfo
+
+    return dt.datetime.strptime(value, HTTP_DATETIME_FORMAT).replace(tzinfo=ZoneInfo(value[-3:]))
+
+
+def _timeseries_time(time: dt.datetime) -> str:
+    """Format a datetime the way times are formatted in the timeseries, naive times are UTC."""
+    if time.tzinfo is not None:
+        time = time.astimezone(dt.timezone.utc)
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _window_timeseries(
+    timeseries: List[Dict[str, Any]], window: Optional[Window]
+) -> List[Dict[str, Any]]:
+    """Return the timeseries entries in a time window, without parsing their times.
+
+    Times in the timeseries are in UTC and in chronological order, so they are
+    compared as strings and the entries are found by bisection.
+    """
+    if window is None or not timeseries:
+        return timeseries
+
+    start: Optional[dt.datetime]
+    end: Optional[dt.datetime]
+    if isinstance(window, dt.timedelta):
+        first = dt.datetime.strptime(timeseries[0]["time"], YR_DATETIME_FORMAT)
+        start, end = None, first + window
+    else:
+        start, end = window
+
+    times = [entry["time"] for entry in timeseries]
+    first_index = 0 if start is None else bisect_left(times, _timeseries_time(start))
+    last_index = len(times) if end is None else bisect_left(times, _timeseries_time(end))
+    return timeseries[first_index:last_index]
+
+
+def parse_json(
+    json: Dict[str, Any],
+    variables: Optional[AbstractSet[str]] = None,
+    window: Optional[Window] = None,
+) -> Data:
+    """Retrieve weather data from json data, as saved by a Forecast.
+
+    Args:
+        json: Json data as an object.
+        variables: Optional; Names of the variables to include, other variables
+            are skipped. Defaults to all variables.
+        window: Optional; Only include intervals starting in this time window,
+            either a (start, end) pair of datetimes, either of which may be
+            None, or a timedelta for a window of that length from the start of
+            the first interval. Defaults to all intervals.
+    """
+    last_modified = _parse_http_datetime(json["headers"]["Last-Modified"])
+    expires = _parse_http_datetime(json["headers"]["Expires"])
+
+    updated_at = dt.datetime.strptime(
+        json["data"]["properties"]["meta"]["updated_at"], YR_DATETIME_FORMAT
+    )
+
+    units = json["data"]["properties"]["meta"]["units"]
+    if variables is not None:
+        units = {name: unit for name, unit in units.items() if name in variables}
+
+    intervals = []
+    for timeseries in _window_timeseries(json["data"]["properties"]["timeseries"], window):
+        start_time = dt.datetime.strptime(timeseries["time"], YR_DATETIME_FORMAT)
+
+        interval_variables = {}
+        for var_name, var_value in timeseries["data"]["instant"]["details"].items():
+            if variables is None or var_name in variables:
+                interval_variables[var_name] = Variable(var_name, var_value, units[var_name])
+
+        # Take the shortest time interval available.
+        hours = 0
+        if "next_1_hours" in timeseries["data"]:
+            hours = 1
+        elif "next_6_hours" in timeseries["data"]:
+            hours = 6
+        elif "next_12_hours" in timeseries["data"]:
+            hours = 12
+
+        end_time = start_time + dt.timedelta(hours=hours)
+
+        if hours != 0:
+            symbol_code = timeseries["data"][f"next_{hours}_hours"]["summary"]["symbol_code"]
+
+            for var_name, var_value in timeseries["data"][f"next_{hours}_hours"]["details"].items():
+                if variables is None or var_name in variables:
+                    interval_variables[var_name] = Variable(var_name, var_value, units[var_name])
+        else:
+            symbol_code = None
+
+        intervals.append(Interval(start_time, end_time, symbol_code, interval_variables))
+
+    return Data(last_modified, expires, updated_at, units, intervals)
 
 
 class Forecast:
@@ -31,8 +165,18 @@ class Forecast:
         user_agent: the user agent to be sent with requests.
         save_location (Path): Location to cache data.
         base_url: Base url to make requests to.
-        response (requests.Response): Response object.
-        json_string (str): Json data as a string.
+        storage (StorageBackend): Backend used to cache data.
+        data_cache (Optional[DataCache]): In process cache of parsed data, None
+            if parsed data is not shared.
+        variables (Optional[frozenset]): Names of the variables to parse, None
+            for all variables.
+        window: Time window of the intervals to parse, None for all intervals.
+        lean (bool): Whether only the parsed data is kept in memory, raw json
+            data and the response are released once the data is saved.
+        response (requests.Response): Response object. Not kept in lean mode.
+        json_string (str): Json data as a string. Read from storage on first
+            access if the data was taken from the data cache or released in
+            lean mode.
         json: Json data as an object.
         data (dict): Weather data.
 
@@ -51,6 +195,11 @@ class Forecast:
         forecast_type: Optional[str] = None,
         save_location: Optional[str] = None,
         base_url: Optional[str] = None,
+        storage: Union[str, StorageBackend, None] = None,
+        data_cache: Union[bool, DataCache, None] = None,
+        variables: Optional[Iterable[str]] = None,
+        window: Optional[Window] = None,
+        lean: Optional[bool] = None,
     ):
         """Create a Forecast object.
 
@@ -60,35 +209,52 @@ class Forecast:
             forecast_type: The type of foreast to retrieve
             save_location: Optional; Location to cache data
             base_url: Optional; URL to make requests to
+            storage: Optional; Storage backend, or the type of storage backend,
+                used to cache data
+            data_cache: Optional; Data cache to share parsed data through, True
+                for the process wide cache or False for no cache
+            variables: Optional; Names of the variables to parse, other
+                variables are skipped when parsing so that they take no time or
+                memory. All data is still saved. Defaults to all variables.
+            window: Optional; Only parse intervals starting in this time
+                window, either a (start, end) pair of datetimes, either of which
+                may be None, or a timedelta, e.g. 48 hours, for a window of that
+                length from the start of the forecast. All data is still saved.
+                Defaults to all intervals.
+            lean: Optional; Whether to keep only the parsed data in memory. Raw
+                json data and the response are released once the data is saved
+                or loaded and read from storage again when needed, e.g. to
+                update the saved data after a 304 Not Modified response.
         """
         if not isinstance(place, Place):
             msg = f"{place} is not a metno_locationforecast.Place object."
             raise TypeError(msg)
         self.place = place
+        config = _config()
 
         if user_agent is None:
-            if CONFIG.user_agent is None:
+            if config.user_agent is None:
                 msg = (
                     "User agent has not been provided. This must be passed as an argument or set "
                     "as a configuration."
                 )
                 raise ValueError(msg)
-            self.user_agent = CONFIG.user_agent
+            self.user_agent = config.user_agent
         else:
             self.user_agent = user_agent
 
         if forecast_type is None:
-            self.forecast_type = CONFIG.forecast_type
+            self.forecast_type = config.forecast_type
         else:
             self.forecast_type = forecast_type
 
         if save_location is None:
-            self.save_location = Path(CONFIG.save_location).expanduser().resolve()
+            self.save_location = Path(config.save_location).expanduser().resolve()
         else:
             self.save_location = Path(save_location).expanduser().resolve()
 
         if base_url is None:
-            self.base_url = CONFIG.base_url
+            self.base_url = config.base_url
         else:
             self.base_url = base_url
 
@@ -102,10 +268,41 @@ class Forecast:
             )
             raise ValueError(msg)
 
+        if storage is None:
+            storage = config.storage
+        if isinstance(storage, str) and storage not in STORAGE_TYPES:
+            msg = (
+                f"{storage} is not an available storage type. Available types are: "
+                f"{STORAGE_TYPES}."
+            )
+            raise ValueError(msg)
+        # Backends given by type are created on first use so that they follow
+        # changes to save_location.
+        self._storage = storage
+
+        if data_cache is None:
+            data_cache = config.data_cache
+        if data_cache is True:
+            self.data_cache: Optional[DataCache] = cache.DATA_CACHE
+        elif data_cache is False:
+            self.data_cache = None
+        else:
+            self.data_cache = data_cache
+
+        self.variables: Optional[FrozenSet[str]] = (
+            None if variables is None else frozenset(variables)
+        )
+
+        if window is not None and not isinstance(window, dt.timedelta):
+            window = (window[0], window[1])
+        self.window = window
+
+        self.lean = config.lean if lean is None else lean
+
         # Typing information for mypy.
-        self.response: requests.Response
-        self.json_string: str
-        self.json: dict  # type: ignore
+        self.response: "requests.Response"
+        self._json_string: Optional[str] = None
+        self._json: Optional[Dict[str, Any]] = None
         self.data: Data
 
     def __repr__(self) -> str:
@@ -152,7 +349,8 @@ class Forecast:
         headers = {
             "User-Agent": self.user_agent,
         }
-        if hasattr(self, "data"):
+        # Data can only be marked as not modified if the saved json can be updated.
+        if hasattr(self, "data") and self._has_json():
             headers["If-Modified-Since"] = self.data.last_modified.strftime(HTTP_DATETIME_FORMAT)
 
         return headers
@@ -160,9 +358,73 @@ class Forecast:
     @property
     def file_name(self) -> str:
         """File name for caching data."""
+        return f"{place_key_prefix(self.place)}{self.forecast_type}.json"
+
+    @property
+    def cache_key(self) -> Tuple[Union[str, float, int, FrozenSet[str], Window, None], ...]:
+        """Identity of the forecast in the data cache."""
+        return (
+            self.url,
+            self.place.coordinates["latitude"],
+            self.place.coordinates["longitude"],
+            self.place.coordinates["altitude"],
+            self.variables,
+            self.window,
+        )
+
+    @property
+    def json_string(self) -> str:
+        """Json data as a string."""
+        if self._json_string is None:
+            json_string = self.storage.get(self.file_name) if hasattr(self, "data") else None
+            if json_string is None:
+                raise AttributeError("'Forecast' object has no attribute 'json_string'")
+            self._json_string = json_string
+        return self._json_string
+
+    @json_string.setter
+    def json_string(self, value: str) -> None:
+        self._json_string = value
+
+    @property
+    def json(self) -> Dict[str, Any]:
+        """Json data as an object."""
+        if self._json is None:
+            self._json = json.loads(self.json_string)
+        return self._json
+
+    @json.setter
+    def json(self, value: Dict[str, Any]) -> None:
+        self._json = value
+
+    def _has_json(self) -> bool:
+        """Return True if json data is in memory or can be read from storage."""
+        if self._json_string is not None or self._json is not None:
+            return True
+        return self.storage.exists(self.file_name)
+
+    def _release(self) -> None:
+        """Release the raw json data and the response, keeping only the parsed data."""
+        self._json_string = None
+        self._json = None
+        if hasattr(self, "response"):
+            del self.response
+
+    @property
+    def storage(self) -> StorageBackend:
+        """Storage backend used to cache data."""
+        if isinstance(self._storage, StorageBackend):
+            return self._storage
+        return get_storage(self._storage, self.save_location)
+
+    def _freshness(self) -> Tuple[Optional[dt.datetime], Optional[dt.datetime]]:
+        """Return the expires and last modified datetimes of the json data, if known."""
+        headers = self.json.get("headers", {}) if hasattr(self, "json") else {}
+        expires = headers.get("Expires")
+        last_modified = headers.get("Last-Modified")
         return (
-            f"lat{self.place.coordinates['latitude']}lon{self.place.coordinates['longitude']}"
-            + f"altitude{self.place.coordinates['altitude']}_{self.forecast_type}.json"
+            None if expires is None else _parse_http_datetime(expires),
+            None if last_modified is None else _parse_http_datetime(last_modified),
         )
 
     def _json_from_response(self) -> None:
@@ -194,81 +456,75 @@ class Forecast:
         Side Effects:
             self.data
         """
-        json = self.json
-
-        last_modified = dt.datetime.strptime(
-            json["headers"]["Last-Modified"], HTTP_DATETIME_FORMAT
-        ).replace(tzinfo=ZoneInfo(json["headers"]["Last-Modified"][-3:]))
-        expires = dt.datetime.strptime(json["headers"]["Expires"], HTTP_DATETIME_FORMAT).replace(
-            tzinfo=ZoneInfo(json["headers"]["Last-Modified"][-3:])
-        )
-
-        updated_at = dt.datetime.strptime(
-            json["data"]["properties"]["meta"]["updated_at"], YR_DATETIME_FORMAT
-        )
-
-        units = json["data"]["properties"]["meta"]["units"]
-
-        intervals = []
-        for timeseries in json["data"]["properties"]["timeseries"]:
-            start_time = dt.datetime.strptime(timeseries["time"], YR_DATETIME_FORMAT)
-
-            variables = {}
-            for var_name, var_value in timeseries["data"]["instant"]["details"].items():
-                variables[var_name] = Variable(var_name, var_value, units[var_name])
-
-            # Take the shortest time interval available.
-            hours = 0
-            if "next_1_hours" in timeseries["data"]:
-                hours = 1
-            elif "next_6_hours" in timeseries["data"]:
-                hours = 6
-            elif "next_12_hours" in timeseries["data"]:
-                hours = 12
-
-            end_time = start_time + dt.timedelta(hours=hours)
-
-            if hours != 0:
-                symbol_code = timeseries["data"][f"next_{hours}_hours"]["summary"]["symbol_code"]
-
-                for var_name, var_value in timeseries["data"][f"next_{hours}_hours"][
-                    "details"
-                ].items():
-                    variables[var_name] = Variable(var_name, var_value, units[var_name])
-            else:
-                symbol_code = None
-
-            intervals.append(Interval(start_time, end_time, symbol_code, variables))
-
-        self.data = Data(last_modified, expires, updated_at, units, intervals)
+        with hooks._timer("parse", self) as timer:
+            self.data = parse_json(self.json, self.variables, self.window)
+            if timer:
+                timer.size = None if self._json_string is None else len(self._json_string)
 
     def _data_outdated(self) -> bool:
         return self.data.expires < dt.datetime.now(dt.timezone.utc)
 
     def save(self) -> None:
-        """Save data to save location."""
-        if not self.save_location.exists():
-            self.save_location.mkdir(parents=True)
-        elif not self.save_location.is_dir():
-            raise NotADirectoryError(f"Expected {self.save_location} to be a directory.")
-
-        file_path = Path(self.save_location).joinpath(self.file_name)
-        file_path.write_text(self.json_string)
+        """Save data to storage."""
+        with hooks._timer("save", self) as timer:
+            expires, last_modified = self._freshness()
+            self.storage.put(self.file_name, self.json_string, expires, last_modified)
+            if timer:
+                timer.size = len(self.json_string)
+
+    def _cache_data(self) -> None:
+        """Add parsed data to the data cache, if there is one."""
+        if self.data_cache is not None:
+            self.data_cache.put(self.cache_key, self.data, len(self.json_string))
+
+    def _load_from_cache(self) -> bool:
+        """Take data from the data cache, return True if fresh data was found."""
+        if self.data_cache is None:
+            return False
+        data = self.data_cache.get(self.cache_key)
+        if data is None:
+            return False
+        self.data = data
+        self._json_string = None
+        self._json = None
+        return True
+
+    def _load_json_string(self, json_string: str, data: Optional[Data] = None) -> None:
+        """Take data from saved json, data may be given if it has already been parsed."""
+        self.json_string = json_string
+        if data is None:
+            self.json = json.loads(json_string)
+            self._parse_json()
+        else:
+            self._json = None
+            self.data = data
+        self._cache_data()
+        if self.lean:
+            self._release()
 
     def load(self) -> None:
-        """Load data from saved file."""
-        file_path = Path(self.save_location).joinpath(self.file_name)
-        self.json_string = file_path.read_text()
-        self.json = json.loads(self.json_string)
-        self._parse_json()
+        """Load data from the data cache if possible, otherwise from storage."""
+        with hooks._timer("load", self) as timer:
+            if self._load_from_cache():
+                if timer:
+                    timer.status = "cache"
+                return
+
+            json_string = self.storage.get(self.file_name)
+            if json_string is None:
+                raise FileNotFoundError(f"No saved data for {self.file_name} in {self.storage}.")
+            if timer:
+                timer.status = "storage"
+                timer.size = len(json_string)
+        self._load_json_string(json_string)
 
     def update(self) -> str:
         """Update forecast data.
 
         Will make a request to the MET API for data and will save the data to
-        the 'save_location'. If data already exists for the forecast this will
-        only request new data if the data has expired and will make the request
-        using the appropriate 'If-Modified-Since' header.
+        storage, by default the 'save_location'. If data already exists for the
+        forecast this will only request new data if the data has expired and
+        will make the request using the appropriate 'If-Modified-Since' header.
 
         Returns:
             "Data-Not-Expired": If the data has not expired yet.
@@ -276,18 +532,40 @@ class Forecast:
                 yet.
             "Data-Modified": If new data has been acquired.
         """
+        with hooks._timer("update", self) as timer:
+            return_status = self._update()
+            if timer:
+                timer.status = return_status
+                if return_status != "Data-Not-Expired":
+                    timer.status_code = self.response.status_code
+                    timer.size = len(self.response.content)
+        if self.lean:
+            self._release()
+        return return_status
+
+    def _update(self) -> str:
+        """Update forecast data, see update."""
         return_status = ""
 
         if not hasattr(self, "data"):
-            file_path = Path(self.save_location).joinpath(self.file_name)
-            if file_path.exists():
+            try:
                 self.load()
+            except FileNotFoundError:
+                pass
 
         if hasattr(self, "data") and not self._data_outdated():
             return_status = "Data-Not-Expired"
             return return_status
 
-        self.response = requests.get(self.url, params=self.url_parameters, headers=self.url_headers)
+        import requests
+
+        with hooks._timer("request", self) as timer:
+            self.response = requests.get(
+                self.url, params=self.url_parameters, headers=self.url_headers
+            )
+            if timer:
+                timer.status_code = self.response.status_code
+                timer.size = len(self.response.content)
 
         if self.response.status_code == 304:
             return_status = "Data-Not-Modified"
@@ -295,8 +573,12 @@ class Forecast:
             self.response.raise_for_status()
             return_status = "Data-Modified"
 
-        self._json_from_response()
+        with hooks._timer("json_from_response", self) as timer:
+            self._json_from_response()
+            if timer:
+                timer.size = len(self.json_string)
         self.save()
         self._parse_json()
+        self._cache_data()
 
         return return_status
@@ -0,0 +1,204 @@
+"""Instrumentation hooks for timing the phases of loading and updating forecasts.
+
+Subscribers are called with an Event at the end of each phase of Forecast.load
+and Forecast.update, whether the phase succeeded or not. The phases are:
+
+- "load": reading saved data from the data cache or storage.
+- "request": the HTTP request to the MET API.
+- "json_from_response": building json data from the response.
+- "save": saving json data to storage.
+- "parse": parsing json data into a Data object.
+- "update": the whole of Forecast.update, including the phases above.
+
+With no subscribers the phases are not timed, so hooks cost next to nothing
+unless they are used. Subscribers are called in the thread doing the work and
+any exception they raise propagates to the caller.
+
+Classes:
+    Event: Timing and size of one phase for one forecast
+
+Functions:
+    subscribe: Call a function with every event
+    unsubscribe: Stop calling a function with events
+    subscribed: Context manager subscribing a function for the duration of a block
+
+Attributes:
+    PHASES: Names of the phases events are emitted for
+"""
+
+import contextlib
+import threading
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple, Type, Union
+
+if TYPE_CHECKING:
+    from .data_containers import Place
+    from .forecast import Forecast
+
+PHASES = ("load", "request", "json_from_response", "save", "parse", "update")
+
+
+class Event:
+    """Timing and size of one phase for one forecast.
+
+    Attributes:
+        phase: Name of the phase, one of PHASES.
+        place: Place of the forecast.
+        key: Key of the forecast's data in storage.
+        duration: Time taken in seconds.
+        status_code: Optional; HTTP status code of the response, for "request"
+            and "update" events that made a request.
+        size: Optional; Size of the data handled, in bytes for responses and in
+            characters of json for saved data.
+        status: Optional; For "update" events the status returned by update,
+            for "load" events where the data came from, "cache" or "storage".
+        error: Optional; The exception raised during the phase, if any.
+    """
+
+    def __init__(
+        self,
+        phase: str,
+        place: "Place",
+        key: str,
+        duration: float,
+        status_code: Optional[int] = None,
+        size: Optional[int] = None,
+        status: Optional[str] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """Create an Event object.
+
+        Args:
+            phase: Name of the phase.
+            place: Place of the forecast.
+            key: Key of the forecast's data in storage.
+            duration: Time taken in seconds.
+            status_code: Optional; HTTP status code of the response.
+            size: Optional; Size of the data handled.
+            status: Optional; Status of the phase.
+            error: Optional; The exception raised during the phase.
+        """
+        self.phase = phase
+        self.place = place
+        self.key = key
+        self.duration = duration
+        self.status_code = status_code
+        self.size = size
+        self.status = status
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"Event({self.phase}, {self.place}, {self.key}, duration={self.duration:.6f}s, "
+            f"status_code={self.status_code}, size={self.size}, status={self.status}, "
+            f"error={self.error!r})"
+        )
+
+
+Subscriber = Callable[[Event], None]
+
+# Replaced rather than changed so that events can be emitted without a lock.
+_SUBSCRIBERS: Tuple[Subscriber, ...] = ()
+_LOCK = threading.Lock()
+
+
+def subscribe(subscriber: Subscriber) -> None:
+    """Call a function with every event, functions are called in the order they subscribed."""
+    global _SUBSCRIBERS
+    with _LOCK:
+        _SUBSCRIBERS = _SUBSCRIBERS + (subscriber,)
+
+
+def unsubscribe(subscriber: Subscriber) -> None:
+    """Stop calling a function with events, does nothing if it is not subscribed."""
+    global _SUBSCRIBERS
+    with _LOCK:
+        _SUBSCRIBERS = tuple(other for other in _SUBSCRIBERS if other != subscriber)
+
+
+@contextlib.contextmanager
+def subscribed(subscriber: Subscriber) -> Iterator[Subscriber]:
+    """Subscribe a function for the duration of a with block."""
+    subscribe(subscriber)
+    try:
+        yield subscriber
+    finally:
+        unsubscribe(subscriber)
+
+
+class _Timer:
+    """Times a phase, emitting an event to subscribers when it ends.
+
+    Details of the phase are set as attributes while it runs.
+    """
+
+    def __init__(self, phase: str, forecast: "Forecast"):
+        self.phase = phase
+        self.forecast = forecast
+        self.status_code: Optional[int] = None
+        self.size: Optional[int] = None
+        self.status: Optional[str] = None
+        self._start = 0.0
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        duration = time.perf_counter() - self._start
+        event = Event(
+            self.phase,
+            self.forecast.place,
+            self.forecast.file_name,
+            duration,
+            self.status_code,
+            self.size,
+            self.status,
+            exc,
+        )
+        for subscriber in _SUBSCRIBERS:
+            subscriber(event)
+
+
+class _NullTimer:
+    """Stands in for a timer when there are no subscribers.
+
+    It is false so that callers can skip working out details of the phase.
+    """
+
+    status_code: Optional[int] = None
+    size: Optional[int] = None
+    status: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _timer(phase: str, forecast: "Forecast") -> Union[_Timer, _NullTimer]:
+    """Return a context manager timing a phase, which does nothing if there are no subscribers."""
+    if not _SUBSCRIBERS:
+        return _NULL_TIMER
+    return _Timer(phase, forecast)
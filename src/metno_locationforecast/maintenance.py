@@ -0,0 +1,180 @@
+"""Maintenance of cached forecast data.
+
+Nothing is ever removed from storage by a forecast, so data for places that are
+no longer used piles up. The tools here evict such data.
+
+Classes:
+    GarbageCollector: Incrementally evicts entries from storage
+
+Functions:
+    collect_garbage: Evict entries from storage in one go
+"""
+
+import datetime as dt
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .data_containers import Place
+from .storage import StorageBackend, place_key_prefix
+
+EXPIRED = "expired"
+INACTIVE = "inactive"
+SIZE = "size"
+
+
+class GarbageCollector:
+    """Incrementally evicts entries from storage.
+
+    Entries are evicted if their data expired more than max_age ago, if they
+    do not belong to one of the places to keep, or, least recently accessed
+    first, while the total size of the remaining entries is above max_size.
+
+    Work is done in steps of a bounded number of entries so that collection can
+    be spread out over time without long pauses.
+
+    Attributes:
+        storage: Storage backend to collect from.
+        max_age: Optional; How long after expiring entries are evicted.
+        max_size: Optional; Maximum total size of entries in bytes.
+        keep: Optional; Places to keep entries for, entries for other places are
+            evicted.
+        evicted: List of (key, reason) pairs for all evicted entries.
+        done: True once collection has finished.
+
+    Methods:
+        step: Process a batch of entries.
+        run: Process all remaining entries.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        max_age: Optional[dt.timedelta] = None,
+        max_size: Optional[int] = None,
+        keep: Optional[Iterable[Place]] = None,
+        now: Optional[dt.datetime] = None,
+    ):
+        """Create a GarbageCollector object.
+
+        Args:
+            storage: Storage backend to collect from.
+            max_age: Optional; How long after expiring entries are evicted, a
+                timedelta of zero evicts all expired entries.
+            max_size: Optional; Maximum total size of entries in bytes.
+            keep: Optional; Places to keep entries for, entries for other places
+                are evicted.
+            now: Optional; Time to compare expiry against, defaults to the time
+                the collector is created.
+        """
+        self.storage = storage
+        self.max_age = max_age
+        self.max_size = max_size
+        self.keep = None if keep is None else list(keep)
+        self.now = dt.datetime.now(dt.timezone.utc) if now is None else now
+        self.evicted: List[Tuple[str, str]] = []
+        self.done = False
+
+        self._keep_prefixes: Optional[Tuple[str, ...]] = (
+            None if self.keep is None else tuple({place_key_prefix(place) for place in self.keep})
+        )
+        self._keys: Optional[Iterator[str]] = None
+        self._scanned = False
+        # (accessed_at, size, key) of kept entries, most recently accessed first.
+        self._candidates: List[Tuple[dt.datetime, int, str]] = []
+        self._total_size = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"GarbageCollector({self.storage}, max_age={self.max_age}, "
+            f"max_size={self.max_size}, keep={self.keep})"
+        )
+
+    def _is_kept_place(self, key: str) -> bool:
+        if self._keep_prefixes is None:
+            return True
+        return key.startswith(self._keep_prefixes)
+
+    def _evict(self, key: str, reason: str, evicted: List[Tuple[str, str]]) -> None:
+        if self.storage.delete(key):
+            evicted.append((key, reason))
+            self.evicted.append((key, reason))
+
+    def step(self, batch_size: int = 100) -> List[Tuple[str, str]]:
+        """Process a batch of entries.
+
+        Args:
+            batch_size: Optional; Maximum number of entries to process.
+
+        Returns:
+            A list of (key, reason) pairs for the entries evicted in this step.
+            Reason is one of "expired", "inactive" or "size".
+        """
+        evicted: List[Tuple[str, str]] = []
+        work = 0
+
+        if self._keys is None:
+            self._keys = iter(self.storage.keys())
+
+        while not self._scanned and work < batch_size:
+            key = next(self._keys, None)
+            if key is None:
+                self._scanned = True
+                self._candidates.sort(reverse=True)
+                break
+            work += 1
+
+            if not self._is_kept_place(key):
+                self._evict(key, INACTIVE, evicted)
+                continue
+
+            metadata = self.storage.metadata(key)
+            if metadata is None:
+                continue
+
+            if (
+                self.max_age is not None
+                and metadata.expires is not None
+                and self.now - metadata.expires > self.max_age
+            ):
+                self._evict(key, EXPIRED, evicted)
+                continue
+
+            self._candidates.append((metadata.accessed_at, metadata.size, key))
+            self._total_size += metadata.size
+
+        while self._scanned and not self.done and work < batch_size:
+            if self.max_size is None or self._total_size <= self.max_size or not self._candidates:
+                self.done = True
+                break
+            work += 1
+
+            _, size, key = self._candidates.pop()
+            self._evict(key, SIZE, evicted)
+            self._total_size -= size
+
+        if self._scanned and (self.max_size is None or self._total_size <= self.max_size):
+            self.done = True
+
+        return evicted
+
+    def run(self) -> List[Tuple[str, str]]:
+        """Process all remaining entries, return (key, reason) pairs for evicted entries."""
+        evicted: List[Tuple[str, str]] = []
+        while not self.done:
+            evicted.extend(self.step())
+        return evicted
+
+
+def collect_garbage(
+    storage: StorageBackend,
+    max_age: Optional[dt.timedelta] = None,
+    max_size: Optional[int] = None,
+    keep: Optional[Iterable[Place]] = None,
+) -> List[Tuple[str, str]]:
+    """Evict entries from storage in one go.
+
+    See GarbageCollector for details of which entries are evicted.
+
+    Returns:
+        A list of (key, reason) pairs for the evicted entries.
+    """
+    return GarbageCollector(storage, max_age, max_size, keep).run()
@@ -0,0 +1,406 @@
+"""An index of the forecasts saved in a save location.
+
+The manifest lets the forecasts in a save location be listed, along with when
+they expire, in a single small read rather than by reading every saved file.
+
+It is an append only log of json lines, one line per save or delete, which
+makes each update a single atomic write. Later lines take precedence over
+earlier ones and compacting the manifest rewrites it with only the latest line
+for each key. A manifest compacts itself once it has several lines for every
+saved forecast, so it stays small however often forecasts are saved.
+
+Classes:
+    ManifestEntry: Information about a saved forecast
+    Manifest: An index of the forecasts saved in a save location
+"""
+
+import datetime as dt
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from ._utils import parse_number
+from .data_containers import Place
+
+if TYPE_CHECKING:
+    from .forecast import Forecast
+    from .storage import StorageBackend
+
+MANIFEST_FILE_NAME = "manifest.jsonl"
+
+KEY_PATTERN = re.compile(
+    r"^lat(?P<latitude>-?[\d.]+)lon(?P<longitude>-?[\d.]+)"
+    r"altitude(?P<altitude>-?\d+|None)_(?P<forecast_type>.*)\.json$"
+)
+
+
+def _to_timestamp(value: Optional[dt.datetime]) -> Optional[float]:
+    return None if value is None else value.timestamp()
+
+
+def _from_timestamp(value: Optional[float]) -> Optional[dt.datetime]:
+    return None if value is None else dt.datetime.fromtimestamp(value, dt.timezone.utc)
+
+
+class ManifestEntry:
+    """Information about a saved forecast.
+
+    Attributes:
+        key: Key of the forecast in storage, its file name.
+        size: Size of the saved data in bytes.
+        stored_at: Date and time the data was saved.
+        expires: Optional; Date and time the data expires.
+        last_modified: Optional; Date and time the data was last modified.
+        place (Optional[Place]): Place of the forecast, None if the key is not
+            in the format used by Forecast.file_name.
+        forecast_type (Optional[str]): Type of the forecast.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        size: int,
+        stored_at: dt.datetime,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ):
+        """Create a ManifestEntry object.
+
+        Args:
+            key: Key of the forecast in storage, its file name.
+            size: Size of the saved data in bytes.
+            stored_at: Date and time the data was saved.
+            expires: Optional; Date and time the data expires.
+            last_modified: Optional; Date and time the data was last modified.
+        """
+        self.key = key
+        self.size = size
+        self.stored_at = stored_at
+        self.expires = expires
+        self.last_modified = last_modified
+
+    def __repr__(self) -> str:
+        return (
+            f"ManifestEntry({self.key}, {self.size}, {self.stored_at}, {self.expires}, "
+            f"{self.last_modified})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ManifestEntry):
+            return (
+                self.key == other.key
+                and self.size == other.size
+                and self.stored_at == other.stored_at
+                and self.expires == other.expires
+                and self.last_modified == other.last_modified
+            )
+        return NotImplemented
+
+    @property
+    def place(self) -> Optional[Place]:
+        """Place of the forecast, named after its coordinates."""
+        match = KEY_PATTERN.match(self.key)
+        if match is None:
+            return None
+        altitude = match["altitude"]
+        return Place(
+            self.key[: match.start("forecast_type") - 1],
+            parse_number(match["latitude"]),
+            parse_number(match["longitude"]),
+            None if altitude == "None" else int(altitude),
+        )
+
+    @property
+    def forecast_type(self) -> Optional[str]:
+        """Type of the forecast."""
+        match = KEY_PATTERN.match(self.key)
+        return None if match is None else match["forecast_type"]
+
+    def is_fresh(self, now: Optional[dt.datetime] = None) -> bool:
+        """Return True if the saved data has a known expiry in the future."""
+        if self.expires is None:
+            return False
+        if now is None:
+            now = dt.datetime.now(dt.timezone.utc)
+        return now <= self.expires
+
+    def forecast(self, user_agent: Optional[str] = None, **kwargs: Any) -> "Forecast":
+        """Create a Forecast for this entry.
+
+        Args:
+            user_agent: Optional; The user-agent identifier to be sent with
+                requests.
+            **kwargs: Other arguments passed to Forecast, e.g. save_location.
+        """
+        from .forecast import Forecast
+
+        place = self.place
+        if place is None:
+            raise ValueError(f"{self.key} is not the key of a forecast.")
+        return Forecast(place, user_agent, self.forecast_type, **kwargs)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Return the json record for this entry."""
+        return {
+            "key": self.key,
+            "size": self.size,
+            "stored_at": self.stored_at.timestamp(),
+            "expires": _to_timestamp(self.expires),
+            "last_modified": _to_timestamp(self.last_modified),
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "ManifestEntry":
+        """Create an entry from a json record."""
+        return cls(
+            record["key"],
+            record["size"],
+            dt.datetime.fromtimestamp(record["stored_at"], dt.timezone.utc),
+            _from_timestamp(record.get("expires")),
+            _from_timestamp(record.get("last_modified")),
+        )
+
+
+class Manifest:
+    """An index of the forecasts saved in a save location.
+
+    Reading the manifest only reads lines appended since it was last read, so
+    checking it repeatedly is cheap. Every compact_check_interval records the
+    manifest checks its size and compacts itself if it has more than
+    compact_ratio lines per entry and at least compact_min_lines lines.
+
+    Attributes:
+        location (Path): The save location.
+        path (Path): Path to the manifest file.
+        compact_ratio (int): Lines per entry above which the manifest is
+            compacted automatically, 0 to never compact automatically.
+        compact_min_lines (int): Lines below which the manifest is never
+            compacted automatically.
+        compact_check_interval (int): Number of records between checks of the
+            size of the manifest.
+
+    Methods:
+        record: Record that a forecast was saved.
+        remove: Record that a forecast was deleted.
+        entries: Get entries for all saved forecasts.
+        get: Get the entry for a saved forecast.
+        compact: Rewrite the manifest without superseded lines.
+        rebuild: Rewrite the manifest from the contents of a storage backend.
+        forecasts: Create forecasts for saved entries.
+        warm: Create and load forecasts for saved entries.
+    """
+
+    compact_ratio = 4
+    compact_min_lines = 1000
+    compact_check_interval = 100
+
+    def __init__(self, location: Union[str, Path]):
+        """Create a Manifest object.
+
+        Args:
+            location: The save location, the manifest is stored in this
+                directory.
+        """
+        self.location = Path(location).expanduser().resolve()
+        self.path = self.location.joinpath(MANIFEST_FILE_NAME)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._lines = 0
+        self._records = 0
+
+    def __repr__(self) -> str:
+        return f"Manifest({self.location})"
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append a record as a single write, which concurrent writers cannot interleave."""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        if not self.location.exists():
+            self.location.mkdir(parents=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+        with self._lock:
+            self._records += 1
+            check = self.compact_ratio and self._records % self.compact_check_interval == 0
+        if check:
+            self._compact_if_large()
+
+    def _compact_if_large(self) -> None:
+        """Compact the manifest if it has too many superseded lines."""
+        with self._lock:
+            self._refresh()
+            if self._lines >= max(self.compact_min_lines, self.compact_ratio * len(self._entries)):
+                self._write(list(self._entries.values()))
+
+    def record(
+        self,
+        key: str,
+        size: int,
+        stored_at: dt.datetime,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ) -> None:
+        """Record that a forecast was saved."""
+        self._append(ManifestEntry(key, size, stored_at, expires, last_modified).to_record())
+
+    def remove(self, key: str) -> None:
+        """Record that a forecast was deleted."""
+        self._append({"key": key, "deleted": True})
+
+    def _refresh(self) -> None:
+        """Read lines appended since the manifest was last read."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._entries, self._inode, self._offset, self._lines = {}, None, 0, 0
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # The manifest was replaced, by compaction for example, read it all.
+            self._entries, self._inode, self._offset, self._lines = {}, stat.st_ino, 0, 0
+        if stat.st_size == self._offset:
+            return
+
+        with self.path.open("rb") as file:
+            file.seek(self._offset)
+            chunk = file.read(stat.st_size - self._offset)
+
+        # Leave any partially written last line for the next read.
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                record = json.loads(line)
+                if record.get("deleted"):
+                    self._entries.pop(record["key"], None)
+                else:
+                    self._entries[record["key"]] = ManifestEntry.from_record(record)
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._lines += 1
+        self._offset += end
+
+    def entries(self, fresh_only: bool = False) -> Dict[str, ManifestEntry]:
+        """Return entries for all saved forecasts, indexed by key.
+
+        Args:
+            fresh_only: Optional; Only include entries whose data has not
+                expired.
+        """
+        with self._lock:
+            self._refresh()
+            entries = dict(self._entries)
+        if fresh_only:
+            now = dt.datetime.now(dt.timezone.utc)
+            entries = {key: entry for key, entry in entries.items() if entry.is_fresh(now)}
+        return entries
+
+    def get(self, key: str) -> Optional[ManifestEntry]:
+        """Return the entry for a saved forecast, None if there is no entry."""
+        with self._lock:
+            self._refresh()
+            return self._entries.get(key)
+
+    def _write(self, entries: List[ManifestEntry]) -> None:
+        """Atomically replace the manifest with the given entries."""
+        if not self.location.exists():
+            self.location.mkdir(parents=True)
+        temporary_path = self.path.with_name(f"{MANIFEST_FILE_NAME}.{os.getpid()}.tmp")
+        lines = "".join(
+            json.dumps(entry.to_record(), separators=(",", ":")) + "\n" for entry in entries
+        )
+        temporary_path.write_text(lines)
+        os.replace(temporary_path, self.path)
+        # The replacement is read again on the next refresh.
+        self._inode = None
+
+    def compact(self) -> None:
+        """Rewrite the manifest without superseded lines.
+
+        Saves made by other processes while compacting may be lost from the
+        manifest. Storage reads the saved file for forecasts missing from the
+        manifest, so this only leaves them out of listings until they are next
+        saved, rebuild the manifest to add them straight away.
+        """
+        with self._lock:
+            self._refresh()
+            if self._lines == len(self._entries):
+                return
+            self._write(list(self._entries.values()))
+
+    def rebuild(self, storage: "StorageBackend") -> None:
+        """Rewrite the manifest from the contents of a storage backend.
+
+        Use this to index data saved before the manifest existed. This reads
+        every saved forecast.
+        """
+        entries = []
+        for key in storage.keys():
+            metadata = storage.metadata(key)
+            if metadata is not None:
+                entries.append(
+                    ManifestEntry(
+                        key,
+                        metadata.size,
+                        metadata.stored_at,
+                        metadata.expires,
+                        metadata.last_modified,
+                    )
+                )
+        with self._lock:
+            self._write(entries)
+
+    def forecasts(
+        self, user_agent: Optional[str] = None, fresh_only: bool = False, **kwargs: Any
+    ) -> List["Forecast"]:
+        """Create forecasts for saved entries, data is not loaded.
+
+        Args:
+            user_agent: Optional; The user-agent identifier to be sent with
+                requests.
+            fresh_only: Optional; Only include entries whose data has not
+                expired.
+            **kwargs: Other arguments passed to Forecast.
+        """
+        kwargs.setdefault("save_location", str(self.location))
+        return [
+            entry.forecast(user_agent, **kwargs)
+            for entry in self.entries(fresh_only).values()
+            if entry.place is not None
+        ]
+
+    def warm(
+        self,
+        user_agent: Optional[str] = None,
+        fresh_only: bool = True,
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List["Forecast"]:
+        """Create forecasts for saved entries and load their data in parallel.
+
+        Forecasts whose data fails to load are left out, use warmup.warm_up for
+        details of failures and timings.
+
+        Args:
+            user_agent: Optional; The user-agent identifier to be sent with
+                requests.
+            fresh_only: Optional; Only include entries whose data has not
+                expired, defaults to True.
+            max_workers: Optional; Number of threads to load data with.
+            **kwargs: Other arguments passed to Forecast. Loaded data is put in
+                the process wide data cache, so that it is available to other
+                forecasts, unless data_cache is given. The process wide cache
+                holds at most 256 entries, see warmup.warm_up.
+        """
+        from .warmup import warm_up
+
+        forecasts = self.forecasts(user_agent, fresh_only, **kwargs)
+        data_cache = None if "data_cache" in kwargs else True
+        return warm_up(forecasts, max_workers, data_cache=data_cache).forecasts
@@ -0,0 +1,413 @@
+"""Counters and histograms of forecast requests, loads and parsing.
+
+Metrics are kept in a thread safe Registry and can be exported in the
+Prometheus text format with Registry.exposition, or served for scraping with
+start_http_server. The library's own metrics are recorded from instrumentation
+hooks once enable has been called:
+
+- metno_locationforecast_requests_total: Requests to the MET API by status,
+  the status code or "error".
+- metno_locationforecast_updates_total: Updates by result, "fresh",
+  "not_modified", "modified" or "error".
+- metno_locationforecast_loads_total: Loads of saved data by source, "cache"
+  or "storage".
+- metno_locationforecast_downloaded_bytes_total: Bytes received from the MET API.
+- metno_locationforecast_retries_total: Requests for a forecast whose previous
+  request failed.
+- metno_locationforecast_request_duration_seconds: Histogram of request times.
+- metno_locationforecast_parse_duration_seconds: Histogram of parse times.
+
+Classes:
+    Counter: A count that only goes up, by label values
+    Histogram: Counts of observations in buckets, by label values
+    Registry: A collection of metrics
+
+Functions:
+    enable: Start recording the library's metrics
+    disable: Stop recording the library's metrics
+    start_http_server: Serve metrics for scraping in a background thread
+
+Attributes:
+    REGISTRY: The registry holding the library's metrics
+    DEFAULT_BUCKETS: Default histogram buckets, in seconds
+"""
+
+import abc
+import math
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from . import hooks
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+class _Metric(abc.ABC):
+    """Parts shared by counters and histograms."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name}, {self.label_names})"
+
+    def _label_values(self, labels: Dict[str, Union[str, int]]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            msg = f"{self.name} expects labels {self.label_names}, got {tuple(labels)}."
+            raise ValueError(msg)
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def exposition(self) -> str:
+        """Return the metric in the Prometheus text format."""
+
+
+class Counter(_Metric):
+    """A count that only goes up, by label values.
+
+    Attributes:
+        name: Name of the metric.
+        help: Description of the metric.
+        label_names: Names of the metric's labels.
+
+    Methods:
+        inc: Increase the count.
+        value: Get the count.
+        exposition: Get the metric in the Prometheus text format.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        """Create a Counter object.
+
+        Args:
+            name: Name of the metric, by convention ending in '_total'.
+            help: Description of the metric.
+            label_names: Optional; Names of the metric's labels.
+        """
+        super().__init__(name, help, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Union[str, int]) -> None:
+        """Increase the count for the given label values."""
+        if amount < 0:
+            raise ValueError(f"Counters can only increase, got {amount}.")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Union[str, int]) -> float:
+        """Return the count for the given label values."""
+        key = self._label_values(labels)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def exposition(self) -> str:
+        """Return the metric in the Prometheus text format."""
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            lines.append(
+                f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Histogram(_Metric):
+    """Counts of observations in buckets, by label values.
+
+    Attributes:
+        name: Name of the metric.
+        help: Description of the metric.
+        buckets: Upper bounds of the buckets, in increasing order.
+        label_names: Names of the metric's labels.
+
+    Methods:
+        observe: Record an observation.
+        count: Get the number of observations.
+        sum: Get the sum of observations.
+        exposition: Get the metric in the Prometheus text format.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        label_names: Iterable[str] = (),
+    ):
+        """Create a Histogram object.
+
+        Args:
+            name: Name of the metric.
+            help: Description of the metric.
+            buckets: Optional; Upper bounds of the buckets, a bucket for all
+                observations is always added. Defaults to DEFAULT_BUCKETS.
+            label_names: Optional; Names of the metric's labels.
+        """
+        super().__init__(name, help, label_names)
+        bounds = sorted(float(bound) for bound in buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Union[str, int]) -> None:
+        """Record an observation for the given label values."""
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * len(self.buckets)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[key] += value
+
+    def count(self, **labels: Union[str, int]) -> int:
+        """Return the number of observations for the given label values."""
+        key = self._label_values(labels)
+        with self._lock:
+            return sum(self._counts.get(key, []))
+
+    def sum(self, **labels: Union[str, int]) -> float:
+        """Return the sum of observations for the given label values."""
+        key = self._label_values(labels)
+        with self._lock:
+            return self._sums.get(key, 0.0)
+
+    def exposition(self) -> str:
+        """Return the metric in the Prometheus text format."""
+        with self._lock:
+            values = sorted(
+                (key, list(counts), self._sums[key]) for key, counts in self._counts.items()
+            )
+        lines = self._header()
+        names = self.label_names + ("le",)
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return "\n".join(lines)
+
+
+class Registry:
+    """A collection of metrics.
+
+    Methods:
+        register: Add a metric.
+        counter: Create and add a counter.
+        histogram: Create and add a histogram.
+        get: Get a metric by name.
+        exposition: Get all metrics in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty Registry object."""
+        self._metrics: Dict[str, Union[Counter, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Registry({list(self._metrics)})"
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def register(self, metric: Union[Counter, Histogram]) -> Union[Counter, Histogram]:
+        """Add a metric, raising ValueError if a metric with the same name exists."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"A metric named {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Iterable[str] = ()) -> Counter:
+        """Create a counter and add it to the registry."""
+        counter = Counter(name, help, label_names)
+        self.register(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        label_names: Iterable[str] = (),
+    ) -> Histogram:
+        """Create a histogram and add it to the registry."""
+        histogram = Histogram(name, help, buckets, label_names)
+        self.register(histogram)
+        return histogram
+
+    def get(self, name: str) -> Union[Counter, Histogram]:
+        """Return the metric with the given name."""
+        return self._metrics[name]
+
+    def exposition(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(f"{metric.exposition()}\n" for metric in metrics)
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    "metno_locationforecast_requests_total",
+    "Requests to the MET API by status code, or error.",
+    ["status"],
+)
+UPDATES = REGISTRY.counter(
+    "metno_locationforecast_updates_total",
+    "Forecast updates by result.",
+    ["result"],
+)
+LOADS = REGISTRY.counter(
+    "metno_locationforecast_loads_total",
+    "Loads of saved forecast data by source.",
+    ["source"],
+)
+DOWNLOADED_BYTES = REGISTRY.counter(
+    "metno_locationforecast_downloaded_bytes_total",
+    "Bytes received from the MET API.",
+)
+RETRIES = REGISTRY.counter(
+    "metno_locationforecast_retries_total",
+    "Requests for a forecast whose previous request failed.",
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "metno_locationforecast_request_duration_seconds",
+    "Time taken by requests to the MET API.",
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "metno_locationforecast_parse_duration_seconds",
+    "Time taken to parse forecast data.",
+)
+
+UPDATE_RESULTS = {
+    "Data-Not-Expired": "fresh",
+    "Data-Not-Modified": "not_modified",
+    "Data-Modified": "modified",
+}
+
+# Storage keys of forecasts whose last request failed, for counting retries.
+_FAILED: Set[str] = set()
+_FAILED_LOCK = threading.Lock()
+
+
+def _record(event: hooks.Event) -> None:
+    """Record an instrumentation event in the library's metrics."""
+    if event.phase == "request":
+        failed = event.error is not None or (event.status_code or 0) >= 400
+        with _FAILED_LOCK:
+            if event.key in _FAILED:
+                RETRIES.inc()
+            if failed:
+                _FAILED.add(event.key)
+            else:
+                _FAILED.discard(event.key)
+        REQUESTS.inc(status="error" if failed else str(event.status_code))
+        REQUEST_SECONDS.observe(event.duration)
+        if event.size:
+            DOWNLOADED_BYTES.inc(event.size)
+    elif event.phase == "update":
+        result = "error" if event.error is not None else UPDATE_RESULTS.get(event.status or "")
+        UPDATES.inc(result=result or "error")
+    elif event.phase == "load" and event.status is not None:
+        LOADS.inc(source=event.status)
+    elif event.phase == "parse" and event.error is None:
+        PARSE_SECONDS.observe(event.duration)
+
+
+def enable() -> None:
+    """Start recording the library's metrics, calling this again has no effect."""
+    hooks.unsubscribe(_record)
+    hooks.subscribe(_record)
+
+
+def disable() -> None:
+    """Stop recording the library's metrics, recorded values are kept."""
+    hooks.unsubscribe(_record)
+
+
+def start_http_server(
+    port: int, address: str = "", registry: Optional[Registry] = None
+) -> "ThreadingHTTPServer":
+    """Serve metrics in the Prometheus text format in a background thread.
+
+    Metrics are served at any path. Call shutdown on the returned server to
+    stop it.
+
+    Args:
+        port: Port to listen on, 0 for any free port.
+        address: Optional; Address to listen on. Defaults to all addresses.
+        registry: Optional; Registry to serve. Defaults to REGISTRY.
+
+    Returns:
+        The running server.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    served = REGISTRY if registry is None else registry
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = served.exposition().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
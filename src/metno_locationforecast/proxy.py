@@ -0,0 +1,268 @@
+"""A caching proxy for the MET API, serving many clients from one shared cache.
+
+The proxy serves 'compact' and 'complete' forecasts at the same URL shape as
+the Locationforecast/2.0 service, so any Forecast can use it by setting
+base_url to Proxy.url. Forecasts are kept in a storage backend, in the same
+format and under the same keys as Forecast.save uses, and are only requested
+from upstream once they have expired, with an If-Modified-Since header if
+there is saved data. Concurrent requests for the same forecast wait for a
+single upstream request. Requests with an If-Modified-Since header are
+answered with 304 Not Modified if the saved data has not been modified since.
+
+Run from the command line with 'python -m metno_locationforecast serve'.
+
+Classes:
+    Proxy: A caching proxy for the MET API
+"""
+
+import contextlib
+import datetime as dt
+import json
+import threading
+from collections import Counter
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from ._server import PATH, RequestHandler, Server, parse_coordinates
+from ._utils import header_datetime
+from .data_containers import Place
+from .forecast import Forecast
+from .storage import StorageBackend, StorageMetadata, place_key_prefix
+
+
+class UpstreamError(Exception):
+    """Raised when the upstream service does not return a forecast."""
+
+    def __init__(self, status_code: int, body: bytes):
+        super().__init__(f"Upstream responded with {status_code}.")
+        self.status_code = status_code
+        self.body = body
+
+
+class Proxy(Server):
+    """A caching proxy for the MET API.
+
+    Attributes:
+        address: Address the server listens on.
+        port: Port the server listens on.
+        upstream: Base url of the service forecasts are requested from.
+        storage: Storage backend forecasts are kept in.
+        user_agent: User agent sent upstream, None to pass on the user agent
+            of each request.
+        timeout: Seconds to wait for upstream responses.
+        status_codes: Number of responses by status code.
+        upstream_status_codes: Number of upstream responses by status code.
+
+    Methods:
+        start: Start serving in a background thread.
+        stop: Stop serving.
+        serve_forever: Serve in the current thread until interrupted.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        upstream: str = "https://api.met.no/weatherapi/locationforecast/2.0/",
+        user_agent: Optional[str] = None,
+        port: int = 0,
+        address: str = "127.0.0.1",
+        timeout: float = 30,
+    ):
+        """Create a Proxy object, the server listens once it is created.
+
+        Args:
+            storage: Storage backend to keep forecasts in.
+            upstream: Optional; Base url of the service to request forecasts
+                from. Defaults to the MET API.
+            user_agent: Optional; User agent to send upstream. Defaults to the
+                user agent of each request.
+            port: Optional; Port to listen on, defaults to any free port.
+            address: Optional; Address to listen on. Defaults to 127.0.0.1.
+            timeout: Optional; Seconds to wait for upstream responses.
+                Defaults to 30.
+        """
+        self.storage = storage
+        self.upstream = upstream
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.upstream_status_codes: Dict[int, int] = Counter()
+        self._key_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        super().__init__(_handler(self), port, address)
+
+    def __repr__(self) -> str:
+        return f"Proxy({self.url}, {self.upstream})"
+
+    @contextlib.contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        """Hold a lock for a key, locks are dropped once no request is using them."""
+        with self._lock:
+            lock, users = self._key_locks.get(key, (threading.Lock(), 0))
+            self._key_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._key_locks[key]
+                if users == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (lock, users - 1)
+
+    def _fetch(self, forecast_type: str, place: Place, user_agent: str) -> Tuple[str, str]:
+        """Make sure a fresh forecast is saved, returning its key and where it came from.
+
+        Where it came from is "hit" if saved data was fresh, "miss" if it was
+        requested from upstream and "coalesced" if another request for the
+        same forecast requested it.
+
+        Raises:
+            UpstreamError: If upstream does not return a forecast.
+        """
+        key = f"{place_key_prefix(place)}{forecast_type}.json"
+        metadata = self.storage.metadata(key)
+        if metadata is not None and metadata.is_fresh():
+            return key, "hit"
+
+        with self._locked(key):
+            # Another request may have refreshed the data while this one waited,
+            # even if the data it got expires straight away.
+            refreshed = self.storage.metadata(key)
+            if refreshed is not None and (
+                refreshed.is_fresh()
+                or metadata is None
+                or refreshed.stored_at != metadata.stored_at
+            ):
+                return key, "coalesced"
+            self._refresh(key, forecast_type, place, user_agent, refreshed)
+        return key, "miss"
+
+    def _refresh(
+        self,
+        key: str,
+        forecast_type: str,
+        place: Place,
+        user_agent: str,
+        metadata: Optional[StorageMetadata],
+    ) -> None:
+        """Request a forecast from upstream and save it."""
+        parameters = {"lat": place.coordinates["latitude"], "lon": place.coordinates["longitude"]}
+        if place.coordinates["altitude"] is not None:
+            parameters["altitude"] = place.coordinates["altitude"]
+        headers = {"User-Agent": user_agent}
+        saved = self.storage.get(key) if metadata is not None else None
+        if saved is not None and metadata is not None and metadata.last_modified is not None:
+            headers["If-Modified-Since"] = format_datetime(metadata.last_modified, usegmt=True)
+
+        try:
+            response = requests.get(
+                f"{self.upstream}{forecast_type}",
+                params=parameters,
+                headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as error:
+            raise UpstreamError(502, json.dumps({"error": str(error)}).encode())
+        self._count(self.upstream_status_codes, response.status_code)
+
+        if response.status_code == 304 and saved is not None:
+            # Headers missing from the 304 response, e.g. Last-Modified, are kept.
+            stored = json.loads(saved)
+            stored["status_code"] = response.status_code
+            stored["headers"] = {**stored.get("headers", {}), **response.headers}
+            json_string = json.dumps(stored)
+        elif response.status_code == 200:
+            # Saved in the same format as Forecast.save so that forecasts can share it.
+            json_string = "{"
+            json_string += f'"status_code":{response.status_code},'
+            json_string += f'"headers":{json.dumps(dict(response.headers))},'
+            json_string += f'"data":{response.text}'
+            json_string += "}"
+        else:
+            raise UpstreamError(response.status_code, response.content)
+
+        last_modified = header_datetime(dict(response.headers), "Last-Modified")
+        if last_modified is None and metadata is not None:
+            last_modified = metadata.last_modified
+        self.storage.put(
+            key, json_string, header_datetime(dict(response.headers), "Expires"), last_modified
+        )
+
+    def _make_body(self, key: str, stored_at: dt.datetime) -> Optional[bytes]:
+        """Return the saved forecast as served by the MET API, None if it is not saved."""
+        saved = self.storage.get(key)
+        if saved is None:
+            return None
+        data = json.loads(saved)["data"]
+        return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _parse_place(query: Dict[str, List[str]]) -> Place:
+    """Return the place in a query string, raising ValueError or KeyError if it is invalid.
+
+    Coordinates sent as integers are kept as integers, so that the place gives
+    the same keys as the place of the Forecast that sent them.
+    """
+    latitude, longitude, altitude = parse_coordinates(query)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordinates out of range.")
+    return Place("", latitude, longitude, altitude)
+
+
+def _http_datetime(value: Optional[dt.datetime]) -> Optional[str]:
+    return None if value is None else format_datetime(value, usegmt=True)
+
+
+def _handler(proxy: Proxy) -> Type[RequestHandler]:
+    """Return a request handler class serving requests for a proxy."""
+
+    class Handler(RequestHandler):
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            forecast_type = url.path.rsplit("/", 1)[-1]
+            if not url.path.startswith(PATH) or forecast_type not in Forecast.forecast_types:
+                return self._error(404, "Not found.")
+            user_agent = proxy.user_agent or self.headers.get("User-Agent")
+            if not user_agent:
+                return self._error(403, "A User-Agent header is required.")
+            try:
+                place = _parse_place(parse_qs(url.query))
+            except (KeyError, ValueError):
+                return self._error(400, "Valid lat and lon parameters are required.")
+
+            try:
+                key, cache = proxy._fetch(forecast_type, place, user_agent)
+            except UpstreamError as error:
+                return self._send(
+                    error.status_code, {"Content-Type": "application/json"}, error.body
+                )
+            metadata = proxy.storage.metadata(key)
+            body = None if metadata is None else proxy._body(key, metadata.stored_at)
+            if metadata is None or body is None:
+                return self._error(502, "Forecast could not be saved.")
+
+            headers = {
+                "Date": format_datetime(dt.datetime.now(dt.timezone.utc), usegmt=True),
+                "Expires": _http_datetime(metadata.expires),
+                "Last-Modified": _http_datetime(metadata.last_modified),
+                "X-Cache": cache.upper(),
+            }
+
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since is not None and metadata.last_modified is not None:
+                try:
+                    not_modified = (
+                        parsedate_to_datetime(if_modified_since) >= metadata.last_modified
+                    )
+                except (TypeError, ValueError):
+                    not_modified = False
+                if not_modified:
+                    return self._send(304, headers, b"")
+
+            headers["Content-Type"] = "application/json"
+            self._send(200, headers, body)
+
+    return Handler
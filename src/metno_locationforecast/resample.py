@@ -0,0 +1,354 @@
+"""Resampling of forecast data onto a uniform time grid.
+
+Forecasts have hourly intervals at first and 6 or 12 hourly intervals later on.
+Resampling puts all variables on steps of a fixed length, with a policy for
+each variable deciding how values are found for each step:
+
+- "interpolate": linear interpolation between forecast times, for instant
+  variables such as air_temperature. Variables in degrees are interpolated
+  along the shorter arc.
+- "split": amounts are spread evenly over the period they were forecast for
+  and summed over each step, for accumulated variables such as
+  precipitation_amount.
+- "carry": the value of the interval a step starts in is carried forward, for
+  variables that hold for a whole period such as probability_of_thunder.
+  Symbol codes are always carried forward.
+
+Interpolation uses numpy when it is installed, otherwise it is computed in pure
+Python.
+
+Classes:
+    ResampledData: Forecast data on a uniform time grid, stored by column
+
+Functions:
+    resample: Resample forecast data onto a uniform time grid
+
+Attributes:
+    POLICIES: Names of the resampling policies
+    ACCUMULATED_VARIABLES: Variables split over steps by default
+    PERIOD_VARIABLES: Variables carried forward by default
+"""
+
+import datetime as dt
+import math
+from array import array
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from ._utils import as_utc, import_numpy
+
+if TYPE_CHECKING:
+    from .data_containers import Data
+
+POLICIES = ("interpolate", "split", "carry")
+
+ACCUMULATED_VARIABLES = {
+    "precipitation_amount",
+    "precipitation_amount_max",
+    "precipitation_amount_min",
+}
+
+PERIOD_VARIABLES = {
+    "air_temperature_max",
+    "air_temperature_min",
+    "probability_of_precipitation",
+    "probability_of_thunder",
+    "ultraviolet_index_clear_sky_max",
+}
+
+NAN = float("nan")
+
+
+class ResampledData:
+    """Forecast data on a uniform time grid, stored by column.
+
+    Attributes:
+        times: Start time of each step, in UTC.
+        step: Length of each step.
+        units: A dictionary mapping variable names to their units.
+        policies: A dictionary mapping variable names to the policy used to
+            resample them.
+        values: A dictionary mapping variable names to an array of values for
+            each step. Values are NaN for steps without a value, for example
+            before a variable's first forecast time.
+        symbol_codes: Symbol code for each step, None for steps without one.
+    """
+
+    def __init__(
+        self,
+        times: List[dt.datetime],
+        step: dt.timedelta,
+        units: Dict[str, str],
+        policies: Dict[str, str],
+        values: Dict[str, "array[float]"],
+        symbol_codes: List[Optional[str]],
+    ):
+        """Create a ResampledData object.
+
+        Args:
+            times: Start time of each step, in UTC.
+            step: Length of each step.
+            units: A dictionary mapping variable names to their units.
+            policies: A dictionary mapping variable names to the policy used to
+                resample them.
+            values: A dictionary mapping variable names to an array of values
+                for each step, NaN for steps without a value.
+            symbol_codes: Symbol code for each step.
+        """
+        self.times = times
+        self.step = step
+        self.units = units
+        self.policies = policies
+        self.values = values
+        self.symbol_codes = symbol_codes
+
+    def __repr__(self) -> str:
+        return (
+            f"ResampledData({self.times}, {self.step}, {self.units}, {self.policies}, "
+            f"{self.values}, {self.symbol_codes})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ResampledData):
+            return (
+                self.times == other.times
+                and self.step == other.step
+                and self.units == other.units
+                and self.policies == other.policies
+                and self.symbol_codes == other.symbol_codes
+                and self.values.keys() == other.values.keys()
+                and all(_same_values(self.values[name], other.values[name]) for name in self.values)
+            )
+        return NotImplemented
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, name: str) -> "array[float]":
+        return self.values[name]
+
+
+def _same_values(a: Sequence[float], b: Sequence[float]) -> bool:
+    return len(a) == len(b) and all(
+        x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b)
+    )
+
+
+def default_policy(name: str) -> str:
+    """Return the policy used to resample a variable if none is given."""
+    if name in ACCUMULATED_VARIABLES:
+        return "split"
+    if name in PERIOD_VARIABLES:
+        return "carry"
+    return "interpolate"
+
+
+def _interp_python(x: Sequence[float], xp: Sequence[float], fp: Sequence[float]) -> "array[float]":
+    """Linearly interpolate at points x, NaN outside the range of xp."""
+    values = array("d")
+    for t in x:
+        if not xp or t < xp[0] or t > xp[-1]:
+            values.append(NAN)
+            continue
+        j = bisect_right(xp, t)
+        if j == len(xp):
+            values.append(fp[-1])
+            continue
+        i = j - 1
+        values.append(fp[i] + (fp[j] - fp[i]) * (t - xp[i]) / (xp[j] - xp[i]))
+    return values
+
+
+def _interp(np: Any, x: Sequence[float], xp: Sequence[float], fp: Sequence[float]) -> Any:
+    if np is None:
+        return _interp_python(x, xp, fp)
+    if not xp:
+        return np.full(len(x), np.nan)
+    return np.interp(x, xp, fp, left=np.nan, right=np.nan)
+
+
+def _interpolated(
+    np: Any, grid: Sequence[float], starts: Sequence[float], column: Sequence[float], degrees: bool
+) -> Any:
+    xp: List[float] = []
+    fp: List[float] = []
+    for start, value in zip(starts, column):
+        if math.isnan(value):
+            continue
+        if degrees and fp:
+            # Unwrap so that interpolation takes the shorter way round.
+            value = fp[-1] + (value - fp[-1] + 180) % 360 - 180
+        xp.append(start)
+        fp.append(value)
+
+    values = _interp(np, grid, xp, fp)
+    if degrees:
+        if np is None:
+            values = array("d", (value % 360 for value in values))
+        else:
+            values = values % 360
+    return values
+
+
+def _split(
+    np: Any,
+    grid: Sequence[float],
+    step: float,
+    starts: Sequence[float],
+    ends: Sequence[float],
+    column: Sequence[float],
+) -> Any:
+    """Sum amounts over each step, spreading each amount evenly over its period.
+
+    Uses curves of the cumulative amount and the cumulative time covered by
+    intervals, a step's amount is the increase in the amount curve over the
+    step. Steps not fully covered by intervals have no value.
+    """
+    present = [
+        (start, end, value)
+        for start, end, value in zip(starts, ends, column)
+        if end > start and not math.isnan(value)
+    ]
+    xp: List[float] = []
+    amounts: List[float] = []
+    covered: List[float] = []
+    total_amount = 0.0
+    total_covered = 0.0
+    for i, (start, end, value) in enumerate(present):
+        if i + 1 < len(present):
+            # Only count the part of the period not covered by the next interval.
+            value *= (min(end, present[i + 1][0]) - start) / (end - start)
+            end = min(end, present[i + 1][0])
+        xp += [start, end]
+        amounts += [total_amount, total_amount + value]
+        covered += [total_covered, total_covered + end - start]
+        total_amount += value
+        total_covered += end - start
+
+    if np is None:
+        step_ends = [t + step for t in grid]
+        amount_at = _interp_python(grid, xp, amounts)
+        amount_to = _interp_python(step_ends, xp, amounts)
+        covered_at = _interp_python(grid, xp, covered)
+        covered_to = _interp_python(step_ends, xp, covered)
+        return array(
+            "d",
+            (
+                amount_to[k] - amount_at[k] if covered_to[k] - covered_at[k] >= step - 1e-6 else NAN
+                for k in range(len(grid))
+            ),
+        )
+
+    grid_array = np.asarray(grid, dtype=float)
+    amount = _interp(np, grid_array + step, xp, amounts) - _interp(np, grid_array, xp, amounts)
+    coverage = _interp(np, grid_array + step, xp, covered) - _interp(np, grid_array, xp, covered)
+    with np.errstate(invalid="ignore"):
+        amount[~(coverage >= step - 1e-6)] = np.nan
+    return amount
+
+
+def _carry_indices(
+    np: Any, grid: Sequence[float], starts: Sequence[float], ends: Sequence[float]
+) -> List[int]:
+    """Return the index of the interval each step starts in, -1 if there is none."""
+    if np is None:
+        indices = [bisect_right(starts, t) - 1 for t in grid]
+    else:
+        indices = (np.searchsorted(np.asarray(starts), np.asarray(grid), side="right") - 1).tolist()
+    return [i if i >= 0 and (t < ends[i] or t == starts[i]) else -1 for i, t in zip(indices, grid)]
+
+
+def resample(
+    data: "Data",
+    step: dt.timedelta,
+    variables: Optional[Iterable[str]] = None,
+    policies: Optional[Mapping[str, str]] = None,
+    start: Optional[dt.datetime] = None,
+    end: Optional[dt.datetime] = None,
+    vectorize: Optional[bool] = None,
+) -> ResampledData:
+    """Resample forecast data onto a uniform time grid.
+
+    Args:
+        data: Data to resample.
+        step: Length of each step of the grid.
+        variables: Optional; Names of variables to resample, defaults to all
+            variables in data.units.
+        policies: Optional; A dictionary mapping variable names to one of
+            "interpolate", "split" or "carry". Variables not included use
+            default_policy.
+        start: Optional; Start of the first step, defaults to the start time
+            of the first interval.
+        end: Optional; Time of the last step, defaults to the start time of
+            the last interval.
+        vectorize: Optional; Whether to compute with numpy, defaults to
+            whether numpy is installed.
+
+    Returns:
+        A ResampledData object.
+    """
+    if step <= dt.timedelta(0):
+        raise ValueError(f"Step should be a positive timedelta, got {step}.")
+    names = list(data.units) if variables is None else list(variables)
+    chosen = {name: default_policy(name) for name in names}
+    if policies is not None:
+        chosen.update({name: policy for name, policy in policies.items() if name in chosen})
+    for name, policy in chosen.items():
+        if policy not in POLICIES:
+            msg = f"{policy} is not a valid policy for {name}, valid policies are {POLICIES}."
+            raise ValueError(msg)
+
+    np = import_numpy() if vectorize is None or vectorize else None
+    if vectorize and np is None:
+        raise ImportError("numpy is required to vectorize resampling.")
+
+    ordered = data._start_times() is not None
+    order: Sequence[int] = range(len(data.intervals))
+    if not ordered:
+        order = sorted(
+            range(len(data.intervals)), key=lambda i: as_utc(data.intervals[i].start_time)
+        )
+    starts = [as_utc(data.intervals[i].start_time).timestamp() for i in order]
+    ends = [as_utc(data.intervals[i].end_time).timestamp() for i in order]
+
+    times: List[dt.datetime] = []
+    if starts:
+        first = starts[0] if start is None else as_utc(start).timestamp()
+        last = starts[-1] if end is None else as_utc(end).timestamp()
+        seconds = step.total_seconds()
+        count = max(0, math.floor((last - first) / seconds) + 1)
+        grid = [first + k * seconds for k in range(count)]
+        times = [dt.datetime.fromtimestamp(t, dt.timezone.utc) for t in grid]
+    else:
+        grid = []
+
+    carried = _carry_indices(np, grid, starts, ends)
+
+    units: Dict[str, str] = {}
+    values: Dict[str, "array[float]"] = {}
+    for name, policy in chosen.items():
+        column: Sequence[float] = data._column(name)
+        if not ordered:
+            column = array("d", (column[i] for i in order))
+        units[name] = next(
+            (
+                interval.variables[name].units
+                for interval in data.intervals
+                if name in interval.variables
+            ),
+            data.units.get(name, ""),
+        )
+
+        if policy == "interpolate":
+            result = _interpolated(np, grid, starts, column, units[name] == "degrees")
+        elif policy == "split":
+            result = _split(np, grid, step.total_seconds(), starts, ends, column)
+        else:
+            result = array("d", (NAN if i < 0 else column[i] for i in carried))
+        if not isinstance(result, array):
+            result = array("d", result.astype(float).tobytes())
+        values[name] = result
+
+    symbol_codes = [None if i < 0 else data.intervals[order[i]].symbol_code for i in carried]
+
+    return ResampledData(times, step, units, chosen, values, symbol_codes)
@@ -0,0 +1,173 @@
+"""A local server simulating the MET API, for testing without making real requests.
+
+The simulator serves synthetic 'compact' and 'complete' forecasts at the same
+URL shape as the Locationforecast/2.0 service, so any Forecast can use it by
+setting base_url to Simulator.url. Forecasts are updated once per
+update_interval, responses carry Expires and Last-Modified headers and
+requests with an If-Modified-Since header are answered with 304 Not Modified
+if there is no newer forecast. Latency, server errors and 429 Too Many
+Requests responses can be added to test clients under realistic conditions.
+
+Run from the command line with 'python -m metno_locationforecast simulate'.
+
+Classes:
+    Simulator: A local server simulating the MET API
+"""
+
+import datetime as dt
+import json
+import random
+import time
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple, Type, Union
+from urllib.parse import parse_qs, urlsplit
+
+from . import synthetic
+from ._server import PATH, RequestHandler, Server, parse_coordinates
+
+
+class Simulator(Server):
+    """A local server simulating the MET API.
+
+    Attributes:
+        address: Address the server listens on.
+        port: Port the server listens on.
+        latency: Seconds added to every response.
+        error_rate: Fraction of requests answered with 500 Internal Server
+            Error.
+        throttle_rate: Fraction of requests answered with 429 Too Many
+            Requests.
+        expires_in: Time from a response until its data expires.
+        update_interval: Time between new forecasts.
+        intervals: Number of entries in the timeseries of each forecast.
+        status_codes: Number of responses by status code.
+
+    Methods:
+        start: Start serving in a background thread.
+        stop: Stop serving.
+        serve_forever: Serve in the current thread until interrupted.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        address: str = "127.0.0.1",
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        expires_in: dt.timedelta = dt.timedelta(minutes=30),
+        update_interval: dt.timedelta = dt.timedelta(hours=1),
+        intervals: int = 82,
+        seed: Optional[int] = None,
+    ):
+        """Create a Simulator object, the server listens once it is created.
+
+        Args:
+            port: Optional; Port to listen on, defaults to any free port.
+            address: Optional; Address to listen on. Defaults to 127.0.0.1.
+            latency: Optional; Seconds added to every response. Defaults to 0.
+            error_rate: Optional; Fraction of requests answered with 500
+                Internal Server Error. Defaults to 0.
+            throttle_rate: Optional; Fraction of requests answered with 429
+                Too Many Requests. Defaults to 0.
+            expires_in: Optional; Time from a response until its data
+                expires. Defaults to 30 minutes.
+            update_interval: Optional; Time between new forecasts. Defaults to
+                1 hour.
+            intervals: Optional; Number of entries in the timeseries of each
+                forecast. Defaults to 82, as for the MET API.
+            seed: Optional; Seed for choosing which requests fail.
+        """
+        if not 0 <= error_rate + throttle_rate <= 1:
+            raise ValueError("error_rate and throttle_rate should add up to between 0 and 1.")
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.expires_in = expires_in
+        self.update_interval = update_interval
+        self.intervals = intervals
+        self._random = random.Random(seed)
+        super().__init__(_handler(self), port, address)
+
+    def _last_modified(self, now: dt.datetime) -> dt.datetime:
+        """Return the time of the latest forecast."""
+        seconds = self.update_interval.total_seconds()
+        return dt.datetime.fromtimestamp(
+            now.timestamp() // seconds * seconds, dt.timezone.utc
+        ).replace(microsecond=0)
+
+    def _failure(self) -> Optional[int]:
+        """Return the status code of a simulated failure, or None."""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.error_rate:
+            return 500
+        if draw < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+    def _make_body(
+        self,
+        forecast_type: str,
+        coordinates: Tuple[Union[float, int], Union[float, int], Optional[int]],
+        last_modified: dt.datetime,
+    ) -> bytes:
+        """Return the forecast for a place, the same forecast is served until the next update."""
+        latitude, longitude, altitude = coordinates
+        payload = synthetic.payload(
+            forecast_type,
+            self.intervals,
+            start=last_modified.replace(minute=0, second=0),
+            latitude=latitude,
+            longitude=longitude,
+            altitude=altitude,
+            seed=hash((coordinates, last_modified.timestamp())),
+        )
+        return json.dumps(payload).encode()
+
+
+def _handler(simulator: Simulator) -> Type[RequestHandler]:
+    """Return a request handler class serving requests for a simulator."""
+
+    class Handler(RequestHandler):
+        def do_GET(self) -> None:
+            if simulator.latency:
+                time.sleep(simulator.latency)
+
+            url = urlsplit(self.path)
+            forecast_type = url.path.rsplit("/", 1)[-1]
+            if not url.path.startswith(PATH) or forecast_type not in ("compact", "complete"):
+                return self._error(404, "Not found.")
+            if not self.headers.get("User-Agent"):
+                return self._error(403, "A User-Agent header is required.")
+            try:
+                coordinates = parse_coordinates(parse_qs(url.query))
+            except (KeyError, ValueError):
+                return self._error(400, "Valid lat and lon parameters are required.")
+
+            failure = simulator._failure()
+            if failure is not None:
+                return self._error(failure, "Simulated failure.")
+
+            now = dt.datetime.now(dt.timezone.utc)
+            last_modified = simulator._last_modified(now)
+            headers = {
+                "Date": format_datetime(now, usegmt=True),
+                "Expires": format_datetime(now + simulator.expires_in, usegmt=True),
+                "Last-Modified": format_datetime(last_modified, usegmt=True),
+            }
+
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since is not None:
+                try:
+                    not_modified = parsedate_to_datetime(if_modified_since) >= last_modified
+                except (TypeError, ValueError):
+                    not_modified = False
+                if not_modified:
+                    return self._send(304, headers, b"")
+
+            body = simulator._body(forecast_type, coordinates, last_modified)
+            headers["Content-Type"] = "application/json"
+            self._send(200, headers, body)
+
+    return Handler
@@ -0,0 +1,557 @@
+"""Storage backends for caching forecast data.
+
+A storage backend holds the json strings saved by a forecast, indexed by a
+key (the forecast's file name), along with some freshness information.
+
+Classes:
+    StorageMetadata: Freshness information for a stored item
+    StorageBackend: Interface that all storage backends implement
+    FileSystemStorage: Stores data as files in a directory
+    MemoryStorage: Stores data in a dictionary
+    SQLiteStorage: Stores data in an SQLite database
+
+Functions:
+    get_storage: Get a shared storage backend of a given type
+    place_key_prefix: Get the prefix of the keys of all forecasts for a place
+"""
+
+import abc
+import datetime as dt
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from ._utils import header_datetime
+from .manifest import Manifest
+
+if TYPE_CHECKING:
+    from .data_containers import Place
+
+STORAGE_TYPES = {"filesystem", "memory", "sqlite"}
+SQLITE_FILE_NAME = "forecasts.sqlite3"
+
+
+class StorageMetadata:
+    """Freshness information for a stored item.
+
+    Attributes:
+        size: Size of the stored value in bytes.
+        stored_at: Date and time the value was stored.
+        accessed_at: Date and time the value was last read, or stored if it has
+            not been read since.
+        expires: Optional; Date and time the stored data expires.
+        last_modified: Optional; Date and time the stored data was last
+            modified.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        stored_at: dt.datetime,
+        accessed_at: Optional[dt.datetime] = None,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ):
+        """Create a StorageMetadata object.
+
+        Args:
+            size: Size of the stored value in bytes.
+            stored_at: Date and time the value was stored.
+            accessed_at: Optional; Date and time the value was last read.
+                Defaults to stored_at.
+            expires: Optional; Date and time the stored data expires.
+            last_modified: Optional; Date and time the stored data was last
+                modified.
+        """
+        self.size = size
+        self.stored_at = stored_at
+        self.accessed_at = stored_at if accessed_at is None else accessed_at
+        self.expires = expires
+        self.last_modified = last_modified
+
+    def __repr__(self) -> str:
+        return (
+            f"StorageMetadata({self.size}, {self.stored_at}, {self.accessed_at}, "
+            f"{self.expires}, {self.last_modified})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, StorageMetadata):
+            return (
+                self.size == other.size
+                and self.stored_at == other.stored_at
+                and self.accessed_at == other.accessed_at
+                and self.expires == other.expires
+                and self.last_modified == other.last_modified
+            )
+        return NotImplemented
+
+    def is_fresh(self, now: Optional[dt.datetime] = None) -> bool:
+        """Return True if the stored data has a known expiry in the future."""
+        if self.expires is None:
+            return False
+        if now is None:
+            now = dt.datetime.now(dt.timezone.utc)
+        return now <= self.expires
+
+
+class StorageBackend(abc.ABC):
+    """Interface that all storage backends implement.
+
+    Values are json strings as produced by a Forecast, keys are the forecast's
+    file name.
+
+    Methods:
+        get: Get a stored value.
+        put: Store a value.
+        metadata: Get freshness information for a stored value.
+        delete: Delete a stored value.
+        keys: List the keys of all stored values.
+        exists: Check if a value is stored.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, None if there is no such value."""
+
+    @abc.abstractmethod
+    def put(
+        self,
+        key: str,
+        value: str,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ) -> None:
+        """Store value under key, replacing any existing value."""
+
+    @abc.abstractmethod
+    def metadata(self, key: str) -> Optional[StorageMetadata]:
+        """Return metadata for the value stored under key, None if there is no such value."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete the value stored under key, return True if a value was deleted."""
+
+    @abc.abstractmethod
+    def keys(self) -> List[str]:
+        """Return the keys of all stored values."""
+
+    def exists(self, key: str) -> bool:
+        """Return True if a value is stored under key."""
+        return self.metadata(key) is not None
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class FileSystemStorage(StorageBackend):
+    """Stores data as files in a directory.
+
+    This is the default backend, files are named by their key. Files are
+    replaced atomically and each save is recorded in a manifest, which provides
+    freshness information without reading the files. Reads set the access time
+    of the file, as file systems mounted with relatime or noatime mostly do not.
+
+    Attributes:
+        location (Path): Directory in which files are stored.
+        manifest (Manifest): Index of the files in location.
+    """
+
+    def __init__(self, location: Union[str, Path]):
+        """Create a FileSystemStorage object.
+
+        Args:
+            location: Directory in which to store files. Will be created when
+                the first value is stored.
+
+        Raises:
+            NotADirectoryError: If location exists but is not a directory.
+        """
+        self.location = Path(location).expanduser().resolve()
+        if self.location.exists() and not self.location.is_dir():
+            raise NotADirectoryError(f"Expected {self.location} to be a directory.")
+        self.manifest = Manifest(self.location)
+
+    def __repr__(self) -> str:
+        return f"FileSystemStorage({self.location})"
+
+    def _path(self, key: str) -> Path:
+        return self.location.joinpath(key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, None if there is no such value."""
+        path = self._path(key)
+        try:
+            with open(path) as file:
+                value = file.read()
+                # Only the access time is changed, the modification time is kept.
+                modified = os.fstat(file.fileno()).st_mtime_ns
+                try:
+                    os.utime(
+                        file.fileno() if os.utime in os.supports_fd else path,
+                        ns=(time.time_ns(), modified),
+                    )
+                except OSError:
+                    pass
+        except FileNotFoundError:
+            return None
+        return value
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ) -> None:
+        """Store value under key, replacing any existing value."""
+        if not self.location.exists():
+            self.location.mkdir(parents=True)
+        elif not self.location.is_dir():
+            raise NotADirectoryError(f"Expected {self.location} to be a directory.")
+
+        # Write to a temporary file and rename it so that readers never see a
+        # partially written file.
+        path = self._path(key)
+        temporary_path = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary_path.write_text(value)
+        size = temporary_path.stat().st_size
+        os.replace(temporary_path, path)
+
+        self.manifest.record(key, size, _now(), expires, last_modified)
+
+    def metadata(self, key: str) -> Optional[StorageMetadata]:
+        """Return metadata for the value stored under key.
+
+        Expiry information is taken from the manifest. If the manifest has no
+        matching entry it is read from the headers of the stored forecast,
+        which requires reading the file.
+        """
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        entry = self.manifest.get(key)
+        if entry is not None and entry.size == stat.st_size:
+            return StorageMetadata(
+                size=stat.st_size,
+                stored_at=entry.stored_at,
+                accessed_at=dt.datetime.fromtimestamp(stat.st_atime, dt.timezone.utc),
+                expires=entry.expires,
+                last_modified=entry.last_modified,
+            )
+
+        try:
+            stored = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            stored = {}
+
+        headers = stored.get("headers", {}) if isinstance(stored, dict) else {}
+        return StorageMetadata(
+            size=stat.st_size,
+            stored_at=dt.datetime.fromtimestamp(stat.st_mtime, dt.timezone.utc),
+            accessed_at=dt.datetime.fromtimestamp(stat.st_atime, dt.timezone.utc),
+            expires=header_datetime(headers, "Expires"),
+            last_modified=header_datetime(headers, "Last-Modified"),
+        )
+
+    def delete(self, key: str) -> bool:
+        """Delete the value stored under key, return True if a value was deleted."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        self.manifest.remove(key)
+        return True
+
+    def keys(self) -> List[str]:
+        """Return the keys of all stored values, these are the json files in location."""
+        try:
+            with os.scandir(self.location) as entries:
+                return [
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith(".json") and entry.is_file()
+                ]
+        except FileNotFoundError:
+            return []
+
+    def exists(self, key: str) -> bool:
+        """Return True if a value is stored under key."""
+        return self._path(key).is_file()
+
+
+class MemoryStorage(StorageBackend):
+    """Stores data in a dictionary.
+
+    Useful for testing and for short lived processes that should not touch the
+    disk. Data is lost when the process exits.
+
+    Attributes:
+        items: Dictionary mapping keys to their value and metadata.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty MemoryStorage object."""
+        self.items: Dict[str, Tuple[str, StorageMetadata]] = {}
+
+    def __repr__(self) -> str:
+        return f"MemoryStorage({len(self.items)} items)"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, None if there is no such value."""
+        item = self.items.get(key)
+        if item is None:
+            return None
+        value, metadata = item
+        metadata.accessed_at = _now()
+        return value
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ) -> None:
+        """Store value under key, replacing any existing value."""
+        metadata = StorageMetadata(
+            size=len(value.encode()),
+            stored_at=_now(),
+            expires=expires,
+            last_modified=last_modified,
+        )
+        self.items[key] = (value, metadata)
+
+    def metadata(self, key: str) -> Optional[StorageMetadata]:
+        """Return metadata for the value stored under key, None if there is no such value."""
+        item = self.items.get(key)
+        if item is None:
+            return None
+        return item[1]
+
+    def delete(self, key: str) -> bool:
+        """Delete the value stored under key, return True if a value was deleted."""
+        return self.items.pop(key, None) is not None
+
+    def keys(self) -> List[str]:
+        """Return the keys of all stored values."""
+        return list(self.items)
+
+
+class SQLiteStorage(StorageBackend):
+    """Stores data in an SQLite database.
+
+    A single database file holds every forecast, which avoids large directories
+    of small files. Safe to share between threads.
+
+    Reads do not write to the database. The times values are read are kept in
+    memory and written in one transaction once access_flush_size values have
+    been read or access_flush_interval seconds have passed, and when the
+    storage is closed. Metadata from this object includes reads not yet
+    written, other processes only see them once they are written.
+
+    Attributes:
+        path (Path): Path to the database file.
+        access_flush_size (int): Number of values read after which read times
+            are written.
+        access_flush_interval (float): Seconds after which read times are
+            written.
+    """
+
+    access_flush_size = 1000
+    access_flush_interval = 60.0
+
+    def __init__(self, path: Union[str, Path]):
+        """Create a SQLiteStorage object.
+
+        Args:
+            path: Path to the database file, use ":memory:" for an in memory
+                database. The file and its parent directories will be created if
+                they do not exist.
+        """
+        import sqlite3
+
+        if str(path) == ":memory:":
+            self.path = Path(":memory:")
+            database = ":memory:"
+        else:
+            self.path = Path(path).expanduser().resolve()
+            if not self.path.parent.exists():
+                self.path.parent.mkdir(parents=True)
+            database = str(self.path)
+
+        self._lock = threading.Lock()
+        # Times values were read, by key, not yet written to the database.
+        self._accessed: Dict[str, float] = {}
+        self._flushed = time.monotonic()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS forecasts ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "expires REAL, last_modified REAL)"
+            )
+
+    def __repr__(self) -> str:
+        return f"SQLiteStorage({self.path})"
+
+    @staticmethod
+    def _to_timestamp(value: Optional[dt.datetime]) -> Optional[float]:
+        return None if value is None else value.timestamp()
+
+    @staticmethod
+    def _from_timestamp(value: Optional[float]) -> Optional[dt.datetime]:
+        return None if value is None else dt.datetime.fromtimestamp(value, dt.timezone.utc)
+
+    def _flush_accesses(self) -> None:
+        """Write the times values were read, must be called holding the lock."""
+        if self._accessed:
+            with self._connection:
+                self._connection.executemany(
+                    "UPDATE forecasts SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+                )
+            self._accessed = {}
+        self._flushed = time.monotonic()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, None if there is no such value."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM forecasts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = _now().timestamp()
+            if (
+                len(self._accessed) >= self.access_flush_size
+                or time.monotonic() - self._flushed >= self.access_flush_interval
+            ):
+                self._flush_accesses()
+        value: str = row[0]
+        return value
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        expires: Optional[dt.datetime] = None,
+        last_modified: Optional[dt.datetime] = None,
+    ) -> None:
+        """Store value under key, replacing any existing value."""
+        now = _now().timestamp()
+        with self._lock, self._connection:
+            self._accessed.pop(key, None)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    value,
+                    len(value.encode()),
+                    now,
+                    now,
+                    self._to_timestamp(expires),
+                    self._to_timestamp(last_modified),
+                ),
+            )
+
+    def metadata(self, key: str) -> Optional[StorageMetadata]:
+        """Return metadata for the value stored under key, None if there is no such value."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, stored_at, accessed_at, expires, last_modified FROM forecasts "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            accessed = self._accessed.get(key)
+        if row is None:
+            return None
+        size, stored_at, accessed_at, expires, last_modified = row
+        if accessed is not None:
+            accessed_at = max(accessed_at, accessed)
+        return StorageMetadata(
+            size=size,
+            stored_at=dt.datetime.fromtimestamp(stored_at, dt.timezone.utc),
+            accessed_at=dt.datetime.fromtimestamp(accessed_at, dt.timezone.utc),
+            expires=self._from_timestamp(expires),
+            last_modified=self._from_timestamp(last_modified),
+        )
+
+    def delete(self, key: str) -> bool:
+        """Delete the value stored under key, return True if a value was deleted."""
+        with self._lock, self._connection:
+            self._accessed.pop(key, None)
+            cursor = self._connection.execute("DELETE FROM forecasts WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def keys(self) -> List[str]:
+        """Return the keys of all stored values."""
+        with self._lock:
+            rows = self._connection.execute("SELECT key FROM forecasts").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Write the times values were read and close the database connection."""
+        with self._lock:
+            self._flush_accesses()
+            self._connection.close()
+
+
+def place_key_prefix(place: "Place") -> str:
+    """Return the prefix of the keys of all forecasts for a place.
+
+    Keys are made up of this prefix followed by the forecast type and '.json'.
+    """
+    return (
+        f"lat{place.coordinates['latitude']}lon{place.coordinates['longitude']}"
+        + f"altitude{place.coordinates['altitude']}_"
+    )
+
+
+_shared_backends: Dict[Tuple[str, str], StorageBackend] = {}
+_shared_backends_lock = threading.Lock()
+
+
+def get_storage(storage_type: str, save_location: Union[str, Path]) -> StorageBackend:
+    """Get a shared storage backend of a given type.
+
+    Backends are shared between all callers using the same type and save
+    location, so forecasts using the "memory" type see each others data.
+
+    Args:
+        storage_type: One of "filesystem", "memory" or "sqlite".
+        save_location: Directory the backend stores data in. The "sqlite" type
+            uses a database file in this directory, the "memory" type ignores
+            it.
+    """
+    if storage_type not in STORAGE_TYPES:
+        msg = (
+            f"{storage_type} is not an available storage type. Available types are: "
+            f"{STORAGE_TYPES}."
+        )
+        raise ValueError(msg)
+
+    location = "" if storage_type == "memory" else str(Path(save_location).expanduser().resolve())
+
+    with _shared_backends_lock:
+        backend = _shared_backends.get((storage_type, location))
+        if backend is None:
+            if storage_type == "filesystem":
+                backend = FileSystemStorage(location)
+            elif storage_type == "memory":
+                backend = MemoryStorage()
+            else:
+                backend = SQLiteStorage(Path(location).joinpath(SQLITE_FILE_NAME))
+            _shared_backends[(storage_type, location)] = backend
+
+    return backend
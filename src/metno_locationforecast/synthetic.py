@@ -0,0 +1,176 @@
+"""Synthetic forecast data shaped like responses from the MET API.
+
+Useful for benchmarks and for testing against a simulated MET API. Payloads
+follow the structure of real 'compact' and 'complete' responses: hourly
+entries with 1, 6 and 12 hour summaries, then 6 hourly entries, with a final
+entry of instant values only. Values are random but repeatable for a given
+seed.
+
+Functions:
+    payload: Create the body of a response from the MET API
+    saved_json_string: Create json as saved by a Forecast
+
+Attributes:
+    COMPACT_UNITS: Units of variables in 'compact' payloads
+    COMPLETE_UNITS: Units of variables in 'complete' payloads
+"""
+
+import datetime as dt
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+COMPACT_UNITS = {
+    "air_pressure_at_sea_level": "hPa",
+    "air_temperature": "celsius",
+    "cloud_area_fraction": "%",
+    "precipitation_amount": "mm",
+    "relative_humidity": "%",
+    "wind_from_direction": "degrees",
+    "wind_speed": "m/s",
+}
+
+COMPLETE_UNITS = {
+    **COMPACT_UNITS,
+    "air_temperature_max": "celsius",
+    "air_temperature_min": "celsius",
+    "cloud_area_fraction_high": "%",
+    "cloud_area_fraction_low": "%",
+    "cloud_area_fraction_medium": "%",
+    "dew_point_temperature": "celsius",
+    "fog_area_fraction": "%",
+    "ultraviolet_index_clear_sky": "1",
+}
+
+SYMBOL_CODES = ["clearsky_day", "fair_day", "partlycloudy_day", "cloudy", "lightrain", "rain"]
+
+YR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+HTTP_DATETIME_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+
+
+def _instant(rng: random.Random, temperature: float, complete: bool) -> Dict[str, float]:
+    details = {
+        "air_pressure_at_sea_level": round(rng.uniform(990, 1030), 1),
+        "air_temperature": round(temperature, 1),
+        "cloud_area_fraction": round(rng.uniform(0, 100), 1),
+        "relative_humidity": round(rng.uniform(30, 100), 1),
+        "wind_from_direction": round(rng.uniform(0, 360), 1),
+        "wind_speed": round(rng.uniform(0, 15), 1),
+    }
+    if complete:
+        details.update(
+            {
+                "cloud_area_fraction_high": round(rng.uniform(0, 100), 1),
+                "cloud_area_fraction_low": round(rng.uniform(0, 100), 1),
+                "cloud_area_fraction_medium": round(rng.uniform(0, 100), 1),
+                "dew_point_temperature": round(temperature - rng.uniform(0, 10), 1),
+                "fog_area_fraction": round(rng.uniform(0, 5), 1),
+                "ultraviolet_index_clear_sky": round(rng.uniform(0, 8), 1),
+            }
+        )
+    return details
+
+
+def _summary(rng: random.Random, hours: int, temperature: float, complete: bool) -> Dict[str, Any]:
+    period: Dict[str, Any] = {"summary": {"symbol_code": rng.choice(SYMBOL_CODES)}}
+    if hours == 12:
+        return period
+    details = {"precipitation_amount": round(max(0.0, rng.gauss(0, hours / 2)), 1)}
+    if complete and hours == 6:
+        details["air_temperature_max"] = round(temperature + rng.uniform(0, 3), 1)
+        details["air_temperature_min"] = round(temperature - rng.uniform(0, 3), 1)
+    period["details"] = details
+    return period
+
+
+def payload(
+    forecast_type: str = "compact",
+    intervals: int = 82,
+    hourly: int = 56,
+    start: Optional[dt.datetime] = None,
+    latitude: float = 59.9,
+    longitude: float = 10.8,
+    altitude: Optional[int] = 10,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Create the body of a response from the MET API.
+
+    Args:
+        forecast_type: Optional; Either "compact" or "complete". Defaults to
+            "compact".
+        intervals: Optional; Number of entries in the timeseries. Defaults to
+            82, the number in a real response.
+        hourly: Optional; Number of hourly entries before entries become 6
+            hourly. Defaults to 56.
+        start: Optional; Time of the first entry, defaults to the start of the
+            current hour in UTC.
+        latitude: Optional; Latitude of the forecast.
+        longitude: Optional; Longitude of the forecast.
+        altitude: Optional; Altitude of the forecast.
+        seed: Optional; Seed for random values. Defaults to 0.
+
+    Returns:
+        A dictionary which can be encoded as json.
+    """
+    if forecast_type not in ("compact", "complete"):
+        raise ValueError(f"{forecast_type} is not a forecast type, expected compact or complete.")
+    complete = forecast_type == "complete"
+    if start is None:
+        start = dt.datetime.now(dt.timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    rng = random.Random(seed)
+    timeseries: List[Dict[str, Any]] = []
+    time = start
+    temperature = rng.uniform(5, 25)
+    for i in range(intervals):
+        temperature += rng.uniform(-1.5, 1.5)
+        data: Dict[str, Any] = {"instant": {"details": _instant(rng, temperature, complete)}}
+        if i < intervals - 1:
+            data["next_12_hours"] = _summary(rng, 12, temperature, complete)
+            if i < hourly:
+                data["next_1_hours"] = _summary(rng, 1, temperature, complete)
+            data["next_6_hours"] = _summary(rng, 6, temperature, complete)
+        timeseries.append({"time": time.strftime(YR_DATETIME_FORMAT), "data": data})
+        time += dt.timedelta(hours=1 if i < hourly else 6)
+
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [longitude, latitude, altitude]},
+        "properties": {
+            "meta": {
+                "updated_at": start.strftime(YR_DATETIME_FORMAT),
+                "units": dict(COMPLETE_UNITS if complete else COMPACT_UNITS),
+            },
+            "timeseries": timeseries,
+        },
+    }
+
+
+def saved_json_string(
+    forecast_type: str = "compact",
+    intervals: int = 82,
+    expires_in: dt.timedelta = dt.timedelta(minutes=30),
+    **kwargs: Any,
+) -> str:
+    """Create json as saved by a Forecast, with a payload and the response headers.
+
+    Args:
+        forecast_type: Optional; Either "compact" or "complete".
+        intervals: Optional; Number of entries in the timeseries.
+        expires_in: Optional; Time from the start of the payload until the data
+            expires. Defaults to 30 minutes.
+        kwargs: Optional; Further arguments for payload.
+
+    Returns:
+        A json string.
+    """
+    body = payload(forecast_type, intervals, **kwargs)
+    updated_at = dt.datetime.strptime(
+        body["properties"]["meta"]["updated_at"], YR_DATETIME_FORMAT
+    ).replace(tzinfo=dt.timezone.utc)
+    headers = {
+        "Content-Type": "application/json",
+        "Expires": (updated_at + expires_in).strftime(HTTP_DATETIME_FORMAT),
+        "Last-Modified": updated_at.strftime(HTTP_DATETIME_FORMAT),
+    }
+    return json.dumps({"status_code": 200, "headers": headers, "data": body})
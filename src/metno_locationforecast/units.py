@@ -0,0 +1,143 @@
+"""Conversion between units of measurement.
+
+Conversions are held in a registry indexed by the units converted from and to.
+They are used by Variable.convert_to and Data.converted, new conversions can be
+added with register_conversion.
+
+Classes:
+    Conversion: A conversion from one unit to another
+
+Functions:
+    register_conversion: Add a conversion to the registry
+    get_conversion: Get a conversion from the registry
+    valid_conversions: Get the units a unit can be converted to
+
+Attributes:
+    VALID_UNIT_CONVERSIONS: A dictionary mapping units to the units they can be
+        converted to
+"""
+
+import math
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+Number = Union[float, int]
+
+
+class Conversion:
+    """A conversion from one unit to another.
+
+    Attributes:
+        from_units: Units converted from.
+        to_units: Units converted to.
+        function: Function converting a value.
+        decimals: Number of decimals converted values are rounded to, None to
+            round to an integer.
+        maximum: Optional; Largest converted value.
+
+    Methods:
+        convert_all: Convert many values.
+        convert_array: Convert an array of floats.
+    """
+
+    def __init__(
+        self,
+        from_units: str,
+        to_units: str,
+        function: Callable[[float], float],
+        decimals: Optional[int] = 2,
+        maximum: Optional[Number] = None,
+    ):
+        """Create a Conversion object.
+
+        Args:
+            from_units: Units converted from.
+            to_units: Units converted to.
+            function: Function converting a value.
+            decimals: Optional; Number of decimals converted values are rounded
+                to, None to round to an integer. Defaults to 2.
+            maximum: Optional; Largest converted value.
+        """
+        self.from_units = from_units
+        self.to_units = to_units
+        self.function = function
+        self.decimals = decimals
+        self.maximum = maximum
+
+    def __repr__(self) -> str:
+        return f"Conversion({self.from_units}, {self.to_units})"
+
+    def __call__(self, value: Number) -> Number:
+        converted: Number = round(self.function(value), self.decimals)
+        if self.maximum is not None:
+            converted = min(converted, self.maximum)
+        return converted
+
+    def convert_all(self, values: Iterable[Number]) -> List[Number]:
+        """Convert many values in one pass."""
+        function, decimals, maximum = self.function, self.decimals, self.maximum
+        converted = [round(function(value), decimals) for value in values]
+        if maximum is not None:
+            converted = [min(value, maximum) for value in converted]
+        return converted
+
+    def convert_array(self, values: Sequence[float]) -> "array[float]":
+        """Convert an array of floats in one pass, NaN values are left as NaN."""
+        present = [value for value in values if not math.isnan(value)]
+        if len(present) == len(values):
+            return array("d", self.convert_all(values))
+        converted = iter(self.convert_all(present))
+        return array("d", (value if math.isnan(value) else next(converted) for value in values))
+
+
+_CONVERSIONS: Dict[Tuple[str, str], Conversion] = {}
+_LOCK = threading.Lock()
+
+VALID_UNIT_CONVERSIONS: Dict[str, Set[str]] = {}
+
+
+def register_conversion(conversion: Conversion) -> None:
+    """Add a conversion to the registry, replacing any conversion between the same units."""
+    with _LOCK:
+        _CONVERSIONS[(conversion.from_units, conversion.to_units)] = conversion
+        VALID_UNIT_CONVERSIONS.setdefault(conversion.from_units, set()).add(conversion.to_units)
+
+
+def valid_conversions(units: str) -> Set[str]:
+    """Return the units that the given units can be converted to."""
+    return set(VALID_UNIT_CONVERSIONS.get(units, set()))
+
+
+def get_conversion(from_units: str, to_units: str) -> Conversion:
+    """Return the conversion between two units.
+
+    Raises:
+        ValueError: If there is no such conversion.
+    """
+    conversion = _CONVERSIONS.get((from_units, to_units))
+    if conversion is not None:
+        return conversion
+
+    if from_units not in VALID_UNIT_CONVERSIONS:
+        msg = (
+            "Not a valid unit conversion. No valid conversions for variables with units: "
+            f"{from_units}"
+        )
+    else:
+        msg = (
+            "Not a valid unit conversion. Valid destination units: "
+            f"{VALID_UNIT_CONVERSIONS[from_units]}"
+        )
+    raise ValueError(msg)
+
+
+for _conversion in [
+    Conversion("celsius", "fahrenheit", lambda value: ((value / 5) * 9) + 32),
+    Conversion("m/s", "km/h", lambda value: (value * 360) / 100),
+    Conversion("m/s", "mph", lambda value: value * 2.236936),
+    Conversion("m/s", "beaufort", lambda value: (value / 0.836) ** (2 / 3), None, 12),
+    # There are 25.4mm in 1 inch
+    Conversion("mm", "inches", lambda value: value / 25.4),
+]:
+    register_conversion(_conversion)
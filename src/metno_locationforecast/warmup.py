@@ -0,0 +1,210 @@
+"""Load many saved forecasts in parallel.
+
+Useful when a service starts and needs data for many places before it can
+handle requests. Saved data is read in a pool of threads and parsed either in
+those threads or, optionally, in a pool of processes.
+
+Classes:
+    WarmUpReport: Results and timings of a warm up
+
+Functions:
+    warm_up: Load saved data for many forecasts in parallel
+"""
+
+import concurrent.futures
+import json
+import time
+from typing import AbstractSet, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from . import cache
+from .cache import DataCache
+from .data_containers import Data
+from .forecast import Forecast, Window, parse_json
+
+
+class WarmUpReport:
+    """Results and timings of a warm up.
+
+    Attributes:
+        forecasts: Forecasts whose data was loaded.
+        errors: Forecasts whose data could not be loaded, along with the error.
+        cached: Number of forecasts whose data was taken from the data cache.
+        evicted: Number of entries evicted from the data caches populated
+            during the warm up, non zero if a cache is too small to hold the
+            data of every forecast.
+        duration: Total time taken in seconds.
+        read_time: Time spent reading saved data in seconds, summed over
+            workers.
+        parse_time: Time spent parsing saved data in seconds, summed over
+            workers.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty WarmUpReport."""
+        self.forecasts: List[Forecast] = []
+        self.errors: List[Tuple[Forecast, Exception]] = []
+        self.cached = 0
+        self.evicted = 0
+        self.duration = 0.0
+        self.read_time = 0.0
+        self.parse_time = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"WarmUpReport(loaded={len(self.forecasts)}, errors={len(self.errors)}, "
+            f"cached={self.cached}, evicted={self.evicted}, duration={self.duration:.3f}s, "
+            f"read_time={self.read_time:.3f}s, parse_time={self.parse_time:.3f}s)"
+        )
+
+
+def parse_json_string(
+    json_string: str,
+    variables: Optional[AbstractSet[str]] = None,
+    window: Optional[Window] = None,
+) -> Tuple[Data, float]:
+    """Parse saved json, return the data and the time taken to parse it.
+
+    This is a module level function so that it can be run in another process.
+    """
+    start = time.perf_counter()
+    data = parse_json(json.loads(json_string), variables, window)
+    return data, time.perf_counter() - start
+
+
+def _read(forecast: Forecast) -> Tuple[Optional[str], float]:
+    """Read saved data for a forecast, return None if data was found in the data cache."""
+    start = time.perf_counter()
+    if forecast._load_from_cache():
+        return None, time.perf_counter() - start
+
+    json_string = forecast.storage.get(forecast.file_name)
+    if json_string is None:
+        msg = f"No saved data for {forecast.file_name} in {forecast.storage}."
+        raise FileNotFoundError(msg)
+    return json_string, time.perf_counter() - start
+
+
+def _read_and_parse(forecast: Forecast) -> Tuple[bool, float, float]:
+    """Load saved data for a forecast, return whether it was cached and the timings."""
+    json_string, read_time = _read(forecast)
+    if json_string is None:
+        return True, read_time, 0.0
+
+    start = time.perf_counter()
+    forecast._load_json_string(json_string)
+    return False, read_time, time.perf_counter() - start
+
+
+def warm_up(
+    forecasts: Iterable[Forecast],
+    max_workers: Optional[int] = None,
+    processes: Optional[int] = 0,
+    data_cache: Union[bool, DataCache, None] = True,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> WarmUpReport:
+    """Load saved data for many forecasts in parallel.
+
+    Forecasts whose data is not saved are recorded as errors in the report.
+    Saved forecasts can be listed with Manifest.forecasts.
+
+    Args:
+        forecasts: Forecasts to load data for.
+        max_workers: Optional; Number of threads to read data with, defaults to
+            the concurrent.futures default.
+        processes: Optional; Number of processes to parse data with, None for
+            one per CPU. Defaults to 0, parsing in the reading threads. Parsed
+            data has to be sent back from the processes so this only pays off
+            when there are spare CPUs.
+        data_cache: Optional; Data cache to populate, True for the process wide
+            cache, False for none and None for the data cache of each forecast.
+            Defaults to the process wide cache, so that forecasts created
+            later are served from memory. Caches only hold up to their
+            max_entries, 256 for the process wide cache, check
+            WarmUpReport.evicted and use a larger cache to warm up more
+            forecasts.
+        progress: Optional; Called with the number of forecasts done and the
+            total number of forecasts each time a forecast is done.
+
+    Returns:
+        A WarmUpReport.
+    """
+    start = time.perf_counter()
+    forecasts = list(forecasts)
+    report = WarmUpReport()
+
+    if data_cache is not None:
+        if data_cache is True:
+            data_cache = cache.DATA_CACHE
+        for forecast in forecasts:
+            forecast.data_cache = None if data_cache is False else data_cache
+    data_caches = {
+        id(forecast.data_cache): forecast.data_cache
+        for forecast in forecasts
+        if forecast.data_cache is not None
+    }.values()
+    evictions = sum(used.evictions for used in data_caches)
+
+    total = len(forecasts)
+    done = 0
+
+    def finish(forecast: Forecast, error: Optional[Exception]) -> None:
+        nonlocal done
+        if error is None:
+            report.forecasts.append(forecast)
+        else:
+            report.errors.append((forecast, error))
+        done += 1
+        if progress is not None:
+            progress(done, total)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as threads:
+        if processes == 0:
+            loads = {threads.submit(_read_and_parse, forecast): forecast for forecast in forecasts}
+            for load in concurrent.futures.as_completed(loads):
+                try:
+                    cached, read_time, parse_time = load.result()
+                except Exception as error:
+                    finish(loads[load], error)
+                    continue
+                report.cached += cached
+                report.read_time += read_time
+                report.parse_time += parse_time
+                finish(loads[load], None)
+
+        else:
+            with concurrent.futures.ProcessPoolExecutor(processes) as process_pool:
+                reads = {threads.submit(_read, forecast): forecast for forecast in forecasts}
+                parses: Dict[
+                    "concurrent.futures.Future[Tuple[Data, float]]", Tuple[Forecast, str]
+                ] = {}
+                for read in concurrent.futures.as_completed(reads):
+                    forecast = reads[read]
+                    try:
+                        json_string, read_time = read.result()
+                    except Exception as error:
+                        finish(forecast, error)
+                        continue
+                    report.read_time += read_time
+                    if json_string is None:
+                        report.cached += 1
+                        finish(forecast, None)
+                    else:
+                        parse = process_pool.submit(
+                            parse_json_string, json_string, forecast.variables, forecast.window
+                        )
+                        parses[parse] = (forecast, json_string)
+
+                for parse in concurrent.futures.as_completed(parses):
+                    forecast, json_string = parses[parse]
+                    try:
+                        data, parse_time = parse.result()
+                    except Exception as error:
+                        finish(forecast, error)
+                        continue
+                    report.parse_time += parse_time
+                    forecast._load_json_string(json_string, data)
+                    finish(forecast, None)
+
+    report.evicted = sum(used.evictions for used in data_caches) - evictions
+    report.duration = time.perf_counter() - start
+    return report
@@ -1,11 +1,46 @@
-"""Classes and functions used for mocking responses from the requests library."""
+"""Fixtures shared by the tests and mocks of responses from the requests library."""
 
 import datetime as dt
+import importlib.util
 import json
 
 import pytest
 import requests
 
+from metno_locationforecast import _utils
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+@pytest.fixture
+def new_york_forecast():
+    """A compact forecast for New York, whose data is saved in tests/test_data."""
+    new_york = Place("New York", 40.7, -74.0, 10)
+    user_agent = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+    return Forecast(new_york, user_agent, "compact", "./tests/test_data/", data_cache=False)
+
+
+@pytest.fixture
+def new_york_data(new_york_forecast):
+    """Saved data of the New York forecast."""
+    new_york_forecast.load()
+    return new_york_forecast.data
+
+
+@pytest.fixture(
+    params=[
+        False,
+        pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMPY, reason="needs numpy")),
+    ]
+)
+def vectorize(request, monkeypatch):
+    """Whether to use numpy, it is hidden when False so that the pure Python code is tested."""
+    if not request.param:
+        monkeypatch.setattr(_utils, "_NUMPY", False)
+    return request.param
+
 
 class MockResponse:
     """Mock requests.response class."""
@@ -14,6 +49,7 @@ class MockResponse:
         self.status_code = status_code
         self.headers = headers
         self.text = text
+        self.content = text.encode()
 
     def json(self):
         return json.loads(self.text)
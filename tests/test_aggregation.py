@@ -0,0 +1,147 @@
+"""Tests for the aggregation module."""
+
+import datetime as dt
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from metno_locationforecast.aggregation import Aggregation, aggregate
+from metno_locationforecast.data_containers import Data, Interval, Variable
+
+
+def make_interval(start_time, hours, temperature, precipitation=None):
+    variables = {"air_temperature": Variable("air_temperature", temperature, "celsius")}
+    if precipitation is not None:
+        variables["precipitation_amount"] = Variable("precipitation_amount", precipitation, "mm")
+    return Interval(start_time, start_time + dt.timedelta(hours=hours), None, variables)
+
+
+@pytest.fixture
+def mixed_data():
+    """Hourly intervals for a day, followed by 6 hourly and 12 hourly intervals."""
+    start = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+    intervals = [make_interval(start + dt.timedelta(hours=h), 1, h, 0.5) for h in range(24)]
+    for h in range(24, 48, 6):
+        intervals.append(make_interval(start + dt.timedelta(hours=h), 6, h - 24, 3.0))
+    intervals.append(make_interval(start + dt.timedelta(hours=48), 12, 20, 6.0))
+    intervals.append(make_interval(start + dt.timedelta(hours=60), 0, 30))
+    units = {"air_temperature": "celsius", "precipitation_amount": "mm"}
+    return Data(start, start, start, units, intervals)
+
+
+def test_daily_reductions(mixed_data, vectorize):
+    result = aggregate(
+        mixed_data,
+        {"air_temperature": ["min", "max", "mean"], "precipitation_amount": "sum"},
+        vectorize=vectorize,
+    )
+
+    assert result.periods == [dt.date(2020, 7, 20), dt.date(2020, 7, 21), dt.date(2020, 7, 22)]
+    assert result.units == {"air_temperature": "celsius", "precipitation_amount": "mm"}
+    assert result["air_temperature"]["min"] == [0, 0, 20]
+    assert result["air_temperature"]["max"] == [23, 18, 30]
+    assert result["air_temperature"]["mean"] == [pytest.approx(11.5), pytest.approx(9), 25]
+    assert result["precipitation_amount"] == {"sum": [pytest.approx(12), 12, 6]}
+
+
+def test_mean_is_weighted_by_step(vectorize):
+    start = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+    intervals = [make_interval(start, 1, 0), make_interval(start + dt.timedelta(hours=1), 6, 7)]
+    intervals.append(make_interval(start + dt.timedelta(hours=7), 6, 0))
+    data = Data(start, start, start, {"air_temperature": "celsius"}, intervals)
+
+    result = aggregate(data, "air_temperature", "mean", vectorize=vectorize)
+
+    assert result["air_temperature"]["mean"] == [pytest.approx(42 / 13)]
+
+
+def test_overlapping_amounts_are_counted_once(vectorize):
+    start = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+    intervals = [
+        make_interval(start, 12, 0, 12.0),
+        make_interval(start + dt.timedelta(hours=6), 6, 0, 1.0),
+    ]
+    data = Data(start, start, start, {"air_temperature": "celsius"}, intervals)
+
+    result = aggregate(data, "precipitation_amount", "sum", vectorize=vectorize)
+
+    assert result["precipitation_amount"]["sum"] == [7.0]
+
+
+def test_windows(mixed_data, vectorize):
+    result = aggregate(
+        mixed_data,
+        "precipitation_amount",
+        "sum",
+        period=dt.timedelta(hours=12),
+        vectorize=vectorize,
+    )
+
+    assert result.periods[0] == dt.datetime(2020, 7, 20, tzinfo=dt.timezone.utc)
+    assert result.periods[-1] == dt.datetime(2020, 7, 22, 12, tzinfo=dt.timezone.utc)
+    assert result["precipitation_amount"]["sum"] == [6, 6, 6, 6, 6, None]
+
+
+def test_local_days_match_intervals_for(new_york_data, vectorize):
+    tzinfo = ZoneInfo("America/New_York")
+    result = new_york_data.aggregate(["air_temperature", "wind_speed"], tzinfo=tzinfo)
+
+    assert result.periods == list(new_york_data.intervals_by_day(tzinfo))
+    for day in result.periods:
+        temperatures = [
+            interval.variables["air_temperature"].value
+            for interval in new_york_data.intervals_for(day, tzinfo)
+        ]
+        values = result.for_period(day)
+        assert values["air_temperature"]["min"] == min(temperatures)
+        assert values["air_temperature"]["max"] == max(temperatures)
+
+
+def test_vectorized_matches_python(new_york_data):
+    pytest.importorskip("numpy")
+    variables = ["air_temperature", "precipitation_amount", "wind_speed"]
+    for period in ["day", dt.timedelta(hours=3)]:
+        expected = aggregate(new_york_data, variables, period=period, vectorize=False)
+        result = aggregate(new_york_data, variables, period=period, vectorize=True)
+
+        assert result.periods == expected.periods
+        for name in variables:
+            for reduction, column in expected[name].items():
+                assert result[name][reduction] == pytest.approx(column)
+
+
+def test_unordered_intervals(mixed_data):
+    expected = mixed_data.aggregate("air_temperature")
+    mixed_data.intervals = list(reversed(mixed_data.intervals))
+
+    assert mixed_data.aggregate("air_temperature") == expected
+
+
+def test_follows_unit_conversion(mixed_data):
+    before = mixed_data.aggregate("air_temperature", "max")
+    for interval in mixed_data.intervals:
+        interval.variables["air_temperature"].convert_to("fahrenheit")
+
+    result = mixed_data.aggregate("air_temperature", "max")
+
+    assert before["air_temperature"]["max"] == [23, 18, 30]
+    assert result.units == {"air_temperature": "fahrenheit"}
+    assert result["air_temperature"]["max"] == [73.4, 64.4, 86.0]
+
+
+def test_empty_data():
+    start = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+    data = Data(start, start, start, {"air_temperature": "celsius"}, [])
+
+    assert aggregate(data, "air_temperature", "max") == Aggregation(
+        [], {"air_temperature": "celsius"}, {"air_temperature": {"max": []}}
+    )
+
+
+def test_invalid_arguments(mixed_data):
+    with pytest.raises(ValueError):
+        mixed_data.aggregate("air_temperature", "median")
+    with pytest.raises(ValueError):
+        mixed_data.aggregate("air_temperature", period="week")
+    with pytest.raises(KeyError):
+        mixed_data.aggregate("wind_speed")
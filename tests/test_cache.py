@@ -0,0 +1,170 @@
+"""Tests for the cache.py module."""
+
+import datetime as dt
+
+import pytest
+
+from metno_locationforecast import cache
+from metno_locationforecast.cache import DataCache
+from metno_locationforecast.data_containers import Data, Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.storage import MemoryStorage
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+
+NOW = dt.datetime(2020, 7, 20, 12, 0, tzinfo=dt.timezone.utc)
+
+
+def make_data(expires):
+    return Data(NOW, expires, NOW, {}, [])
+
+
+@pytest.fixture
+def fresh_data():
+    return make_data(NOW + dt.timedelta(hours=1))
+
+
+@pytest.fixture
+def new_york():
+    return Place("New York", 40.7, -74.0, 10)
+
+
+class TestDataCache:
+    def test_miss_then_hit(self, fresh_data):
+        data_cache = DataCache()
+
+        assert data_cache.get("key", NOW) is None
+        data_cache.put("key", fresh_data)
+        assert data_cache.get("key", NOW) is fresh_data
+
+        assert data_cache.hits == 1
+        assert data_cache.misses == 1
+
+    def test_expired_entries_are_dropped(self, fresh_data):
+        data_cache = DataCache()
+        data_cache.put("key", fresh_data)
+
+        assert data_cache.get("key", NOW + dt.timedelta(hours=2)) is None
+        assert "key" not in data_cache
+        assert data_cache.expirations == 1
+
+    def test_evict_by_entries(self, fresh_data):
+        data_cache = DataCache(max_entries=2)
+        data_cache.put("a", fresh_data)
+        data_cache.put("b", fresh_data)
+        data_cache.get("a", NOW)
+        data_cache.put("c", fresh_data)
+
+        assert "a" in data_cache
+        assert "b" not in data_cache
+        assert "c" in data_cache
+        assert data_cache.evictions == 1
+
+    def test_evict_by_bytes(self, fresh_data):
+        data_cache = DataCache(max_entries=None, max_bytes=100)
+        data_cache.put("a", fresh_data, 60)
+        data_cache.put("b", fresh_data, 60)
+
+        assert len(data_cache) == 1
+        assert "b" in data_cache
+        assert data_cache.stats()["bytes"] == 60
+
+    def test_invalidate_and_clear(self, fresh_data):
+        data_cache = DataCache()
+        data_cache.put("a", fresh_data, 10)
+        data_cache.put("b", fresh_data, 10)
+
+        assert data_cache.invalidate("a") is True
+        assert data_cache.invalidate("a") is False
+        data_cache.clear()
+
+        assert data_cache.stats() == {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "entries": 0,
+            "bytes": 0,
+        }
+
+
+class TestForecastDataCache:
+    def test_no_cache_by_default(self, new_york):
+        forecast = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION)
+
+        assert forecast.data_cache is None
+
+    def test_process_wide_cache(self, new_york):
+        forecast = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION, data_cache=True)
+
+        assert forecast.data_cache is cache.DATA_CACHE
+
+    def test_load_uses_cache(self, mock_in_date, new_york):
+        data_cache = DataCache()
+        first = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION, data_cache=data_cache)
+        first.load()
+
+        second = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION, data_cache=data_cache)
+        second.load()
+
+        assert second.data is first.data
+        assert data_cache.hits == 1
+        # Raw json is still available, read lazily from storage.
+        assert second.json_string == first.json_string
+
+    def test_variables_are_cached_separately(self, mock_in_date, new_york):
+        data_cache = DataCache()
+        full = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION, data_cache=data_cache)
+        full.load()
+
+        wind = Forecast(
+            new_york,
+            USER_AGENT,
+            "compact",
+            SAVE_LOCATION,
+            data_cache=data_cache,
+            variables=["wind_speed"],
+        )
+        wind.load()
+
+        assert wind.cache_key != full.cache_key
+        assert wind.data is not full.data
+        assert wind.data.units == {"wind_speed": "m/s"}
+        assert data_cache.hits == 0
+
+    def test_update_uses_cache(self, mock_in_date, new_york):
+        data_cache = DataCache()
+        source = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION)
+        source.load()
+        data_cache.put(source.cache_key, source.data)
+
+        storage = MemoryStorage()
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=storage, data_cache=data_cache)
+
+        assert forecast.update() == "Data-Not-Expired"
+        assert forecast.data is source.data
+
+    def test_update_populates_cache(self, mock_out_of_date, mock_200_request, new_york):
+        data_cache = DataCache()
+        storage = MemoryStorage()
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=storage, data_cache=data_cache)
+
+        forecast.update()
+
+        assert forecast.cache_key in data_cache
+
+    def test_not_modified_with_cached_data(self, mock_out_of_date, mock_304_request, new_york):
+        data_cache = DataCache()
+        source = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION)
+        source.load()
+
+        storage = MemoryStorage()
+        storage.put(source.file_name, source.json_string)
+        data_cache.put(source.cache_key, source.data)
+
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=storage, data_cache=data_cache)
+        forecast.data = data_cache.get(forecast.cache_key, NOW)
+
+        assert forecast.update() == "Data-Not-Modified"
+        assert forecast.data.intervals == source.data.intervals
@@ -0,0 +1,184 @@
+"""Tests for the cli.py module."""
+
+import csv
+import io
+import json
+
+import pytest
+import requests
+
+from metno_locationforecast.cli import INTERVAL_FIELDS, bounded_map, main, parse_size, read_places
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.simulator import Simulator
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+
+
+def test_parse_size():
+    assert parse_size("100") == 100
+    assert parse_size("2K") == 2048
+    assert parse_size("1.5mb") == int(1.5 * 1024**2)
+
+
+def test_read_places():
+    file = io.StringIO(
+        "name,latitude,longitude,altitude\nNew York,40.7,-74.0,10\nBeijing,39.9,116.4\n"
+    )
+
+    places = list(read_places(file))
+
+    assert places == [Place("New York", 40.7, -74.0, 10), Place("Beijing", 39.9, 116.4)]
+
+
+def test_read_places_invalid_rows():
+    with pytest.raises(ValueError):
+        list(read_places(io.StringIO("New York,40.7\n")))
+
+    invalid = []
+    file = io.StringIO("New York,x,1\nOslo,59.9,10.8\n")
+    places = list(read_places(file, lambda row, error: invalid.append(row)))
+
+    assert places == [Place("Oslo", 59.9, 10.8)]
+    assert invalid == [["New York", "x", "1"]]
+
+
+def test_gc(tmp_path, capsys):
+    tmp_path.joinpath("lat40.7lon-74.0altitude10_compact.json").write_text("{}")
+    tmp_path.joinpath("lat51.5lon-0.1altitude25_compact.json").write_text("{}")
+    keep = tmp_path.joinpath("keep.csv")
+    keep.write_text("London,51.5,-0.1,25\n")
+
+    exit_code = main(["gc", "--save-location", str(tmp_path), "--keep", str(keep)])
+
+    assert exit_code == 0
+    assert capsys.readouterr().out == "inactive\tlat40.7lon-74.0altitude10_compact.json\n"
+    assert not tmp_path.joinpath("lat40.7lon-74.0altitude10_compact.json").exists()
+    assert tmp_path.joinpath("lat51.5lon-0.1altitude25_compact.json").exists()
+
+
+def test_gc_keep_integer_coordinates(tmp_path, capsys):
+    oslo = Forecast(Place("Oslo", 60, 10), USER_AGENT, "compact", str(tmp_path))
+    tmp_path.joinpath(oslo.file_name).write_text("{}")
+    keep = tmp_path.joinpath("keep.csv")
+    keep.write_text("Oslo,60,10\n")
+
+    exit_code = main(["gc", "--save-location", str(tmp_path), "--keep", str(keep)])
+
+    assert exit_code == 0
+    assert capsys.readouterr().out == ""
+    assert tmp_path.joinpath(oslo.file_name).exists()
+
+
+def test_no_command():
+    with pytest.raises(SystemExit):
+        main([])
+
+
+def test_bounded_map():
+    taken = []
+
+    def items():
+        for item in range(100):
+            taken.append(item)
+            yield item
+
+    results = bounded_map(lambda item: item * 2, items(), 2)
+    first_item, first_future = next(results)
+
+    assert first_future.result() == first_item * 2
+    assert len(taken) <= 5
+    assert sorted(future.result() for _, future in results) == sorted(
+        item * 2 for item in range(100) if item != first_item
+    )
+
+
+class TestRefresh:
+    """Tests for the refresh command."""
+
+    @pytest.fixture(autouse=True)
+    def simulator(self, monkeypatch):
+        monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+        with Simulator(intervals=5) as simulator:
+            yield simulator
+
+    @pytest.fixture
+    def places(self, tmp_path):
+        places = tmp_path.joinpath("places.csv")
+        places.write_text("name,latitude,longitude\nNew York,40.7,-74.0\nOslo,59.9,10.8,10\n")
+        return places
+
+    def refresh(self, simulator, tmp_path, *args):
+        return main(
+            [
+                "refresh",
+                *args,
+                "--save-location",
+                str(tmp_path / "data"),
+                "--user-agent",
+                USER_AGENT,
+                "--base-url",
+                simulator.url,
+            ]
+        )
+
+    def test_ndjson(self, simulator, tmp_path, places, capsys):
+        exit_code = self.refresh(simulator, tmp_path, str(places))
+
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert exit_code == 0
+        assert len(rows) == 10
+        assert {row["name"] for row in rows} == {"New York", "Oslo"}
+        assert {row["altitude"] for row in rows if row["name"] == "Oslo"} == {10}
+        assert all("air_temperature" in row for row in rows)
+
+    def test_csv_from_stdin(self, simulator, tmp_path, places, monkeypatch, capsys):
+        monkeypatch.setattr("sys.stdin", io.StringIO(places.read_text()))
+
+        exit_code = self.refresh(
+            simulator, tmp_path, "--format", "csv", "--variables", "air_temperature"
+        )
+
+        rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+        assert exit_code == 0
+        assert len(rows) == 10
+        assert list(rows[0]) == INTERVAL_FIELDS + ["air_temperature"]
+
+    def test_uses_saved_data(self, simulator, tmp_path, places, capsys):
+        self.refresh(simulator, tmp_path, str(places))
+        self.refresh(simulator, tmp_path, str(places))
+
+        assert simulator.status_codes == {200: 2}
+
+    def test_failed_place(self, simulator, tmp_path, monkeypatch, capsys):
+        places = tmp_path.joinpath("places.csv")
+        places.write_text("New York,40.7,-74.0\nNowhere,0,0\n")
+        update = Forecast.update
+
+        def failing_update(forecast):
+            if forecast.place.name == "Nowhere":
+                raise requests.HTTPError("500 Server Error")
+            return update(forecast)
+
+        monkeypatch.setattr(Forecast, "update", failing_update)
+
+        exit_code = self.refresh(simulator, tmp_path, str(places))
+
+        output = capsys.readouterr()
+        assert exit_code == 1
+        assert len(output.out.splitlines()) == 5
+        assert "error\tNowhere\tHTTPError: 500 Server Error" in output.err
+        assert "Refreshed 1 places, 1 failed." in output.err
+
+    def test_invalid_rows(self, simulator, tmp_path, capsys):
+        places = tmp_path.joinpath("places.csv")
+        places.write_text("bad,abc,10\nNew York,40.7,-74.0\nshort,10\nOslo,59.9,10.8,10\n")
+
+        exit_code = self.refresh(simulator, tmp_path, str(places))
+
+        output = capsys.readouterr()
+        assert exit_code == 1
+        assert len(output.out.splitlines()) == 10
+        assert "error\tbad,abc,10\tValueError: " in output.err
+        assert "error\tshort,10\tValueError: " in output.err
+        assert "Refreshed 2 places, 2 failed." in output.err
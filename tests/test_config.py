@@ -1,10 +1,21 @@
 """Tests for the config.py module."""
 
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 
-from metno_locationforecast.config import Config
+from metno_locationforecast import config as config_module
+from metno_locationforecast.config import Config, configure, get_config, reload_config
+
+
+@pytest.fixture
+def shared_config(monkeypatch):
+    """Reset the shared configuration, reading it from an empty directory."""
+    monkeypatch.setattr(Config, "cwd", Path("./tests/test_configs/test_no_config_file/"))
+    monkeypatch.setattr(config_module, "_CONFIG", None)
+    monkeypatch.setattr(config_module, "_OVERRIDES", {})
 
 
 class TestConfig:
@@ -119,6 +130,7 @@ class TestConfig:
             assert config.user_agent is None
             assert config.save_location == "./data"
             assert config.base_url == "https://api.met.no/weatherapi/locationforecast/2.0/"
+            assert config.storage == "filesystem"
             assert config.user_config_file is None
 
         def test_partial_configuration(self, monkeypatch):
@@ -150,3 +162,107 @@ class TestConfig:
                 Path("./tests/test_configs/test_bad_config_file/setup.cfg").resolve()
             )
             assert not hasattr(config, "not_a_real_configuration")
+
+        def test_boolean_configuration(self, monkeypatch, tmp_path):
+            tmp_path.joinpath("metno-locationforecast.ini").write_text(
+                "[metno-locationforecast]\ndata_cache = yes\n"
+            )
+            monkeypatch.setattr(Config, "cwd", tmp_path)
+
+            config = Config()
+
+            assert config.data_cache is True
+
+        def test_bad_boolean_configuration(self, monkeypatch, tmp_path):
+            tmp_path.joinpath("metno-locationforecast.ini").write_text(
+                "[metno-locationforecast]\ndata_cache = sometimes\n"
+            )
+            monkeypatch.setattr(Config, "cwd", tmp_path)
+
+            with pytest.warns(UserWarning):
+                config = Config()
+
+            assert config.data_cache is False
+
+        def test_cwd_is_resolved_on_use(self, monkeypatch, tmp_path):
+            tmp_path.joinpath("metno-locationforecast.ini").write_text(
+                "[metno-locationforecast]\nuser_agent = tmp_path\n"
+            )
+            monkeypatch.chdir(tmp_path)
+
+            config = Config()
+
+            assert config.user_agent == "tmp_path"
+
+        def test_environment_configuration(self, monkeypatch):
+            monkeypatch.setattr(Config, "cwd", Path("./tests/test_configs/test_setup_file/"))
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_USER_AGENT", "environment")
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_DATA_CACHE", "true")
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_NOT_A_REAL_CONFIGURATION", "environment")
+
+            config = Config()
+
+            assert config.user_agent == "environment"
+            assert config.data_cache is True
+            assert config.forecast_type == "setup_file"
+            assert not hasattr(config, "not_a_real_configuration")
+
+        def test_environment_only_sets_settings(self, monkeypatch):
+            monkeypatch.setattr(Config, "cwd", Path("./tests/test_configs/test_setup_file/"))
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_CWD", "/tmp")
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_FILES", "other.ini")
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_USER_CONFIG_FILE", "other.ini")
+
+            config = Config()
+
+            assert config.files == ["metno-locationforecast.ini", "setup.cfg"]
+            assert config.user_config_file.endswith("setup.cfg")
+            assert config.forecast_type == "setup_file"
+
+        def test_overrides(self, monkeypatch):
+            monkeypatch.setattr(Config, "cwd", Path("./tests/test_configs/test_setup_file/"))
+            monkeypatch.setenv("METNO_LOCATIONFORECAST_USER_AGENT", "environment")
+
+            config = Config(user_agent="override", storage="memory")
+
+            assert config.user_agent == "override"
+            assert config.storage == "memory"
+            assert config.forecast_type == "setup_file"
+
+        @pytest.mark.parametrize("key", ["not_a_real_configuration", "cwd", "get_config"])
+        def test_bad_override(self, key):
+            with pytest.raises(ValueError):
+                Config(**{key: "override"})
+
+
+class TestSharedConfig:
+    def test_resolved_once(self, shared_config):
+        assert get_config() is get_config()
+
+    def test_configure(self, shared_config, monkeypatch):
+        configure(user_agent="configured")
+        monkeypatch.setenv("METNO_LOCATIONFORECAST_FORECAST_TYPE", "complete")
+
+        assert get_config().user_agent == "configured"
+        assert get_config().forecast_type == "compact"
+
+        config = reload_config()
+
+        assert get_config() is config
+        assert config.user_agent == "configured"
+        assert config.forecast_type == "complete"
+        assert reload_config(clear_overrides=True).user_agent is None
+
+    def test_bad_configure(self, shared_config):
+        with pytest.raises(ValueError):
+            configure(not_a_real_configuration="configured")
+
+        assert get_config().user_agent is None
+
+    def test_not_read_on_import(self):
+        code = (
+            "import metno_locationforecast, metno_locationforecast.cli; "
+            "from metno_locationforecast import config; "
+            "assert config._CONFIG is None"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
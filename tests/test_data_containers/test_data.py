@@ -5,7 +5,7 @@ from zoneinfo import ZoneInfo
 
 import pytest
 
-from metno_locationforecast.data_containers import Place
+from metno_locationforecast.data_containers import Data, Interval, Place, Variable
 from metno_locationforecast.forecast import Forecast
 
 USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
@@ -78,3 +78,129 @@ def test_intervals_between_with_timezone(new_york_data):
 
     assert len(intervals) == 4
     assert intervals[3].variables["wind_speed"].value == 5.6
+
+
+def linear_intervals_between(data, start, end):
+    return [interval for interval in data.intervals if start <= interval.start_time < end]
+
+
+def test_intervals_between_matches_linear_scan(new_york_data):
+    base = dt.datetime(year=2020, month=7, day=19, tzinfo=dt.timezone.utc)
+    tzinfo = ZoneInfo("America/New_York")
+    for start_hour in range(0, 24 * 12, 5):
+        for length in (0, 1, 3, 7, 30):
+            start = base + dt.timedelta(hours=start_hour)
+            end = start + dt.timedelta(hours=length)
+            for a, b in ((start, end), (start.astimezone(tzinfo), end.astimezone(tzinfo))):
+                assert new_york_data.intervals_between(a, b) == linear_intervals_between(
+                    new_york_data, a, b
+                )
+
+
+def test_intervals_between_end_before_start(new_york_data):
+    start = dt.datetime(year=2020, month=7, day=20, hour=15)
+    end = dt.datetime(year=2020, month=7, day=20, hour=11)
+
+    assert new_york_data.intervals_between(start, end) == []
+
+
+def test_intervals_between_unordered_intervals(new_york_data):
+    new_york_data.intervals = list(reversed(new_york_data.intervals))
+    start = dt.datetime(year=2020, month=7, day=20, hour=11)
+    end = dt.datetime(year=2020, month=7, day=20, hour=15)
+    intervals = new_york_data.intervals_between(start, end)
+
+    assert len(intervals) == 4
+    assert intervals[0].variables["wind_speed"].value == 4.4
+
+
+def test_intervals_between_after_intervals_change(new_york_data):
+    start = dt.datetime(year=2020, month=7, day=20, hour=11)
+    end = dt.datetime(year=2020, month=7, day=20, hour=15)
+    assert len(new_york_data.intervals_between(start, end)) == 4
+
+    new_york_data.intervals.pop(0)
+
+    assert len(new_york_data.intervals_between(start, end)) == 3
+
+
+def intervals_for_by_range(data, day, tzinfo):
+    start = dt.datetime(day.year, day.month, day.day, tzinfo=tzinfo)
+    return linear_intervals_between(data, start, start + dt.timedelta(days=1))
+
+
+@pytest.fixture
+def daylight_saving_data():
+    """Hourly data over the change to daylight saving time in New York."""
+    start = dt.datetime(year=2020, month=3, day=6, tzinfo=dt.timezone.utc)
+    intervals = []
+    for hour in range(24 * 6):
+        start_time = start + dt.timedelta(hours=hour)
+        variables = {"air_temperature": Variable("air_temperature", hour, "celsius")}
+        intervals.append(Interval(start_time, start_time + dt.timedelta(hours=1), None, variables))
+    return Data(start, start, start, {"air_temperature": "celsius"}, intervals)
+
+
+@pytest.mark.parametrize(
+    "tzinfo",
+    [dt.timezone.utc, dt.timezone(dt.timedelta(hours=5, minutes=30)), ZoneInfo("America/New_York")],
+)
+def test_intervals_for_matches_range(daylight_saving_data, tzinfo):
+    for day in range(4, 14):
+        day = dt.date(year=2020, month=3, day=day)
+        assert daylight_saving_data.intervals_for(day, tzinfo) == intervals_for_by_range(
+            daylight_saving_data, day, tzinfo
+        )
+
+    assert len(daylight_saving_data.intervals_for(dt.date(2020, 3, 8), tzinfo)) in (23, 24)
+
+
+def test_intervals_by_day(new_york_data):
+    tzinfo = ZoneInfo("America/New_York")
+    days = new_york_data.intervals_by_day(tzinfo)
+
+    assert list(days) == sorted(days)
+    assert sum(len(intervals) for intervals in days.values()) == len(new_york_data.intervals)
+    for day, intervals in days.items():
+        assert intervals == new_york_data.intervals_for(day, tzinfo)
+    assert len(days[dt.date(year=2020, month=7, day=20)]) == 17
+
+
+def test_intervals_by_day_unordered_intervals(new_york_data):
+    expected = new_york_data.intervals_by_day()
+    new_york_data.intervals = list(reversed(new_york_data.intervals))
+
+    days = new_york_data.intervals_by_day()
+
+    assert list(days) == list(expected)
+    assert all(len(days[day]) == len(expected[day]) for day in days)
+
+
+def test_converted(new_york_data, new_york_data_copy):
+    converted = new_york_data.converted({"celsius": "fahrenheit", "m/s": "km/h"})
+
+    assert new_york_data == new_york_data_copy
+    assert converted.units["air_temperature"] == "fahrenheit"
+    assert converted.units["wind_speed"] == "km/h"
+    assert converted.units["precipitation_amount"] == "mm"
+    for interval, original in zip(converted.intervals, new_york_data_copy.intervals):
+        expected = {
+            name: Variable(v.name, v.value, v.units) for name, v in original.variables.items()
+        }
+        expected["air_temperature"].convert_to("fahrenheit")
+        expected["wind_speed"].convert_to("km/h")
+        assert interval.variables == expected
+        assert interval.start_time == original.start_time
+        assert interval.symbol_code == original.symbol_code
+
+
+def test_converted_does_not_share_variables(new_york_data):
+    converted = new_york_data.converted({})
+    converted.intervals[0].variables["air_temperature"].convert_to("fahrenheit")
+
+    assert new_york_data.intervals[0].variables["air_temperature"].units == "celsius"
+
+
+def test_converted_invalid(new_york_data):
+    with pytest.raises(ValueError):
+        new_york_data.converted({"celsius": "kelvin"})
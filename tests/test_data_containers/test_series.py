@@ -0,0 +1,109 @@
+"""Tests for the Series class and Data.series."""
+
+import copy
+import datetime as dt
+import math
+import pickle
+
+import pytest
+
+from metno_locationforecast.data_containers import Data, Interval, Place, Variable
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+
+
+def test_series(new_york_data):
+    series = new_york_data.series("air_temperature")
+
+    assert series.name == "air_temperature"
+    assert series.units == "celsius"
+    assert len(series) == len(new_york_data.intervals)
+    assert list(series) == [
+        (interval.start_time, interval.variables["air_temperature"].value)
+        for interval in new_york_data.intervals
+    ]
+
+
+def test_series_is_cached(new_york_data):
+    series = new_york_data.series("air_temperature")
+
+    assert new_york_data.series("air_temperature") is series
+    with pytest.raises(TypeError):
+        series.values[0] = 0.0
+
+
+def test_missing_steps(new_york_data):
+    series = new_york_data.series("precipitation_amount")
+    missing = [
+        i
+        for i, interval in enumerate(new_york_data.intervals)
+        if "precipitation_amount" not in interval.variables
+    ]
+
+    assert missing
+    assert len(series) == len(new_york_data.intervals)
+    assert all(math.isnan(series.values[i]) for i in missing)
+
+    dropped = new_york_data.series("precipitation_amount", missing="drop")
+    assert len(dropped) == len(series) - len(missing)
+    assert not any(math.isnan(value) for value in dropped.values)
+
+
+def test_series_follows_changes(new_york_data):
+    series = new_york_data.series("air_temperature")
+    for interval in new_york_data.intervals:
+        interval.variables["air_temperature"].convert_to("fahrenheit")
+
+    converted = new_york_data.series("air_temperature")
+    assert converted.units == "fahrenheit"
+    assert converted.values[0] == new_york_data.intervals[0].variables["air_temperature"].value
+
+    new_york_data.intervals = new_york_data.intervals[:3]
+    assert len(new_york_data.series("air_temperature")) == 3
+    assert series.units == "celsius"
+
+
+def test_series_kept_when_other_data_changes(new_york_data):
+    series = new_york_data.series("air_temperature")
+    other = Forecast(Place("New York", 40.7, -74.0, 10), USER_AGENT, "compact", SAVE_LOCATION)
+    other.load()
+    other_series = other.data.series("air_temperature")
+    other.data.intervals[0].variables["air_temperature"].convert_to("fahrenheit")
+    Variable("air_temperature", 0, "celsius").convert_to("fahrenheit")
+
+    assert new_york_data.series("air_temperature") is series
+    assert other.data.series("air_temperature") is not other_series
+    assert other.data.series("air_temperature").values[0] == other_series.values[0] * 1.8 + 32
+
+
+def test_data_with_cached_series_can_be_copied(new_york_data):
+    new_york_data.series("air_temperature")
+    new_york_data.in_units({"celsius": "fahrenheit"}).series("air_temperature")
+
+    copied = copy.deepcopy(new_york_data)
+    pickled = pickle.loads(pickle.dumps(new_york_data))
+
+    assert copied == new_york_data
+    assert pickled == new_york_data
+    assert pickled.series("air_temperature") == new_york_data.series("air_temperature")
+
+
+def test_invalid_arguments(new_york_data):
+    with pytest.raises(KeyError):
+        new_york_data.series("snow_depth")
+    with pytest.raises(ValueError):
+        new_york_data.series("air_temperature", missing="zero")
+
+
+def test_eq():
+    start = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+    intervals = [
+        Interval(start, start, None, {"air_temperature": Variable("air_temperature", 1, "celsius")})
+    ]
+    data = Data(start, start, start, {"air_temperature": "celsius"}, intervals)
+    copy = Data(start, start, start, {"air_temperature": "celsius"}, list(intervals))
+
+    assert data.series("air_temperature") is not copy.series("air_temperature")
+    assert data.series("air_temperature") == copy.series("air_temperature")
@@ -0,0 +1,67 @@
+"""Tests for the UnitView class and Data.in_units."""
+
+import math
+
+import pytest
+
+from metno_locationforecast.data_containers import UnitView
+
+IMPERIAL = {"celsius": "fahrenheit", "m/s": "mph", "mm": "inches"}
+
+
+def test_views_are_cached(new_york_data):
+    view = new_york_data.in_units(IMPERIAL)
+
+    assert isinstance(view, UnitView)
+    assert new_york_data.in_units(dict(reversed(list(IMPERIAL.items())))) is view
+    assert new_york_data.in_units({"m/s": "km/h"}) is not view
+
+
+def test_units(new_york_data):
+    view = new_york_data.in_units(IMPERIAL)
+
+    assert view.units["air_temperature"] == "fahrenheit"
+    assert view.units["wind_speed"] == "mph"
+    assert view.units["relative_humidity"] == "%"
+    assert new_york_data.units["air_temperature"] == "celsius"
+
+
+def test_series(new_york_data):
+    view = new_york_data.in_units(IMPERIAL)
+    series = view.series("precipitation_amount")
+    source = new_york_data.series("precipitation_amount")
+
+    assert view.series("precipitation_amount") is series
+    assert series.units == "inches"
+    assert series.times == source.times
+    for value, source_value in zip(series.values, source.values):
+        if math.isnan(source_value):
+            assert math.isnan(value)
+        else:
+            assert value == round(source_value / 25.4, 2)
+    assert view.series("relative_humidity") is new_york_data.series("relative_humidity")
+
+
+def test_to_data(new_york_data):
+    view = new_york_data.in_units(IMPERIAL)
+    data = view.to_data()
+
+    assert view.to_data() is data
+    assert data == new_york_data.converted(IMPERIAL)
+    assert data.intervals[0].variables["wind_speed"].value == view.series("wind_speed").values[0]
+
+
+def test_views_follow_changes(new_york_data):
+    view = new_york_data.in_units(IMPERIAL)
+    series = view.series("air_temperature")
+
+    new_york_data.intervals = new_york_data.intervals[:2]
+
+    assert new_york_data.in_units(IMPERIAL) is not view
+    assert len(view.series("air_temperature")) == 2
+    assert len(series) > 2
+
+
+def test_invalid_units(new_york_data):
+    with pytest.raises(ValueError):
+        new_york_data.in_units({"celsius": "kelvin"})
@@ -0,0 +1,105 @@
+"""Tests for the diagnostics module."""
+
+import datetime as dt
+import sys
+
+import pytest
+
+from metno_locationforecast import diagnostics
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+NEW_YORK = Place("New York", 40.7, -74.0, 10)
+
+
+@pytest.fixture
+def new_york_forecast(new_york_forecast):
+    new_york_forecast.load()
+    return new_york_forecast
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    item = "x" * 1000
+    items = [item, item]
+
+    assert diagnostics.deep_sizeof(items) == sys.getsizeof(items) + sys.getsizeof(item)
+
+
+def test_deep_sizeof_skips_seen_objects():
+    item = "x" * 1000
+    seen = set()
+
+    assert diagnostics.deep_sizeof(item, seen) == sys.getsizeof(item)
+    assert diagnostics.deep_sizeof([item], seen) == sys.getsizeof([item])
+
+
+def test_forecast_memory(new_york_forecast):
+    report = diagnostics.forecast_memory(new_york_forecast)
+
+    assert report.forecasts == 1
+    assert report.variables > 0
+    assert report.intervals > 0
+    assert report.json > 0
+    assert report.json_string >= len(new_york_forecast.json_string)
+    assert report.response == 0
+    assert report.total == report.data + report.raw
+    assert report.as_dict()["total"] == report.total
+
+
+def test_data_memory_matches_forecast_memory(new_york_forecast):
+    forecast_report = diagnostics.forecast_memory(new_york_forecast)
+    data_report = diagnostics.data_memory(new_york_forecast.data)
+
+    assert data_report.variables == forecast_report.variables
+    assert data_report.intervals == forecast_report.intervals
+    assert data_report.caches == forecast_report.caches
+    assert data_report.raw == 0
+
+
+def test_caches(new_york_forecast):
+    before = diagnostics.data_memory(new_york_forecast.data)
+    new_york_forecast.data.series("air_temperature")
+    new_york_forecast.data.intervals_for(dt.date(2020, 7, 21))
+    after = diagnostics.data_memory(new_york_forecast.data)
+
+    assert after.caches > before.caches
+    # Only the cache token and the links from variables to the data's version are added.
+    assert after.variables + after.intervals < before.variables + before.intervals + 1024
+
+
+def test_json_string_not_read_from_storage(new_york_forecast):
+    new_york_forecast._json_string = None
+
+    assert diagnostics.forecast_memory(new_york_forecast).json_string == 0
+    assert new_york_forecast._json_string is None
+
+
+def test_response(tmp_path, mock_out_of_date, mock_200_request, new_york_forecast):
+    new_york_forecast.save_location = tmp_path
+    new_york_forecast.update()
+
+    report = diagnostics.forecast_memory(new_york_forecast)
+
+    assert report.response >= len(new_york_forecast.response.content)
+
+
+def test_total_memory_counts_shared_data_once(new_york_forecast):
+    other = Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION, data_cache=False)
+    other.data = new_york_forecast.data
+    forecasts = [new_york_forecast, other]
+
+    total = diagnostics.total_memory(forecasts)
+    single = diagnostics.forecast_memory(forecasts[0])
+
+    assert total.forecasts == 2
+    assert total.data == single.data
+
+
+def test_add():
+    report = diagnostics.MemoryReport(variables=1, json=2, forecasts=1)
+    report += diagnostics.MemoryReport(variables=3, response=4, forecasts=1)
+
+    assert report == diagnostics.MemoryReport(variables=4, json=2, response=4, forecasts=2)
+    assert report.total == 10
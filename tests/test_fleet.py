@@ -0,0 +1,139 @@
+"""Tests for the fleet module."""
+
+import datetime as dt
+
+import pytest
+
+from metno_locationforecast.data_containers import Data, Interval, Place, Variable
+from metno_locationforecast.fleet import Fleet
+from metno_locationforecast.forecast import Forecast
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+
+START = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+HOUR = dt.timedelta(hours=1)
+
+
+def make_data(temperatures, wind_speeds, first_hour=0):
+    intervals = []
+    for hour, (temperature, wind_speed) in enumerate(zip(temperatures, wind_speeds), first_hour):
+        start_time = START + hour * HOUR
+        variables = {
+            "air_temperature": Variable("air_temperature", temperature, "celsius"),
+            "wind_speed": Variable("wind_speed", wind_speed, "m/s"),
+        }
+        intervals.append(Interval(start_time, start_time + HOUR, None, variables))
+    units = {"air_temperature": "celsius", "wind_speed": "m/s"}
+    return Data(START, START, START, units, intervals)
+
+
+@pytest.fixture
+def fleet():
+    places = [Place(name, 0, i) for i, name in enumerate(["a", "b", "c", "d"])]
+    data = [
+        make_data([10, 12, 14], [5, 16, 5]),
+        make_data([20, 22, 24], [1, 2, 3]),
+        make_data([15, 13, 11], [20, 10, 0]),
+        make_data([30], [15], first_hour=2),
+    ]
+    return Fleet.from_data(places, data)
+
+
+def names(places):
+    return [place.name for place in places]
+
+
+def test_from_data(fleet):
+    assert names(fleet.places) == ["a", "b", "c", "d"]
+    assert fleet.times == [START, START + HOUR, START + 2 * HOUR]
+    assert fleet.variables == ["air_temperature", "wind_speed"]
+    assert fleet.units == {"air_temperature": "celsius", "wind_speed": "m/s"}
+    assert len(fleet) == 4
+
+
+def test_at(fleet, vectorize):
+    assert fleet.at("air_temperature", START + HOUR) == [12, 22, 13, None]
+    assert fleet.at("air_temperature", START + 2.5 * HOUR) == [14, 24, 11, 30]
+    assert fleet.at("air_temperature", START - HOUR) == [None] * 4
+
+
+def test_reduce(fleet, vectorize):
+    assert fleet.reduce("wind_speed") == [16, 3, 20, 15]
+    assert fleet.reduce("air_temperature", "mean") == [12, 22, 13, 30]
+    assert fleet.reduce("air_temperature", "min", end=START + 2 * HOUR) == [10, 20, 13, None]
+    assert fleet.reduce("wind_speed", "sum", start=START + HOUR) == [21, 5, 10, 15]
+
+
+def test_across_places(fleet, vectorize):
+    assert fleet.across_places("air_temperature", "max") == [20, 22, 30]
+    assert fleet.across_places("wind_speed", "mean") == [
+        pytest.approx(26 / 3),
+        pytest.approx(28 / 3),
+        pytest.approx(23 / 4),
+    ]
+
+
+def test_where(fleet, vectorize):
+    assert names(fleet.where("wind_speed", ">", 15)) == ["a", "c"]
+    assert names(fleet.where("wind_speed", ">=", 15, start=START + HOUR)) == ["a", "d"]
+    assert names(fleet.where("air_temperature", "<", 14, time=START + HOUR)) == ["a", "c"]
+    assert names(fleet.where("air_temperature", "<", 14, "min", end=START)) == []
+
+
+def test_top(fleet, vectorize):
+    assert fleet.top("air_temperature", 2, time=START + 2 * HOUR) == [
+        (fleet.places[3], 30),
+        (fleet.places[1], 24),
+    ]
+    assert names(place for place, _ in fleet.top("air_temperature", 10, time=START)) == [
+        "b",
+        "c",
+        "a",
+    ]
+    assert fleet.top("wind_speed", 1, "min", largest=False) == [(fleet.places[2], 0)]
+
+
+def test_column(fleet):
+    column = fleet.column("wind_speed")
+
+    assert [list(row) for row in column][0] == [5, 16, 5]
+    with pytest.raises(KeyError):
+        fleet.column("cloud_area_fraction")
+
+
+def test_to_numpy(fleet):
+    pytest.importorskip("numpy")
+    values = fleet.to_numpy()
+
+    assert values.shape == (4, 3, 2)
+    assert values[1, 2].tolist() == [24, 3]
+
+
+def test_from_forecasts():
+    places = [Place("New York", 40.7, -74.0, 10), Place("Beijing", 39.9, 116.4)]
+    forecasts = [Forecast(place, USER_AGENT, "compact", SAVE_LOCATION) for place in places]
+    for forecast in forecasts:
+        forecast.load()
+
+    fleet = Fleet.from_forecasts(forecasts, variables=["air_temperature"])
+
+    assert fleet.places == places
+    assert fleet.times[0] == min(forecast.data.intervals[0].start_time for forecast in forecasts)
+    first = forecasts[0].data.intervals[0]
+    assert fleet.at("air_temperature", first.start_time)[0] == (
+        first.variables["air_temperature"].value
+    )
+
+
+def test_from_forecasts_without_data():
+    forecast = Forecast(Place("Nowhere", 0, 0), USER_AGENT, "compact", SAVE_LOCATION)
+    with pytest.raises(ValueError):
+        Fleet.from_forecasts([forecast])
+
+
+def test_invalid_arguments(fleet):
+    with pytest.raises(ValueError):
+        fleet.reduce("wind_speed", "median")
+    with pytest.raises(ValueError):
+        fleet.where("wind_speed", "=>", 1)
@@ -3,6 +3,7 @@
 import datetime as dt
 import json
 import os
+import shutil
 from zoneinfo import ZoneInfo
 
 import pytest
@@ -194,6 +195,59 @@ class TestForecast:
             == expected_first_interval_rain
         )
 
+    def test_parse_json_with_variables(self, new_york_forecast):
+        with open("./tests/test_data/lat40.7lon-74.0altitude10_compact.json", "r") as f:
+            _json = json.load(f)
+
+        new_york_forecast.variables = frozenset({"air_temperature", "precipitation_amount"})
+        new_york_forecast.json = _json
+        new_york_forecast._parse_json()
+
+        assert new_york_forecast.data.units == {
+            "air_temperature": "celsius",
+            "precipitation_amount": "mm",
+        }
+        for interval in new_york_forecast.data.intervals:
+            assert set(interval.variables) <= {"air_temperature", "precipitation_amount"}
+            assert "air_temperature" in interval.variables
+        assert new_york_forecast.data.intervals[0].symbol_code is not None
+
+    def test_parse_json_with_window(self, new_york_forecast):
+        with open("./tests/test_data/lat40.7lon-74.0altitude10_compact.json", "r") as f:
+            _json = json.load(f)
+        new_york_forecast.json = _json
+        new_york_forecast._parse_json()
+        intervals = new_york_forecast.data.intervals
+        start = dt.datetime(year=2020, month=7, day=21, hour=6, tzinfo=ZoneInfo("GMT"))
+        end = dt.datetime(year=2020, month=7, day=21, hour=9, tzinfo=ZoneInfo("America/New_York"))
+
+        new_york_forecast.window = (start, end)
+        new_york_forecast._parse_json()
+
+        assert new_york_forecast.data.intervals == [
+            interval for interval in intervals if start <= interval.start_time < end
+        ]
+        assert len(new_york_forecast.data.intervals) == 7
+
+        new_york_forecast.window = dt.timedelta(hours=48)
+        new_york_forecast._parse_json()
+
+        assert new_york_forecast.data.intervals == [
+            interval
+            for interval in intervals
+            if interval.start_time < intervals[0].start_time + dt.timedelta(hours=48)
+        ]
+
+        naive_start = dt.datetime(year=2020, month=7, day=29)
+        new_york_forecast.window = (naive_start, None)
+        new_york_forecast._parse_json()
+
+        assert new_york_forecast.data.intervals == [
+            interval
+            for interval in intervals
+            if interval.start_time >= naive_start.replace(tzinfo=dt.timezone.utc)
+        ]
+
     class TestDataOutdated:
         """Tests for the _data_outdated method."""
 
@@ -253,6 +307,26 @@ class TestForecast:
 
             assert new_york_forecast.json_string == expected_json_string
 
+        def test_load_variables(self, new_york_forecast):
+            wind_forecast = Forecast(
+                new_york_forecast.place,
+                USER_AGENT,
+                "compact",
+                SAVE_LOCATION,
+                variables=["wind_speed"],
+            )
+
+            new_york_forecast.load()
+            wind_forecast.load()
+
+            assert wind_forecast.variables == frozenset({"wind_speed"})
+            assert wind_forecast.data.units == {"wind_speed": "m/s"}
+            assert wind_forecast.json_string == new_york_forecast.json_string
+            assert [interval.variables for interval in wind_forecast.data.intervals] == [
+                {"wind_speed": interval.variables["wind_speed"]}
+                for interval in new_york_forecast.data.intervals
+            ]
+
     class TestUpdate:
         """Tests for the update method."""
 
@@ -290,3 +364,58 @@ class TestForecast:
             update_return = new_york_forecast.update()
 
             assert update_return == "Data-Modified"
+
+    class TestLean:
+        """Tests for forecasts in lean mode."""
+
+        @pytest.fixture
+        def lean_forecast(self, tmp_path):
+            new_york = Place("New York", 40.7, -74.0, 10)
+            file_name = "lat40.7lon-74.0altitude10_compact.json"
+            shutil.copy(os.path.join(SAVE_LOCATION, file_name), tmp_path)
+
+            return Forecast(new_york, USER_AGENT, "compact", str(tmp_path), lean=True)
+
+        def test_load(self, lean_forecast):
+            lean_forecast.load()
+
+            assert lean_forecast._json_string is None
+            assert lean_forecast._json is None
+            assert len(lean_forecast.data.intervals) > 0
+            assert lean_forecast.json["headers"]["Expires"] == "Mon, 20 Jul 2020 12:14:53 GMT"
+
+        def test_data_outdated_and_modified(
+            self, mock_out_of_date, mock_200_request, lean_forecast
+        ):
+            lean_forecast.load()
+
+            update_return = lean_forecast.update()
+
+            assert update_return == "Data-Modified"
+            assert not hasattr(lean_forecast, "response")
+            assert lean_forecast._json_string is None
+            assert lean_forecast._json is None
+            assert len(lean_forecast.data.intervals) == 1
+            assert lean_forecast.json["status_code"] == 200
+            assert "If-Modified-Since" in lean_forecast.url_headers
+
+        def test_data_outdated_and_not_modified(
+            self, mock_out_of_date, mock_304_request, lean_forecast
+        ):
+            lean_forecast.load()
+            intervals = lean_forecast.data.intervals
+
+            update_return = lean_forecast.update()
+
+            assert update_return == "Data-Not-Modified"
+            assert not hasattr(lean_forecast, "response")
+            assert lean_forecast._json is None
+            assert lean_forecast.data.intervals == intervals
+            assert lean_forecast.json["status_code"] == 304
+            assert len(lean_forecast.json["data"]["properties"]["timeseries"]) == len(intervals)
+
+        def test_no_if_modified_since_without_saved_data(self, tmp_path, lean_forecast):
+            lean_forecast.load()
+            lean_forecast.save_location = tmp_path.joinpath("empty")
+
+            assert "If-Modified-Since" not in lean_forecast.url_headers
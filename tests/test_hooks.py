@@ -0,0 +1,78 @@
+"""Tests for the hooks module."""
+
+import pytest
+
+from metno_locationforecast import hooks
+
+
+@pytest.fixture
+def events():
+    received = []
+    with hooks.subscribed(received.append):
+        yield received
+
+
+def test_load(events, new_york_forecast):
+    new_york_forecast.load()
+
+    assert [event.phase for event in events] == ["load", "parse"]
+    load, parse = events
+    assert load.place == new_york_forecast.place
+    assert load.key == new_york_forecast.file_name
+    assert load.status == "storage"
+    assert load.size == len(new_york_forecast.json_string)
+    assert load.duration >= 0
+    assert load.error is None
+    assert parse.size == load.size
+
+
+def test_update(tmp_path, mock_out_of_date, mock_200_request, events, new_york_forecast):
+    new_york_forecast.load()
+    new_york_forecast.save_location = tmp_path
+    events.clear()
+
+    new_york_forecast.update()
+
+    assert [event.phase for event in events] == [
+        "request",
+        "json_from_response",
+        "save",
+        "parse",
+        "update",
+    ]
+    request, update = events[0], events[-1]
+    assert request.status_code == 200
+    assert request.size == len(new_york_forecast.response.content)
+    assert update.status == "Data-Modified"
+    assert update.status_code == 200
+    assert update.duration >= sum(event.duration for event in events[:-1])
+
+
+def test_update_not_expired(mock_in_date, events, new_york_forecast):
+    new_york_forecast.update()
+
+    assert [event.phase for event in events] == ["load", "parse", "update"]
+    assert events[-1].status == "Data-Not-Expired"
+    assert events[-1].status_code is None
+
+
+def test_error(tmp_path, events, new_york_forecast):
+    new_york_forecast.save_location = tmp_path
+
+    with pytest.raises(FileNotFoundError):
+        new_york_forecast.load()
+
+    assert [event.phase for event in events] == ["load"]
+    assert isinstance(events[0].error, FileNotFoundError)
+
+
+def test_unsubscribe(new_york_forecast):
+    received = []
+    hooks.subscribe(received.append)
+    hooks.unsubscribe(received.append)
+    hooks.unsubscribe(received.append)
+
+    new_york_forecast.load()
+
+    assert received == []
+    assert hooks._timer("load", new_york_forecast) is hooks._NULL_TIMER
@@ -0,0 +1,37 @@
+"""Tests the time taken to import the package, measured with 'python -X importtime'."""
+
+import statistics
+
+import pytest
+from helpers import import_times
+
+# Modules that should only be imported when they are needed, e.g. the network
+# stack when a forecast is first updated.
+DEFERRED_MODULES = [
+    "requests",
+    "urllib3",
+    "charset_normalizer",
+    "ssl",
+    "http.client",
+    "email.utils",
+    "zoneinfo",
+    "sqlite3",
+    "numpy",
+]
+
+
+@pytest.mark.parametrize("module", ["metno_locationforecast", "metno_locationforecast.cli"])
+def test_heavy_imports_are_deferred(module):
+    times = import_times(module)
+
+    assert module in times
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+
+
+def test_import_is_faster_than_requests():
+    package = statistics.median(
+        import_times("metno_locationforecast")["metno_locationforecast"] for _ in range(3)
+    )
+    requests = statistics.median(import_times("requests")["requests"] for _ in range(3))
+
+    assert package < requests
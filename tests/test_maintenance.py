@@ -0,0 +1,80 @@
+"""Tests for the maintenance.py module."""
+
+import datetime as dt
+
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.maintenance import GarbageCollector, collect_garbage
+from metno_locationforecast.storage import MemoryStorage, place_key_prefix
+
+NOW = dt.datetime(2020, 7, 20, 12, 0, tzinfo=dt.timezone.utc)
+
+NEW_YORK = Place("New York", 40.7, -74.0, 10)
+LONDON = Place("London", 51.5, -0.1, 25)
+BEIJING = Place("Beijing", 39.9, 116.4)
+
+
+def key(place):
+    return f"{place_key_prefix(place)}compact.json"
+
+
+def add(storage, place, expires, accessed_hours_ago=0, size=10):
+    storage.put(key(place), "x" * size, expires)
+    storage.metadata(key(place)).accessed_at = NOW - dt.timedelta(hours=accessed_hours_ago)
+
+
+def test_place_key_prefix():
+    assert place_key_prefix(NEW_YORK) == "lat40.7lon-74.0altitude10_"
+    assert place_key_prefix(BEIJING) == "lat39.9lon116.4altitudeNone_"
+
+
+def test_evict_expired():
+    storage = MemoryStorage()
+    add(storage, NEW_YORK, NOW - dt.timedelta(hours=3))
+    add(storage, LONDON, NOW - dt.timedelta(minutes=30))
+    add(storage, BEIJING, NOW + dt.timedelta(hours=1))
+
+    collector = GarbageCollector(storage, max_age=dt.timedelta(hours=1), now=NOW)
+    evicted = collector.run()
+
+    assert evicted == [(key(NEW_YORK), "expired")]
+    assert sorted(storage.keys()) == sorted([key(LONDON), key(BEIJING)])
+
+
+def test_evict_inactive():
+    storage = MemoryStorage()
+    add(storage, NEW_YORK, NOW)
+    add(storage, LONDON, NOW)
+    storage.put(f"{place_key_prefix(LONDON)}complete.json", "x")
+
+    evicted = collect_garbage(storage, keep=[LONDON])
+
+    assert evicted == [(key(NEW_YORK), "inactive")]
+    assert len(storage.keys()) == 2
+
+
+def test_evict_by_size_least_recently_accessed_first():
+    storage = MemoryStorage()
+    add(storage, NEW_YORK, NOW, accessed_hours_ago=1, size=40)
+    add(storage, LONDON, NOW, accessed_hours_ago=5, size=40)
+    add(storage, BEIJING, NOW, accessed_hours_ago=3, size=40)
+
+    evicted = collect_garbage(storage, max_size=80)
+
+    assert evicted == [(key(LONDON), "size")]
+    assert sorted(storage.keys()) == sorted([key(NEW_YORK), key(BEIJING)])
+
+
+def test_incremental_steps():
+    storage = MemoryStorage()
+    for i in range(10):
+        add(storage, Place(str(i), i, i), NOW - dt.timedelta(days=1))
+
+    collector = GarbageCollector(storage, max_age=dt.timedelta(0), now=NOW)
+
+    assert len(collector.step(batch_size=4)) == 4
+    assert collector.done is False
+    assert len(collector.step(batch_size=4)) == 4
+    assert len(collector.step(batch_size=4)) == 2
+    assert collector.done is True
+    assert storage.keys() == []
+    assert len(collector.evicted) == 10
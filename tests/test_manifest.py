@@ -0,0 +1,192 @@
+"""Tests for the manifest.py module."""
+
+import datetime as dt
+import shutil
+
+import pytest
+
+from metno_locationforecast import cache
+from metno_locationforecast.cache import DataCache
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.manifest import Manifest, ManifestEntry
+from metno_locationforecast.storage import FileSystemStorage
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+NEW_YORK_FILE = "lat40.7lon-74.0altitude10_compact.json"
+BEIJING_FILE = "lat39.9lon116.4altitudeNone_compact.json"
+
+NOW = dt.datetime(2020, 7, 20, 12, 0, tzinfo=dt.timezone.utc)
+EXPIRES = dt.datetime(2020, 7, 20, 12, 14, 53, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def save_location(tmp_path):
+    for file_name in (NEW_YORK_FILE, BEIJING_FILE):
+        shutil.copy(f"./tests/test_data/{file_name}", tmp_path)
+    return tmp_path
+
+
+class TestManifestEntry:
+    def test_place_and_forecast_type(self):
+        entry = ManifestEntry(NEW_YORK_FILE, 10, NOW)
+
+        assert entry.place == Place("lat40.7lon-74.0altitude10", 40.7, -74.0, 10)
+        assert entry.forecast_type == "compact"
+
+    def test_place_without_altitude(self):
+        entry = ManifestEntry(BEIJING_FILE, 10, NOW)
+
+        assert entry.place.coordinates["altitude"] is None
+
+    def test_place_with_integer_coordinates(self):
+        entry = ManifestEntry("lat60lon10altitudeNone_compact.json", 10, NOW)
+
+        assert entry.place == Place("lat60lon10altitudeNone", 60, 10)
+        assert entry.forecast(USER_AGENT).file_name == entry.key
+
+    def test_not_a_forecast_key(self):
+        entry = ManifestEntry("something.json", 10, NOW)
+
+        assert entry.place is None
+        with pytest.raises(ValueError):
+            entry.forecast(USER_AGENT)
+
+    def test_record_round_trip(self):
+        entry = ManifestEntry(NEW_YORK_FILE, 10, NOW, EXPIRES, NOW)
+
+        assert ManifestEntry.from_record(entry.to_record()) == entry
+
+    def test_is_fresh(self):
+        entry = ManifestEntry(NEW_YORK_FILE, 10, NOW, EXPIRES)
+
+        assert entry.is_fresh(NOW) is True
+        assert entry.is_fresh(EXPIRES + dt.timedelta(seconds=1)) is False
+        assert ManifestEntry(NEW_YORK_FILE, 10, NOW).is_fresh(NOW) is False
+
+
+class TestManifest:
+    def test_record_and_remove(self, tmp_path):
+        manifest = Manifest(tmp_path)
+        manifest.record(NEW_YORK_FILE, 10, NOW, EXPIRES)
+        manifest.record(BEIJING_FILE, 20, NOW)
+
+        assert set(manifest.entries()) == {NEW_YORK_FILE, BEIJING_FILE}
+
+        manifest.record(NEW_YORK_FILE, 30, NOW, EXPIRES)
+        manifest.remove(BEIJING_FILE)
+
+        entries = manifest.entries()
+        assert list(entries) == [NEW_YORK_FILE]
+        assert entries[NEW_YORK_FILE].size == 30
+
+    def test_shared_between_objects(self, tmp_path):
+        writer = Manifest(tmp_path)
+        reader = Manifest(tmp_path)
+
+        writer.record(NEW_YORK_FILE, 10, NOW)
+        assert list(reader.entries()) == [NEW_YORK_FILE]
+
+        writer.record(BEIJING_FILE, 10, NOW)
+        assert len(reader.entries()) == 2
+
+    def test_partial_line_is_ignored(self, tmp_path):
+        manifest = Manifest(tmp_path)
+        manifest.record(NEW_YORK_FILE, 10, NOW)
+        with manifest.path.open("a") as file:
+            file.write('{"key": "lat1')
+
+        assert list(manifest.entries()) == [NEW_YORK_FILE]
+
+    def test_compact(self, tmp_path):
+        manifest = Manifest(tmp_path)
+        for size in range(5):
+            manifest.record(NEW_YORK_FILE, size, NOW)
+        manifest.record(BEIJING_FILE, 10, NOW)
+        manifest.remove(BEIJING_FILE)
+
+        manifest.compact()
+
+        assert len(manifest.path.read_text().splitlines()) == 1
+        assert manifest.entries()[NEW_YORK_FILE].size == 4
+        assert Manifest(tmp_path).entries()[NEW_YORK_FILE].size == 4
+
+    def test_compacts_automatically(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(Manifest, "compact_min_lines", 20)
+        monkeypatch.setattr(Manifest, "compact_check_interval", 5)
+        manifest = Manifest(tmp_path)
+        for size in range(200):
+            manifest.record(NEW_YORK_FILE, size, NOW)
+            manifest.record(BEIJING_FILE, size, NOW)
+
+        assert len(manifest.path.read_text().splitlines()) < 20
+        assert manifest.entries()[NEW_YORK_FILE].size == 199
+        assert Manifest(tmp_path).entries()[BEIJING_FILE].size == 199
+
+    def test_rebuild(self, save_location):
+        manifest = Manifest(save_location)
+        manifest.rebuild(FileSystemStorage(save_location))
+
+        entries = manifest.entries()
+        assert set(entries) == {NEW_YORK_FILE, BEIJING_FILE}
+        assert entries[NEW_YORK_FILE].expires == dt.datetime(
+            2020, 7, 20, 12, 14, 53, tzinfo=dt.timezone.utc
+        )
+
+    def test_forecasts_and_warm(self, save_location):
+        manifest = Manifest(save_location)
+        manifest.rebuild(FileSystemStorage(save_location))
+
+        assert len(manifest.forecasts(USER_AGENT)) == 2
+
+        forecasts = manifest.warm(USER_AGENT, fresh_only=False)
+        assert {forecast.file_name for forecast in forecasts} == {NEW_YORK_FILE, BEIJING_FILE}
+        assert all(hasattr(forecast, "data") for forecast in forecasts)
+        assert all(forecast.data_cache is cache.DATA_CACHE for forecast in forecasts)
+        cache.DATA_CACHE.clear()
+
+    def test_warm_with_data_cache(self, save_location):
+        manifest = Manifest(save_location)
+        manifest.rebuild(FileSystemStorage(save_location))
+        data_cache = DataCache()
+
+        forecasts = manifest.warm(USER_AGENT, fresh_only=False, data_cache=data_cache)
+
+        assert len(data_cache) == 2
+        assert all(forecast.data_cache is data_cache for forecast in forecasts)
+
+
+class TestFileSystemStorageManifest:
+    def test_save_updates_manifest(self, tmp_path):
+        source = Forecast(
+            Place("New York", 40.7, -74.0, 10), USER_AGENT, "compact", "./tests/test_data/"
+        )
+        source.load()
+        source.save_location = tmp_path
+
+        source.save()
+
+        entry = Manifest(tmp_path).get(NEW_YORK_FILE)
+        assert entry.expires == source.data.expires
+        assert entry.size == tmp_path.joinpath(NEW_YORK_FILE).stat().st_size
+        assert source.storage.metadata(NEW_YORK_FILE).expires == source.data.expires
+
+    def test_warm_place_with_integer_coordinates(self, tmp_path):
+        source = Forecast(
+            Place("New York", 40.7, -74.0, 10), USER_AGENT, "compact", "./tests/test_data/"
+        )
+        source.load()
+        oslo = Forecast(Place("Oslo", 60, 10), USER_AGENT, "compact", tmp_path)
+        oslo.storage.put(oslo.file_name, source.json_string)
+
+        forecasts = Manifest(tmp_path).warm(USER_AGENT, fresh_only=False, data_cache=False)
+
+        assert [forecast.file_name for forecast in forecasts] == [oslo.file_name]
+
+    def test_delete_updates_manifest(self, tmp_path):
+        storage = FileSystemStorage(tmp_path)
+        storage.put(NEW_YORK_FILE, "{}", EXPIRES)
+        storage.delete(NEW_YORK_FILE)
+
+        assert storage.manifest.entries() == {}
+        assert storage.keys() == []
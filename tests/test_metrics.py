@@ -0,0 +1,150 @@
+"""Tests for the metrics module."""
+
+import urllib.request
+
+import pytest
+
+from metno_locationforecast import hooks, metrics
+from metno_locationforecast.metrics import Counter, Histogram, Registry
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Record the library's metrics in a fresh registry."""
+    registry = Registry()
+    for name in ["REQUESTS", "UPDATES", "LOADS", "DOWNLOADED_BYTES", "RETRIES"]:
+        old = getattr(metrics, name)
+        new = registry.counter(old.name, old.help, old.label_names)
+        monkeypatch.setattr(metrics, name, new)
+    for name in ["REQUEST_SECONDS", "PARSE_SECONDS"]:
+        old = getattr(metrics, name)
+        monkeypatch.setattr(metrics, name, registry.histogram(old.name, old.help))
+    monkeypatch.setattr(metrics, "_FAILED", set())
+    metrics.enable()
+    yield registry
+    metrics.disable()
+
+
+def test_counter():
+    counter = Counter("requests_total", "Requests.", ["status"])
+    counter.inc(status=200)
+    counter.inc(2, status="error")
+    counter.inc(status="200")
+
+    assert counter.value(status="200") == 2
+    assert counter.value(status="304") == 0
+    assert counter.exposition() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{status="200"} 2.0\n'
+        'requests_total{status="error"} 2.0'
+    )
+    with pytest.raises(ValueError):
+        counter.inc(code=200)
+    with pytest.raises(ValueError):
+        counter.inc(-1, status=200)
+
+
+def test_histogram():
+    histogram = Histogram("parse_seconds", "Parse time.", buckets=[0.1, 1])
+    for value in [0.05, 0.5, 0.5, 5]:
+        histogram.observe(value)
+
+    assert histogram.count() == 4
+    assert histogram.sum() == pytest.approx(6.05)
+    assert histogram.exposition() == (
+        "# HELP parse_seconds Parse time.\n"
+        "# TYPE parse_seconds histogram\n"
+        'parse_seconds_bucket{le="0.1"} 1\n'
+        'parse_seconds_bucket{le="1.0"} 3\n'
+        'parse_seconds_bucket{le="+Inf"} 4\n'
+        "parse_seconds_sum 6.05\n"
+        "parse_seconds_count 4"
+    )
+
+
+def test_registry():
+    registry = Registry()
+    counter = registry.counter("a_total", "A.")
+    registry.histogram("b_seconds", "B.", label_names=["phase"])
+    counter.inc()
+
+    assert registry.get("a_total") is counter
+    assert "b_seconds" in registry
+    assert registry.exposition() == (
+        "# HELP a_total A.\n# TYPE a_total counter\na_total 1.0\n"
+        "# HELP b_seconds B.\n# TYPE b_seconds histogram\n"
+    )
+    with pytest.raises(ValueError):
+        registry.counter("a_total", "A again.")
+
+
+def test_label_values_are_escaped():
+    counter = Counter("a_total", "A.", ["name"])
+    counter.inc(name='say "hi"\n')
+
+    assert counter.exposition().endswith('a_total{name="say \\"hi\\"\\n"} 1.0')
+
+
+def test_update_metrics(tmp_path, mock_out_of_date, mock_200_request, enabled, new_york_forecast):
+    new_york_forecast.save_location = tmp_path
+
+    new_york_forecast.update()
+
+    assert metrics.REQUESTS.value(status="200") == 1
+    assert metrics.UPDATES.value(result="modified") == 1
+    assert metrics.DOWNLOADED_BYTES.value() == len(new_york_forecast.response.content)
+    assert metrics.REQUEST_SECONDS.count() == 1
+    assert metrics.PARSE_SECONDS.count() == 1
+    assert 'metno_locationforecast_requests_total{status="200"} 1.0' in enabled.exposition()
+
+
+def test_load_and_not_expired_metrics(mock_in_date, enabled, new_york_forecast):
+    new_york_forecast.update()
+
+    assert metrics.LOADS.value(source="storage") == 1
+    assert metrics.UPDATES.value(result="fresh") == 1
+    assert metrics.REQUESTS.value(status="200") == 0
+
+
+def test_retries(tmp_path, mock_out_of_date, monkeypatch, enabled, new_york_forecast):
+    import requests
+
+    def failing_request(*args, **kwargs):
+        raise requests.ConnectionError("No connection.")
+
+    new_york_forecast.save_location = tmp_path
+    monkeypatch.setattr(requests, "get", failing_request)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            new_york_forecast.update()
+
+    assert metrics.REQUESTS.value(status="error") == 2
+    assert metrics.UPDATES.value(result="error") == 2
+    assert metrics.RETRIES.value() == 1
+
+
+def test_disabled(mock_in_date, enabled, new_york_forecast):
+    metrics.disable()
+
+    new_york_forecast.update()
+
+    assert metrics.UPDATES.value(result="fresh") == 0
+    assert metrics._record not in hooks._SUBSCRIBERS
+
+
+def test_http_server():
+    registry = Registry()
+    registry.counter("a_total", "A.").inc()
+    server = metrics.start_http_server(0, "127.0.0.1", registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert body == registry.exposition()
+    assert content_type.startswith("text/plain; version=0.0.4")
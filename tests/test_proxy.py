@@ -0,0 +1,128 @@
+"""Tests for the proxy module."""
+
+import concurrent.futures
+import datetime as dt
+
+import pytest
+import requests
+
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.proxy import Proxy
+from metno_locationforecast.simulator import Simulator
+from metno_locationforecast.storage import MemoryStorage
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+NEW_YORK = Place("New York", 40.7, -74.0, 10)
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+
+
+def make_forecast(proxy, save_location, **kwargs):
+    return Forecast(NEW_YORK, USER_AGENT, "compact", str(save_location), proxy.url, **kwargs)
+
+
+def test_forecast(tmp_path):
+    with Simulator(intervals=20) as simulator, Proxy(MemoryStorage(), simulator.url) as proxy:
+        forecast = make_forecast(proxy, tmp_path)
+
+        assert forecast.update() == "Data-Modified"
+
+    assert len(forecast.data.intervals) == 20
+    assert forecast.data.expires > dt.datetime.now(dt.timezone.utc)
+    assert simulator.status_codes == {200: 1}
+
+
+def test_serves_from_cache(tmp_path):
+    with Simulator() as simulator, Proxy(MemoryStorage(), simulator.url) as proxy:
+        first = make_forecast(proxy, tmp_path / "first")
+        second = make_forecast(proxy, tmp_path / "second")
+        first.update()
+        second.update()
+
+    assert first.data == second.data
+    assert simulator.status_codes == {200: 1}
+    assert proxy.status_codes == {200: 2}
+
+
+def test_not_modified(tmp_path):
+    with Simulator(expires_in=dt.timedelta(0)) as simulator:
+        with Proxy(MemoryStorage(), simulator.url) as proxy:
+            forecast = make_forecast(proxy, tmp_path)
+
+            assert forecast.update() == "Data-Modified"
+            assert forecast.update() == "Data-Not-Modified"
+
+    assert simulator.status_codes == {200: 1, 304: 1}
+    assert proxy.status_codes == {200: 1, 304: 1}
+
+
+def test_saved_data_is_shared_with_forecasts(tmp_path):
+    storage = MemoryStorage()
+    with Simulator() as simulator, Proxy(storage, simulator.url) as proxy:
+        through_proxy = make_forecast(proxy, tmp_path)
+        through_proxy.update()
+
+    from_storage = make_forecast(proxy, tmp_path, storage=storage)
+    from_storage.load()
+
+    assert from_storage.data == through_proxy.data
+
+
+@pytest.mark.parametrize("place", [Place("Oslo", 60, 10), Place("Oslo", 60.0, 10.5, 20)])
+def test_keys_match_forecasts(tmp_path, place):
+    storage = MemoryStorage()
+    with Simulator() as simulator, Proxy(storage, simulator.url) as proxy:
+        forecast = Forecast(place, USER_AGENT, "compact", str(tmp_path), proxy.url)
+        forecast.update()
+
+    assert storage.keys() == [forecast.file_name]
+
+
+def test_concurrent_requests_are_coalesced():
+    with Simulator(latency=0.3) as simulator, Proxy(MemoryStorage(), simulator.url) as proxy:
+        url = f"{proxy.url}compact?lat=40.7&lon=-74.0"
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            responses = list(
+                executor.map(
+                    lambda _: requests.get(url, headers={"User-Agent": USER_AGENT}), range(4)
+                )
+            )
+
+    assert simulator.status_codes == {200: 1}
+    assert [response.status_code for response in responses] == [200] * 4
+    assert sorted(response.headers["X-Cache"] for response in responses) == [
+        "COALESCED",
+        "COALESCED",
+        "COALESCED",
+        "MISS",
+    ]
+    assert len({response.content for response in responses}) == 1
+
+
+def test_upstream_failure(tmp_path):
+    storage = MemoryStorage()
+    with Simulator(error_rate=1) as simulator, Proxy(storage, simulator.url) as proxy:
+        forecast = make_forecast(proxy, tmp_path)
+
+        with pytest.raises(requests.HTTPError):
+            forecast.update()
+
+    assert forecast.response.status_code == 500
+    assert storage.keys() == []
+
+
+def test_bad_requests():
+    with Simulator() as simulator, Proxy(MemoryStorage(), simulator.url) as proxy:
+        headers = {"User-Agent": USER_AGENT}
+        not_found = requests.get(f"{proxy.url}hourly?lat=1&lon=1", headers=headers)
+        no_user_agent = requests.get(f"{proxy.url}compact?lat=1&lon=1", headers={"User-Agent": ""})
+        no_coordinates = requests.get(f"{proxy.url}compact", headers=headers)
+
+    assert not_found.status_code == 404
+    assert no_user_agent.status_code == 403
+    assert no_coordinates.status_code == 400
+    assert simulator.status_codes == {}
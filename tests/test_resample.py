@@ -0,0 +1,130 @@
+"""Tests for the resample module."""
+
+import datetime as dt
+import math
+
+import pytest
+
+from metno_locationforecast.data_containers import Data, Interval, Variable
+from metno_locationforecast.resample import default_policy, resample
+
+START = dt.datetime(year=2020, month=7, day=20, tzinfo=dt.timezone.utc)
+HOUR = dt.timedelta(hours=1)
+
+
+def make_interval(hour, hours, symbol_code, **values):
+    units = {"air_temperature": "celsius", "wind_from_direction": "degrees"}
+    variables = {
+        name: Variable(name, value, units.get(name, "mm")) for name, value in values.items()
+    }
+    start_time = START + hour * HOUR
+    return Interval(start_time, start_time + hours * HOUR, symbol_code, variables)
+
+
+@pytest.fixture
+def mixed_data():
+    """Two hourly intervals, then two 6 hourly intervals and a final instant."""
+    intervals = [
+        make_interval(0, 1, "rain", air_temperature=10, precipitation_amount=1.0),
+        make_interval(1, 1, "cloudy", air_temperature=12, precipitation_amount=0.0),
+        make_interval(2, 6, "sun", air_temperature=18, precipitation_amount=6.0),
+        make_interval(8, 6, "fog", air_temperature=6, precipitation_amount=1.2),
+        make_interval(14, 0, None, air_temperature=0),
+    ]
+    units = {"air_temperature": "celsius", "precipitation_amount": "mm"}
+    return Data(START, START, START, units, intervals)
+
+
+def test_default_policy():
+    assert default_policy("air_temperature") == "interpolate"
+    assert default_policy("precipitation_amount") == "split"
+    assert default_policy("probability_of_thunder") == "carry"
+
+
+def test_hourly(mixed_data, vectorize):
+    result = resample(mixed_data, HOUR, vectorize=vectorize)
+
+    assert len(result) == 15
+    assert result.times[0] == START
+    assert result.times[-1] == START + 14 * HOUR
+    assert result.policies == {"air_temperature": "interpolate", "precipitation_amount": "split"}
+    assert list(result["air_temperature"][:4]) == [10, 12, 18, 16]
+    assert result["air_temperature"][14] == 0
+    assert list(result["precipitation_amount"][:4]) == [1, 0, 1, 1]
+    assert result["precipitation_amount"][8] == pytest.approx(0.2)
+    assert math.isnan(result["precipitation_amount"][14])
+    assert result.symbol_codes[:4] == ["rain", "cloudy", "sun", "sun"]
+    assert result.symbol_codes[13:] == ["fog", None]
+
+
+def test_three_hourly(mixed_data, vectorize):
+    result = resample(mixed_data, 3 * HOUR, vectorize=vectorize)
+
+    assert result.times == [START + hour * HOUR for hour in (0, 3, 6, 9, 12)]
+    assert list(result["precipitation_amount"]) == pytest.approx(
+        [2, 3, 2.2, 0.6, math.nan], nan_ok=True
+    )
+    assert result.symbol_codes == ["rain", "sun", "sun", "fog", "fog"]
+
+
+def test_split_preserves_totals(new_york_data, vectorize):
+    result = resample(new_york_data, HOUR, ["precipitation_amount"], vectorize=vectorize)
+    intervals = [
+        interval
+        for interval in new_york_data.intervals
+        if interval.duration and "precipitation_amount" in interval.variables
+    ]
+
+    total = sum(interval.variables["precipitation_amount"].value for interval in intervals)
+    resampled = [value for value in result["precipitation_amount"] if not math.isnan(value)]
+    assert sum(resampled) == pytest.approx(total)
+
+
+def test_directions_take_shorter_arc(vectorize):
+    intervals = [
+        make_interval(0, 1, None, wind_from_direction=350.0),
+        make_interval(2, 1, None, wind_from_direction=10.0),
+    ]
+    data = Data(START, START, START, {"wind_from_direction": "degrees"}, intervals)
+
+    result = resample(data, HOUR, vectorize=vectorize)
+
+    assert list(result["wind_from_direction"]) == pytest.approx([350, 0, 10])
+
+
+def test_policies_and_window(mixed_data, vectorize):
+    result = resample(
+        mixed_data,
+        HOUR,
+        policies={"air_temperature": "carry"},
+        start=START - HOUR,
+        end=START + 3 * HOUR,
+        vectorize=vectorize,
+    )
+
+    assert len(result) == 5
+    assert math.isnan(result["air_temperature"][0])
+    assert list(result["air_temperature"][1:]) == [10, 12, 18, 18]
+    assert result.symbol_codes[0] is None
+
+
+def test_vectorized_matches_python(new_york_data):
+    pytest.importorskip("numpy")
+    expected = resample(new_york_data, HOUR, vectorize=False)
+    result = resample(new_york_data, HOUR, vectorize=True)
+
+    assert result.times == expected.times
+    assert result.symbol_codes == expected.symbol_codes
+    for name, values in expected.values.items():
+        assert list(result[name]) == pytest.approx(list(values), nan_ok=True)
+
+
+def test_data_resample(mixed_data):
+    assert mixed_data.resample(HOUR) == resample(mixed_data, HOUR)
+
+
+def test_invalid_arguments(mixed_data):
+    with pytest.raises(ValueError):
+        mixed_data.resample(dt.timedelta(0))
+    with pytest.raises(ValueError):
+        mixed_data.resample(HOUR, policies={"air_temperature": "nearest"})
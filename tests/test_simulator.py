@@ -0,0 +1,88 @@
+"""Tests for the simulator module."""
+
+import datetime as dt
+
+import pytest
+import requests
+
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.simulator import Simulator
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+
+
+@pytest.fixture(autouse=True)
+def no_proxy(monkeypatch):
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+
+
+def make_forecast(simulator, save_location, forecast_type="compact"):
+    new_york = Place("New York", 40.7, -74.0, 10)
+    return Forecast(new_york, USER_AGENT, forecast_type, str(save_location), base_url=simulator.url)
+
+
+@pytest.mark.parametrize("forecast_type", ["compact", "complete"])
+def test_forecast(tmp_path, forecast_type):
+    with Simulator(intervals=20) as simulator:
+        forecast = make_forecast(simulator, tmp_path, forecast_type)
+
+        assert forecast.update() == "Data-Modified"
+        assert forecast.update() == "Data-Not-Expired"
+
+    assert len(forecast.data.intervals) == 20
+    assert forecast.data.expires > dt.datetime.now(dt.timezone.utc)
+    assert forecast.data.last_modified <= dt.datetime.now(dt.timezone.utc)
+    assert simulator.status_codes == {200: 1}
+
+
+def test_not_modified(tmp_path):
+    with Simulator(expires_in=dt.timedelta(0)) as simulator:
+        forecast = make_forecast(simulator, tmp_path)
+
+        assert forecast.update() == "Data-Modified"
+        assert forecast.update() == "Data-Not-Modified"
+
+    assert simulator.status_codes == {200: 1, 304: 1}
+
+
+def test_same_forecast_until_update(tmp_path):
+    with Simulator(expires_in=dt.timedelta(0)) as simulator:
+        first = make_forecast(simulator, tmp_path / "first")
+        second = make_forecast(simulator, tmp_path / "second")
+        first.update()
+        second.update()
+
+    assert first.data == second.data
+
+
+@pytest.mark.parametrize(
+    "rates, status_code", [({"error_rate": 1}, 500), ({"throttle_rate": 1}, 429)]
+)
+def test_failures(tmp_path, rates, status_code):
+    with Simulator(**rates) as simulator:
+        forecast = make_forecast(simulator, tmp_path)
+
+        with pytest.raises(requests.HTTPError):
+            forecast.update()
+
+    assert forecast.response.status_code == status_code
+
+
+def test_bad_requests():
+    with Simulator() as simulator:
+        headers = {"User-Agent": USER_AGENT}
+        not_found = requests.get(f"{simulator.url}hourly?lat=1&lon=1", headers=headers)
+        no_user_agent = requests.get(
+            f"{simulator.url}compact?lat=1&lon=1", headers={"User-Agent": ""}
+        )
+        no_coordinates = requests.get(f"{simulator.url}compact", headers=headers)
+
+    assert not_found.status_code == 404
+    assert no_user_agent.status_code == 403
+    assert no_coordinates.status_code == 400
+
+
+def test_invalid_rates():
+    with pytest.raises(ValueError):
+        Simulator(error_rate=0.6, throttle_rate=0.6)
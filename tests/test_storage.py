@@ -0,0 +1,195 @@
+"""Tests for the storage.py module."""
+
+import datetime as dt
+import os
+
+import pytest
+
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.storage import (
+    FileSystemStorage,
+    MemoryStorage,
+    SQLiteStorage,
+    StorageMetadata,
+    get_storage,
+)
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+
+EXPIRES = dt.datetime(2020, 7, 20, 12, 14, 53, tzinfo=dt.timezone.utc)
+LAST_MODIFIED = dt.datetime(2020, 7, 20, 11, 44, 31, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture(params=["filesystem", "memory", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "filesystem":
+        return FileSystemStorage(tmp_path)
+    if request.param == "memory":
+        return MemoryStorage()
+    return SQLiteStorage(tmp_path.joinpath("forecasts.sqlite3"))
+
+
+@pytest.fixture
+def new_york():
+    return Place("New York", 40.7, -74.0, 10)
+
+
+class TestStorageBackends:
+    def test_get_missing(self, storage):
+        assert storage.get("missing.json") is None
+        assert storage.metadata("missing.json") is None
+        assert storage.exists("missing.json") is False
+
+    def test_put_and_get(self, storage):
+        storage.put("key.json", '{"a": 1}')
+
+        assert storage.get("key.json") == '{"a": 1}'
+        assert storage.exists("key.json") is True
+
+    def test_put_replaces(self, storage):
+        storage.put("key.json", '{"a": 1}')
+        storage.put("key.json", '{"a": 2}')
+
+        assert storage.get("key.json") == '{"a": 2}'
+
+    def test_delete(self, storage):
+        storage.put("key.json", '{"a": 1}')
+
+        assert storage.delete("key.json") is True
+        assert storage.get("key.json") is None
+        assert storage.delete("key.json") is False
+
+    def test_metadata(self, storage):
+        value = (
+            '{"headers": {"Expires": "Mon, 20 Jul 2020 12:14:53 GMT", '
+            '"Last-Modified": "Mon, 20 Jul 2020 11:44:31 GMT"}}'
+        )
+        storage.put("key.json", value, EXPIRES, LAST_MODIFIED)
+
+        metadata = storage.metadata("key.json")
+
+        assert isinstance(metadata, StorageMetadata)
+        assert metadata.size == len(value)
+        assert metadata.expires == EXPIRES
+        assert metadata.last_modified == LAST_MODIFIED
+        assert metadata.is_fresh(EXPIRES - dt.timedelta(seconds=1)) is True
+        assert metadata.is_fresh(EXPIRES + dt.timedelta(seconds=1)) is False
+
+
+def test_filesystem_not_a_directory(tmp_path):
+    file_path = tmp_path.joinpath("not_a_dir")
+    file_path.touch()
+
+    with pytest.raises(NotADirectoryError):
+        FileSystemStorage(file_path)
+
+
+def test_filesystem_get_records_access(tmp_path):
+    storage = FileSystemStorage(tmp_path)
+    storage.put("key.json", '{"a": 1}')
+    path = tmp_path.joinpath("key.json")
+    day_ago = (dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=1)).timestamp()
+    os.utime(path, (day_ago, day_ago))
+
+    storage.get("key.json")
+
+    metadata = storage.metadata("key.json")
+    assert metadata.accessed_at > dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=1)
+    assert path.stat().st_mtime == day_ago
+
+
+def test_sqlite_get_defers_access_times(tmp_path):
+    path = tmp_path.joinpath("forecasts.sqlite3")
+    storage = SQLiteStorage(path)
+    storage.put("key.json", '{"a": 1}')
+    stored_at = storage.metadata("key.json").stored_at
+    changes = storage._connection.total_changes
+
+    storage.get("key.json")
+
+    assert storage._connection.total_changes == changes
+    accessed_at = storage.metadata("key.json").accessed_at
+    assert accessed_at >= stored_at
+    assert SQLiteStorage(path).metadata("key.json").accessed_at == stored_at
+
+    storage.close()
+
+    assert SQLiteStorage(path).metadata("key.json").accessed_at == accessed_at
+
+
+def test_sqlite_flushes_access_times(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteStorage, "access_flush_size", 2)
+    path = tmp_path.joinpath("forecasts.sqlite3")
+    storage = SQLiteStorage(path)
+    storage.put("first.json", '{"a": 1}')
+    storage.put("second.json", '{"a": 2}')
+
+    storage.get("first.json")
+    storage.get("second.json")
+
+    assert storage._accessed == {}
+    other = SQLiteStorage(path)
+    for key in ("first.json", "second.json"):
+        assert other.metadata(key).accessed_at == storage.metadata(key).accessed_at
+
+
+def test_get_storage_is_shared(tmp_path):
+    assert get_storage("memory", tmp_path) is get_storage("memory", "somewhere/else")
+    assert get_storage("filesystem", tmp_path) is get_storage("filesystem", str(tmp_path))
+    assert isinstance(get_storage("sqlite", tmp_path), SQLiteStorage)
+    assert tmp_path.joinpath("forecasts.sqlite3").exists()
+
+
+def test_get_storage_bad_type(tmp_path):
+    with pytest.raises(ValueError):
+        get_storage("not a storage type", tmp_path)
+
+
+class TestForecastStorage:
+    def test_default_storage(self, new_york):
+        forecast = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION)
+
+        assert isinstance(forecast.storage, FileSystemStorage)
+        assert forecast.storage.location == forecast.save_location
+
+    def test_storage_type(self, tmp_path, new_york):
+        forecast = Forecast(new_york, USER_AGENT, "compact", str(tmp_path), storage="sqlite")
+
+        assert isinstance(forecast.storage, SQLiteStorage)
+
+    def test_bad_storage_type(self, new_york):
+        with pytest.raises(ValueError):
+            Forecast(new_york, USER_AGENT, "compact", storage="not a storage type")
+
+    def test_save_and_load_with_memory_storage(self, new_york):
+        source = Forecast(new_york, USER_AGENT, "compact", SAVE_LOCATION)
+        source.load()
+
+        storage = MemoryStorage()
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=storage)
+        forecast.json_string = source.json_string
+        forecast.json = source.json
+        forecast.save()
+
+        metadata = storage.metadata(forecast.file_name)
+        assert metadata.expires == source.data.expires
+        assert metadata.last_modified == source.data.last_modified
+
+        loaded = Forecast(new_york, USER_AGENT, "compact", storage=storage)
+        loaded.load()
+        assert loaded.data == source.data
+
+    def test_load_missing(self, new_york):
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=MemoryStorage())
+
+        with pytest.raises(FileNotFoundError):
+            forecast.load()
+
+    def test_update_with_memory_storage(self, mock_out_of_date, mock_200_request, new_york):
+        storage = MemoryStorage()
+        forecast = Forecast(new_york, USER_AGENT, "compact", storage=storage)
+
+        assert forecast.update() == "Data-Modified"
+        assert storage.exists(forecast.file_name)
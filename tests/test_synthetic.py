@@ -0,0 +1,53 @@
+"""Tests for the synthetic module."""
+
+import datetime as dt
+import json
+
+import pytest
+
+from metno_locationforecast import synthetic
+from metno_locationforecast.forecast import parse_json
+
+START = dt.datetime(2020, 7, 20, 11, tzinfo=dt.timezone.utc)
+
+
+def test_compact_payload():
+    payload = synthetic.payload("compact", 82, start=START)
+    timeseries = payload["properties"]["timeseries"]
+
+    assert payload["properties"]["meta"]["units"] == synthetic.COMPACT_UNITS
+    assert len(timeseries) == 82
+    assert timeseries[0]["time"] == "2020-07-20T11:00:00Z"
+    assert timeseries[56]["time"] == "2020-07-22T19:00:00Z"
+    assert timeseries[57]["time"] == "2020-07-23T01:00:00Z"
+    assert set(timeseries[0]["data"]) == {
+        "instant",
+        "next_1_hours",
+        "next_6_hours",
+        "next_12_hours",
+    }
+    assert set(timeseries[60]["data"]) == {"instant", "next_6_hours", "next_12_hours"}
+    assert set(timeseries[-1]["data"]) == {"instant"}
+
+
+def test_complete_payload():
+    json_string = synthetic.saved_json_string("complete", 10, hourly=5, start=START)
+    data = parse_json(json.loads(json_string))
+
+    assert data.units == synthetic.COMPLETE_UNITS
+    assert len(data.intervals) == 10
+    assert "air_temperature_max" not in data.intervals[0].variables
+    assert "air_temperature_max" in data.intervals[5].variables
+    assert data.intervals[5].duration == dt.timedelta(hours=6)
+    assert data.last_modified == START
+    assert data.expires == START + dt.timedelta(minutes=30)
+
+
+def test_repeatable():
+    assert synthetic.payload(start=START) == synthetic.payload(start=START)
+    assert synthetic.payload(start=START) != synthetic.payload(start=START, seed=1)
+
+
+def test_invalid_forecast_type():
+    with pytest.raises(ValueError):
+        synthetic.payload("hourly")
@@ -0,0 +1,48 @@
+"""Tests for the units module."""
+
+import pytest
+
+from metno_locationforecast import units
+from metno_locationforecast.data_containers import Variable
+from metno_locationforecast.units import (
+    Conversion,
+    get_conversion,
+    register_conversion,
+    valid_conversions,
+)
+
+
+def test_get_conversion():
+    conversion = get_conversion("celsius", "fahrenheit")
+
+    assert conversion(100) == 212.0
+    assert conversion.convert_all([0, 37.5]) == [32.0, 99.5]
+
+
+def test_beaufort_is_an_integer_up_to_12():
+    conversion = get_conversion("m/s", "beaufort")
+
+    assert conversion(3) == 2
+    assert isinstance(conversion(3), int)
+    assert conversion.convert_all([0, 15.2, 100]) == [0, 7, 12]
+
+
+def test_invalid_conversions():
+    with pytest.raises(ValueError, match="No valid conversions"):
+        get_conversion("degrees", "radians")
+    with pytest.raises(ValueError, match="Valid destination units"):
+        get_conversion("celsius", "kelvin")
+
+
+def test_register_conversion(monkeypatch):
+    monkeypatch.setattr(units, "_CONVERSIONS", dict(units._CONVERSIONS))
+    monkeypatch.setitem(units.VALID_UNIT_CONVERSIONS, "celsius", {"fahrenheit"})
+    register_conversion(Conversion("celsius", "kelvin", lambda value: value + 273.15))
+
+    assert valid_conversions("celsius") == {"fahrenheit", "kelvin"}
+
+    temperature = Variable("air_temperature", 20, "celsius")
+    temperature.convert_to("kelvin")
+
+    assert temperature.value == 293.15
+    assert temperature.units == "kelvin"
@@ -0,0 +1,139 @@
+"""Tests for the warmup.py module."""
+
+import datetime as dt
+import shutil
+
+import pytest
+
+from metno_locationforecast import cache
+from metno_locationforecast.cache import DataCache
+from metno_locationforecast.data_containers import Place
+from metno_locationforecast.forecast import Forecast
+from metno_locationforecast.warmup import parse_json_string, warm_up
+
+USER_AGENT = "testing/0.1 https://github.com/Rory-Sullivan/yrlocationforecast"
+SAVE_LOCATION = "./tests/test_data/"
+
+NEW_YORK = Place("New York", 40.7, -74.0, 10)
+LONDON = Place("London", 51.5, -0.1, 25)
+BEIJING = Place("Beijing", 39.9, 116.4)
+
+
+@pytest.fixture(autouse=True)
+def clear_data_cache():
+    cache.DATA_CACHE.clear()
+    yield
+    cache.DATA_CACHE.clear()
+
+
+@pytest.fixture
+def forecasts():
+    return [
+        Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION),
+        Forecast(LONDON, USER_AGENT, "complete", SAVE_LOCATION),
+        Forecast(BEIJING, USER_AGENT, "compact", SAVE_LOCATION),
+    ]
+
+
+def expected_data(forecast):
+    expected = Forecast(forecast.place, USER_AGENT, forecast.forecast_type, SAVE_LOCATION)
+    expected.load()
+    return expected.data
+
+
+def test_parse_json_string():
+    with open("./tests/test_data/lat40.7lon-74.0altitude10_compact.json") as file:
+        data, parse_time = parse_json_string(file.read())
+
+    assert data == expected_data(Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION))
+    assert parse_time > 0
+
+
+def test_warm_up_in_threads(forecasts):
+    progress = []
+
+    report = warm_up(forecasts, max_workers=2, progress=lambda *args: progress.append(args))
+
+    assert len(report.forecasts) == 3
+    assert report.errors == []
+    assert progress[-1] == (3, 3)
+    assert report.duration > 0
+    for forecast in forecasts:
+        assert forecast.data == expected_data(forecast)
+
+
+def test_warm_up_in_processes(forecasts):
+    report = warm_up(forecasts, max_workers=2, processes=2)
+
+    assert len(report.forecasts) == 3
+    for forecast in forecasts:
+        assert forecast.data == expected_data(forecast)
+        assert forecast.json_string
+
+
+@pytest.mark.parametrize(
+    "options", [{"window": dt.timedelta(hours=6)}, {"variables": ["air_temperature"]}]
+)
+def test_warm_up_in_processes_with_options(options):
+    forecast = Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION, **options)
+    expected = Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION, **options)
+    expected.load()
+
+    warm_up([forecast], processes=1)
+
+    assert forecast.data == expected.data
+
+
+@pytest.mark.parametrize("processes", [0, 1])
+def test_warm_up_lean(processes):
+    forecast = Forecast(NEW_YORK, USER_AGENT, "compact", SAVE_LOCATION, lean=True)
+
+    warm_up([forecast], processes=processes, data_cache=False)
+
+    assert forecast._json_string is None
+    assert forecast._json is None
+    assert forecast.data == expected_data(forecast)
+
+
+def test_warm_up_errors(tmp_path, forecasts):
+    shutil.copy("./tests/test_data/lat40.7lon-74.0altitude10_compact.json", tmp_path)
+    for forecast in forecasts:
+        forecast.save_location = tmp_path
+
+    report = warm_up(forecasts)
+
+    assert [forecast.place for forecast in report.forecasts] == [NEW_YORK]
+    assert len(report.errors) == 2
+    assert all(isinstance(error, FileNotFoundError) for _, error in report.errors)
+
+
+def test_warm_up_populates_data_cache(mock_in_date, forecasts):
+    data_cache = DataCache()
+
+    report = warm_up(forecasts, data_cache=data_cache)
+    assert report.cached == 0
+    assert len(data_cache) == 3
+
+    new_forecasts = [
+        Forecast(f.place, USER_AGENT, f.forecast_type, SAVE_LOCATION, data_cache=data_cache)
+        for f in forecasts
+    ]
+    report = warm_up(new_forecasts, data_cache=None)
+    # The Beijing data has expired so is not served from the cache.
+    assert report.cached == 2
+    assert len(report.forecasts) == 3
+
+
+def test_warm_up_populates_process_wide_data_cache_by_default(forecasts):
+    warm_up(forecasts)
+
+    assert len(cache.DATA_CACHE) == 3
+    assert all(forecast.data_cache is cache.DATA_CACHE for forecast in forecasts)
+
+
+def test_warm_up_reports_evictions(forecasts):
+    report = warm_up(forecasts, data_cache=DataCache(max_entries=2))
+
+    assert len(report.forecasts) == 3
+    assert report.evicted == 1
+    assert warm_up(forecasts, data_cache=DataCache(max_entries=None)).evicted == 0